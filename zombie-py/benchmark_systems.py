@@ -0,0 +1,89 @@
+"""Benchmark the simulation's entity systems one at a time.
+
+Plays bot runs headless and reports how long each system in
+main.WORLD_SYSTEMS takes per tick, alongside the entity counts it ran over:
+
+    python benchmark_systems.py --runs 5 --ticks 6000
+
+Pass --wave N to start every run at wave N for bigger hordes, and --immortal
+to keep the bot alive so a run lasts all of its ticks. --save FILE keeps the
+world the last run ended in, and --load FILE starts every run from it instead
+of a new world:
+
+    python benchmark_systems.py --runs 1 --wave 20 --immortal --save wave20.sav
+    python benchmark_systems.py --runs 5 --load wave20.sav --immortal
+"""
+
+import argparse
+import collections
+import time
+
+import main as game
+from verify_replays import Bot
+
+
+def run_bot(seed, ticks, wave, immortal, profiler, load=None):
+    """Play one bot run into `profiler`; returns (ticks, peak entity counts, world)."""
+    bot = Bot(seed)
+    if load:
+        world = game.load_world(load, headless=True)
+    else:
+        world = game.World(seed, headless=True)
+        for _ in range(wave - 1):
+            world.start_next_wave()
+    world.profiler = profiler
+    if immortal:
+        world.player.health = 10**9
+
+    start = world.game_tick
+    peaks = collections.Counter()
+    while world.game_tick < start + ticks and not world.game_over:
+        world.step(bot.inputs(world))
+        for name, archetype in world.entities.items():
+            peaks[name] = max(peaks[name], len(archetype))
+    return world.game_tick - start, peaks, world
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ticks", type=int, default=6000, help="longest run length")
+    parser.add_argument("--wave", type=int, default=1, help="wave to start at")
+    parser.add_argument("--immortal", action="store_true", help="never let the bot die")
+    parser.add_argument("--load", help="start every run from this world save")
+    parser.add_argument("--save", help="save the world the last run ended in")
+    args = parser.parse_args()
+
+    profiler = game.SystemProfiler()
+    peaks = collections.Counter()
+    simulated_ticks = 0
+    start = time.perf_counter()
+    for seed in range(args.runs):
+        ticks, run_peaks, world = run_bot(
+            seed, args.ticks, args.wave, args.immortal, profiler, args.load
+        )
+        simulated_ticks += ticks
+        peaks |= run_peaks
+    wall_time = time.perf_counter() - start
+
+    start = f"{args.load}" if args.load else f"wave {args.wave}"
+    print(
+        f"{args.runs} runs from {start}: {simulated_ticks} ticks in "
+        f"{wall_time:.2f}s ({simulated_ticks / wall_time:.0f} ticks/s)"
+    )
+    print(
+        "Peak entities: "
+        + ", ".join(f"{name} {count}" for name, count in peaks.items())
+    )
+    profiler.report()
+
+    if args.save:
+        game.save_world(world, args.save)
+        print(
+            f"Saved the world at tick {world.game_tick}, wave {world.current_wave}, "
+            f"to {args.save}"
+        )
+
+
+if __name__ == "__main__":
+    main()
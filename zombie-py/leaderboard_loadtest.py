@@ -0,0 +1,177 @@
+"""Score-ingestion load test for the leaderboard REST API.
+
+Fires concurrent score submissions, leaderboard sync pages and rank counts,
+the same requests `submit_score_to_leaderboard()`, `LeaderboardStore.sync()`
+and `get_rank()` make, then reports throughput and latency percentiles per
+operation.
+
+    python leaderboard_server.py --port 54321 &
+    python leaderboard_loadtest.py --url http://127.0.0.1:54321
+
+Pass --serve to start an in-process stand-in on a free port instead.
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from leaderboard_server import DEMO_KEY, serve
+
+SYNC_PAGE = 1000  # Rows per sync request, as LEADERBOARD_SYNC_PAGE in main.py
+
+# Highest score id seen so far; sync pages start from a watermark below it
+newest_id = 0
+newest_id_lock = threading.Lock()
+
+
+def make_request(base_url, key, method, path, body=None, prefer=None):
+    headers = {"apikey": key, "Authorization": f"Bearer {key}"}
+    data = None
+    if body is not None:
+        data = json.dumps(body).encode()
+        headers["Content-Type"] = "application/json"
+    if prefer:
+        headers["Prefer"] = prefer
+    request = urllib.request.Request(
+        base_url + path, data=data, headers=headers, method=method
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        payload = response.read()
+        return json.loads(payload) if payload else None
+
+
+def submit(base_url, key, i):
+    global newest_id
+    body = {"email": f"player{i}@example.com", "score": random.randint(0, 5000)}
+    rows = make_request(
+        base_url, key, "POST", "/rest/v1/scores", body, "return=representation"
+    )
+    with newest_id_lock:
+        newest_id = max([newest_id] + [row["id"] for row in rows or []])
+    return rows
+
+
+def sync_page(base_url, key, i):
+    # Clients resume from the last id they stored, anywhere in the table
+    watermark = random.randint(0, newest_id)
+    return make_request(
+        base_url,
+        key,
+        "GET",
+        f"/rest/v1/scores?select=id,email,score&id=gt.{watermark}"
+        f"&order=id.asc&limit={SYNC_PAGE}",
+    )
+
+
+def rank(base_url, key, i):
+    # Counts the better scores; only the Content-Range total is used
+    score = random.randint(0, 5000)
+    return make_request(
+        base_url,
+        key,
+        "GET",
+        f"/rest/v1/scores?select=id&score=gt.{score}&limit=1",
+        prefer="count=exact",
+    )
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def run(base_url, key, submissions, syncs, ranks, concurrency):
+    """Run the mixed workload; returns {operation: [latencies in seconds]}."""
+    jobs = [("submit", submit, i) for i in range(submissions)]
+    jobs += [("sync_page", sync_page, i) for i in range(syncs)]
+    jobs += [("rank", rank, i) for i in range(ranks)]
+    random.shuffle(jobs)
+
+    latencies = {"submit": [], "sync_page": [], "rank": []}
+    errors = {"submit": 0, "sync_page": 0, "rank": 0}
+    lock = threading.Lock()
+
+    def timed(job):
+        name, func, i = job
+        start = time.perf_counter()
+        try:
+            func(base_url, key, i)
+            ok = True
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            if ok:
+                latencies[name].append(elapsed)
+            else:
+                errors[name] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, jobs))
+    wall_time = time.perf_counter() - start
+
+    return latencies, errors, wall_time
+
+
+def report(latencies, errors, wall_time):
+    total = sum(len(v) for v in latencies.values())
+    print(f"{total} requests in {wall_time:.2f}s ({total / wall_time:.0f} req/s)")
+    for name, values in latencies.items():
+        values.sort()
+        rate = len(values) / wall_time if wall_time else 0
+        print(
+            f"  {name:9s} n={len(values):6d} errors={errors[name]:4d} "
+            f"rate={rate:7.0f}/s "
+            f"p50={percentile(values, 0.50) * 1000:6.1f}ms "
+            f"p95={percentile(values, 0.95) * 1000:6.1f}ms "
+            f"p99={percentile(values, 0.99) * 1000:6.1f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=os.getenv("SUPABASE_URL"))
+    parser.add_argument("--key", default=os.getenv("SUPABASE_KEY") or DEMO_KEY)
+    parser.add_argument("--submissions", type=int, default=5000)
+    parser.add_argument("--syncs", type=int, default=1000)
+    parser.add_argument("--ranks", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument(
+        "--serve", action="store_true", help="start a local stand-in to test against"
+    )
+    args = parser.parse_args()
+
+    server = None
+    if args.serve or not args.url:
+        db_path = os.path.join(tempfile.mkdtemp(), "loadtest.db")
+        server = serve("127.0.0.1", 0, db_path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        args.url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        report(
+            *run(
+                args.url.rstrip("/"),
+                args.key,
+                args.submissions,
+                args.syncs,
+                args.ranks,
+                args.concurrency,
+            )
+        )
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
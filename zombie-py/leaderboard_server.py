@@ -0,0 +1,272 @@
+"""Local stand-in for the Supabase leaderboard, backed by SQLite.
+
+Implements the small part of the Supabase REST (PostgREST) API that the
+game uses on the `scores` table:
+
+- POST /rest/v1/scores          insert one row or a list of rows
+- GET  /rest/v1/scores          select, order, limit/offset and
+                                column=op.value filters (eq, gt, gte, lt, lte)
+- HEAD /rest/v1/scores          same as GET, headers only
+
+`Prefer: count=exact` adds the total row count to the Content-Range header.
+With --verify, every inserted row must carry the input replay sent by clients
+running with SCORE_VERIFICATION=1; rows whose replay does not reproduce the
+score are rejected with 422 (see verify_replays.py).
+
+Run it and point the game at it:
+
+    python leaderboard_server.py --port 54321
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=<printed key> python main.py
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+TABLE_PATH = "/rest/v1/scores"
+COLUMNS = ["id", "email", "score", "created_at"]
+FILTER_OPERATORS = {"eq": "=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+# The Supabase client only accepts JWT-shaped keys; the server never checks it
+DEMO_KEY = "local.leaderboard.standin"
+
+
+class ScoreDatabase:
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS scores (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ'))
+            );
+            CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC);
+            """)
+        self.connection.commit()
+
+    def insert(self, rows):
+        """Insert rows and return them as stored."""
+        inserted = []
+        with self.lock:
+            for row in rows:
+                cursor = self.connection.execute(
+                    "INSERT INTO scores (email, score) VALUES (?, ?)",
+                    (str(row["email"]), int(row["score"])),
+                )
+                inserted.append(
+                    self.connection.execute(
+                        f"SELECT {', '.join(COLUMNS)} FROM scores WHERE id = ?",
+                        (cursor.lastrowid,),
+                    ).fetchone()
+                )
+            self.connection.commit()
+        return [dict(zip(COLUMNS, row)) for row in inserted]
+
+    def select(self, columns, filters, order, limit, offset, with_count):
+        """Run a select; returns (rows, total count or None)."""
+        where = ""
+        values = []
+        if filters:
+            where = " WHERE " + " AND ".join(
+                f"{column} {FILTER_OPERATORS[op]} ?" for column, op, _ in filters
+            )
+            values = [value for _, _, value in filters]
+
+        query = f"SELECT {', '.join(columns)} FROM scores{where}"
+        if order:
+            query += " ORDER BY " + ", ".join(
+                f"{column} {direction}" for column, direction in order
+            )
+        query += " LIMIT ? OFFSET ?"
+
+        with self.lock:
+            rows = self.connection.execute(
+                query, values + [limit if limit is not None else -1, offset]
+            ).fetchall()
+            total = None
+            if with_count:
+                total = self.connection.execute(
+                    f"SELECT COUNT(*) FROM scores{where}", values
+                ).fetchone()[0]
+        return [dict(zip(columns, row)) for row in rows], total
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def parse_select(params):
+    """Turn PostgREST query parameters into arguments for ScoreDatabase.select."""
+    columns = COLUMNS
+    filters = []
+    order = []
+    limit = None
+    offset = 0
+
+    for name, values in params.items():
+        value = values[-1]
+        if name == "select":
+            columns = [c.strip() for c in value.split(",") if c.strip()]
+            if columns == ["*"]:
+                columns = COLUMNS
+        elif name == "order":
+            for part in value.split(","):
+                pieces = part.split(".")
+                direction = "DESC" if "desc" in pieces[1:] else "ASC"
+                order.append((pieces[0], direction))
+        elif name == "limit":
+            limit = int(value)
+        elif name == "offset":
+            offset = int(value)
+        elif name in COLUMNS:
+            op, _, operand = value.partition(".")
+            if op not in FILTER_OPERATORS:
+                raise RequestError(400, f"Unsupported operator: {op}")
+            filters.append((name, op, operand))
+
+    for column in columns + [c for c, _ in order] + [c for c, _, _ in filters]:
+        if column not in COLUMNS:
+            raise RequestError(400, f"Unknown column: {column}")
+
+    return columns, filters, order, limit, offset
+
+
+class LeaderboardHandler(BaseHTTPRequestHandler):
+    database = None  # Set by serve()
+    verifier = None  # VerificationPool when started with --verify
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Keep load tests quiet
+        pass
+
+    def send_json(self, status, body, headers=None, include_body=True):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload) if include_body else 0))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if include_body:
+            self.wfile.write(payload)
+
+    def route(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != TABLE_PATH:
+            raise RequestError(404, f"No such table: {url.path}")
+        return parse_qs(url.query)
+
+    def do_GET(self, include_body=True):
+        try:
+            params = self.route()
+            columns, filters, order, limit, offset = parse_select(params)
+            with_count = "count=exact" in self.headers.get("Prefer", "")
+            rows, total = self.database.select(
+                columns, filters, order, limit, offset, with_count
+            )
+        except (RequestError, ValueError) as e:
+            status = e.status if isinstance(e, RequestError) else 400
+            self.send_json(status, {"message": str(e)})
+            return
+
+        # PostgREST reports the returned range and, if asked, the total
+        end = offset + len(rows) - 1
+        content_range = f"{offset}-{end}" if rows else "*"
+        content_range += f"/{total if total is not None else '*'}"
+        self.send_json(
+            200, rows, {"Content-Range": content_range}, include_body=include_body
+        )
+
+    def do_HEAD(self):
+        self.do_GET(include_body=False)
+
+    def verify(self, row):
+        """Re-run a row's replay and refuse scores it does not reproduce."""
+        if not row.get("replay"):
+            raise RequestError(422, "Score submissions must include a replay")
+        accepted, simulated, _ = self.verifier.check(
+            {"score": int(row["score"]), "replay": row["replay"]}
+        )
+        if not accepted:
+            raise RequestError(
+                422, f"Replay does not reproduce score {row['score']} ({simulated})"
+            )
+
+    def do_POST(self):
+        try:
+            self.route()
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"null")
+            rows = body if isinstance(body, list) else [body]
+            if self.verifier is not None:
+                for row in rows:
+                    self.verify(row)
+            inserted = self.database.insert(rows)
+        except RequestError as e:
+            self.send_json(e.status, {"message": e.message})
+            return
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {"message": f"Bad row: {e}"})
+            return
+
+        if "return=minimal" in self.headers.get("Prefer", ""):
+            self.send_response(201)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self.send_json(201, inserted)
+
+
+def serve(host, port, db_path, verifier=None):
+    LeaderboardHandler.database = ScoreDatabase(db_path)
+    LeaderboardHandler.verifier = verifier
+    server = ThreadingHTTPServer((host, port), LeaderboardHandler)
+    server.daemon_threads = True
+    host, port = server.server_address[:2]
+    print(f"Leaderboard stand-in listening on http://{host}:{port}")
+    print(f"  SUPABASE_URL=http://{host}:{port}")
+    print(f"  SUPABASE_KEY={DEMO_KEY}")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--db", default="leaderboard_server.db")
+    parser.add_argument(
+        "--verify", action="store_true", help="check each score against its replay"
+    )
+    parser.add_argument("--workers", type=int, help="verification processes")
+    args = parser.parse_args()
+
+    verifier = None
+    if args.verify:
+        # Imported lazily: it pulls in the whole game
+        from verify_replays import VerificationPool
+
+        verifier = VerificationPool(args.workers)
+
+    server = serve(args.host, args.port, args.db, verifier)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if verifier is not None:
+            verifier.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,92 @@
+import time
+
+IMPORT_STARTED = time.perf_counter()  # Reported by --startup-profile
+
 import pygame
 import random
 import asyncio
+import base64
+import collections
+import concurrent.futures
+import functools
 import os
 import sys
-from PIL import Image
 import numpy as np
 import math
+import json
+import sqlite3
+import struct
+import threading
+import uuid
+import zlib
 from dotenv import load_dotenv
 import re
 import pygame.mixer
 
-# Try to import Supabase, but don't fail if it's not available in browser
-try:
-    from supabase import create_client, Client
-
-    SUPABASE_AVAILABLE = True
-except ImportError:
-    SUPABASE_AVAILABLE = False
-
 # Detect if running in browser via Pygbag
 IN_BROWSER = "__EMSCRIPTEN__" in sys.modules or "pygbag" in sys.modules
 
-# Load environment variables
-load_dotenv()
-
-# Initialize Supabase client if available
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_KEY")
-
-# Create a placeholder if environment variables aren't set or in browser
-if not SUPABASE_AVAILABLE or not supabase_url or not supabase_key:
-    print(
-        "Warning: Supabase credentials not found or not available. Using offline mode."
-    )
-    supabase = None
-else:
-    supabase = create_client(supabase_url, supabase_key)
-
-# Initialize Pygame
-pygame.init()
+# Nothing below touches the display, mixer, network or disk on import.
+# init_game() sets these up, so tools and the headless simulation can import
+# the game logic cheaply.
+supabase = None  # Created by load_config() when credentials are available
+screen = None  # Game-resolution surface the menus are drawn into, see init_display()
+window = None  # Display surface; the same surface as screen at WINDOW_SCALE 1
+world_surface = None  # In-game world render target at RENDER_SCALE of the window
+score_outbox = None  # Opened by init_storage()
+leaderboard_store = None  # Opened by init_storage()
+asset_loader = None  # Started by start_asset_loading()
+voice_manager = None  # Created by initialize_sound_system()
+music_streamer = None  # Created by create_procedural_music()
+startup_phases = []  # (phase, seconds) for each init step that has run
+
+
+def load_config():
+    """Load environment variables and connect to Supabase if possible."""
+    global supabase, SCORE_VERIFICATION, WINDOW_SCALE, RENDER_SCALE, SMOOTH_SCALING
+    global SIMULATION_THREAD, SIMULATION_PROCESS
+
+    load_dotenv()
+    SCORE_VERIFICATION = os.getenv("SCORE_VERIFICATION", "").lower() in ("1", "true")
+    WINDOW_SCALE = float(os.getenv("WINDOW_SCALE", WINDOW_SCALE))
+    RENDER_SCALE = float(os.getenv("RENDER_SCALE", RENDER_SCALE))
+    SMOOTH_SCALING = os.getenv("SMOOTH_SCALING", "").lower() in ("1", "true")
+    SIMULATION_THREAD = not IN_BROWSER and os.getenv(
+        "SIMULATION_THREAD", ""
+    ).lower() in ("1", "true")
+    SIMULATION_PROCESS = not IN_BROWSER and os.getenv(
+        "SIMULATION_PROCESS", ""
+    ).lower() in ("1", "true")
+    supabase_url = os.getenv("SUPABASE_URL")
+    supabase_key = os.getenv("SUPABASE_KEY")
+
+    # Try to import Supabase, but don't fail if it's not available in browser
+    try:
+        from supabase import create_client
+    except ImportError:
+        create_client = None
+
+    # Use offline mode if environment variables aren't set or in browser
+    if create_client is None or not supabase_url or not supabase_key:
+        print(
+            "Warning: Supabase credentials not found or not available. Using offline mode."
+        )
+        supabase = None
+    else:
+        supabase = create_client(supabase_url, supabase_key)
 
 
 # Modify the sound system initialization
 def initialize_sound_system():
     """Initialize the sound system with browser compatibility."""
-    global SOUND_ENABLED
+    global SOUND_ENABLED, voice_manager
 
     try:
         pygame.mixer.init()
         if not IN_BROWSER:
             # Only run the test sound in desktop mode
             test_sound_system()
+        voice_manager = VoiceManager()
         SOUND_ENABLED = True
         return True
     except Exception as e:
@@ -59,14 +95,131 @@ def initialize_sound_system():
         return False
 
 
-# Replace pygame.mixer.init() with this call
-initialize_sound_system()
+def init_display():
+    """Open the game window and create the shared fonts."""
+    global screen, window, world_surface, RENDER_ZOOM
+    global SCORE_FONT, GAME_OVER_FONT, HUD_FONT
+
+    window_size = (
+        round(SCREEN_WIDTH * WINDOW_SCALE),
+        round(SCREEN_HEIGHT * WINDOW_SCALE),
+    )
+    window = pygame.display.set_mode(window_size)
+    if window_size == (SCREEN_WIDTH, SCREEN_HEIGHT):
+        screen = window  # Draw straight to the display
+    else:
+        screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+
+    # The world gets its own target at the internal render resolution
+    RENDER_ZOOM = WINDOW_SCALE * RENDER_SCALE
+    render_size = (
+        max(1, round(SCREEN_WIDTH * RENDER_ZOOM)),
+        max(1, round(SCREEN_HEIGHT * RENDER_ZOOM)),
+    )
+    if render_size == window_size:
+        world_surface = window
+    elif render_size == (SCREEN_WIDTH, SCREEN_HEIGHT):
+        world_surface = screen
+    else:
+        world_surface = pygame.Surface(render_size).convert()
+    render_sprite_cache.clear()
+    pygame.display.set_caption("Zombie Shooter")
+    SCORE_FONT = pygame.font.SysFont("arial", 20)
+    GAME_OVER_FONT = pygame.font.SysFont("arial", 40)
+    HUD_FONT = pygame.font.SysFont("arial", round(20 * WINDOW_SCALE))
+
+
+def scale_to_window(surface):
+    """Copy a frame drawn offscreen onto the display, scaling it once."""
+    if surface is not window:
+        scale = (
+            pygame.transform.smoothscale if SMOOTH_SCALING else pygame.transform.scale
+        )
+        scale(surface, window.get_size(), window)
+
+
+def present():
+    """Show the frame drawn into screen."""
+    scale_to_window(screen)
+    pygame.display.flip()
+
+
+def to_game_pos(pos):
+    """Convert a window position (mouse, events) to game coordinates."""
+    return int(pos[0] / WINDOW_SCALE), int(pos[1] / WINDOW_SCALE)
+
+
+def to_window_pos(x, y):
+    """Convert game coordinates to a window position for HUD drawing."""
+    return round(x * WINDOW_SCALE), round(y * WINDOW_SCALE)
+
+
+def to_render(length):
+    """Convert a length in game pixels to world_surface pixels (at least 1)."""
+    return max(1, round(length * RENDER_ZOOM))
+
+
+def render_sprite(image):
+    """Return a sprite resized for world_surface, scaled once and cached."""
+    if RENDER_ZOOM == 1:
+        return image
+    scaled = render_sprite_cache.get(image)
+    if scaled is None:
+        size = (to_render(image.get_width()), to_render(image.get_height()))
+        scale = (
+            pygame.transform.smoothscale if RENDER_ZOOM < 1 else pygame.transform.scale
+        )
+        scaled = render_sprite_cache[image] = scale(image, size)
+    return scaled
+
+
+def init_storage():
+    """Create the assets directory and open the score outbox and leaderboard cache."""
+    global score_outbox, leaderboard_store
 
-# Set up the screen
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    score_outbox = ScoreOutbox()
+    leaderboard_store = LeaderboardStore()
+
+
+def run_startup_phase(name, func):
+    """Run one init step and record how long it took."""
+    start = time.perf_counter()
+    result = func()
+    startup_phases.append((name, time.perf_counter() - start))
+    return result
+
+
+def init_game():
+    """Run every startup step once; later calls do nothing."""
+    if startup_phases:
+        return
+    startup_phases.append(("import", time.perf_counter() - IMPORT_STARTED))
+    run_startup_phase("config", load_config)
+    run_startup_phase("pygame.init", pygame.init)
+    run_startup_phase("sound system", initialize_sound_system)
+    run_startup_phase("display", init_display)
+    run_startup_phase("storage", init_storage)
+
+
+def print_startup_profile():
+    """Print the time spent in each startup phase."""
+    print("Startup profile:")
+    for name, seconds in startup_phases:
+        print(f"  {name:14s} {seconds * 1000:8.1f} ms")
+    total = sum(seconds for _, seconds in startup_phases)
+    print(f"  {'total':14s} {total * 1000:8.1f} ms")
+
+
+# Screen size
 SCREEN_WIDTH = 640
 SCREEN_HEIGHT = 480
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Zombie Shooter")
+
+# World size; the camera shows a screen-sized view of it around the player
+WORLD_WIDTH = SCREEN_WIDTH * 3
+WORLD_HEIGHT = SCREEN_HEIGHT * 3
+BACKGROUND_TILE_WIDTH = 320  # Background tiles, in multiples of the 40px grid
+BACKGROUND_TILE_HEIGHT = 240
 
 # Define colors
 WHITE = (255, 255, 255)
@@ -86,6 +239,103 @@ ZOMBIE_WIDTH = 32
 ZOMBIE_HEIGHT = 32
 ZOMBIE_COLOR = GREEN
 ZOMBIE_SPEED = 2
+ZOMBIE_MAX_SPEED = 4.0  # Cap on the wave speed before a type's speed factor
+
+# Zombie types. "speed" scales the wave's zombie speed, "health" is hits to
+# kill, "score" is awarded for the kill and "harm" is health taken from the
+# player on contact. Spitters stop "range" pixels from the player and spit
+# every "spit_interval" ticks (0 never). A spawn of a type with a "group"
+# above 1 brings that many zombies clustered together.
+ZOMBIE_TYPES = [
+    {
+        "name": "walker",
+        "speed": 1.0,
+        "health": 1,
+        "score": 10,
+        "size": 32,
+        "harm": 25,
+        "range": 0,
+        "spit_interval": 0,
+        "group": 1,
+        "tint": (255, 255, 255),
+    },
+    {
+        "name": "runner",
+        "speed": 1.25,
+        "health": 1,
+        "score": 15,
+        "size": 28,
+        "harm": 15,
+        "range": 0,
+        "spit_interval": 0,
+        "group": 1,
+        "tint": (255, 210, 120),
+    },
+    {
+        "name": "tank",
+        "speed": 0.6,
+        "health": 5,
+        "score": 50,
+        "size": 48,
+        "harm": 50,
+        "range": 0,
+        "spit_interval": 0,
+        "group": 1,
+        "tint": (140, 140, 255),
+    },
+    {
+        "name": "spitter",
+        "speed": 0.8,
+        "health": 2,
+        "score": 25,
+        "size": 32,
+        "harm": 25,
+        "range": 180,
+        "spit_interval": 120,
+        "group": 1,
+        "tint": (170, 255, 90),
+    },
+    {
+        "name": "swarm",
+        "speed": 1.2,
+        "health": 1,
+        "score": 5,
+        "size": 20,
+        "harm": 10,
+        "range": 0,
+        "spit_interval": 0,
+        "group": 4,
+        "tint": (255, 140, 140),
+    },
+]
+# The same stats as parallel arrays indexed by type id, for vectorized lookups
+ZOMBIE_STATS = {
+    stat: np.array([kind[stat] for kind in ZOMBIE_TYPES])
+    for stat in ZOMBIE_TYPES[0]
+    if stat not in ("name", "tint")
+}
+ZOMBIE_TYPE_IDS = {kind["name"]: i for i, kind in enumerate(ZOMBIE_TYPES)}
+# Starting reload: spitters may spit straight away, the rest never
+NEVER_TICK = 2**62
+ZOMBIE_FIRST_SPIT = np.where(ZOMBIE_STATS["spit_interval"] > 0, 0, NEVER_TICK)
+ZOMBIE_MAX_SIZE = max(kind["size"] for kind in ZOMBIE_TYPES)
+ZOMBIE_GROUP_SPREAD = 24  # Pixels a group's zombies are scattered around its spawn
+
+# Relative weights of each zombie type spawned from a wave on, until the next
+# entry takes over
+WAVE_COMPOSITION = [
+    (1, {"walker": 1}),
+    (2, {"walker": 4, "runner": 1}),
+    (3, {"walker": 4, "runner": 2, "swarm": 1}),
+    (5, {"walker": 6, "runner": 2, "swarm": 2, "spitter": 1}),
+    (7, {"walker": 5, "runner": 3, "swarm": 2, "spitter": 1, "tank": 1}),
+]
+
+# Spitter projectiles, the size of a bullet
+SPIT_HARM = 10  # Health taken from the player by a hit
+SPIT_SPEED = 4
+SPIT_LIFETIME = 120  # Ticks before a spit that missed disappears
+SPIT_COLOR = (120, 255, 60)
 
 # Bullet settings
 BULLET_WIDTH = 4
@@ -95,8 +345,20 @@ BULLET_SPEED = 10
 
 # Game settings
 FPS = 60
-SCORE_FONT = pygame.font.SysFont("arial", 20)
-GAME_OVER_FONT = pygame.font.SysFont("arial", 40)
+SCORE_FONT = None  # Fonts need pygame.init(), see init_display()
+GAME_OVER_FONT = None
+HUD_FONT = None  # SCORE_FONT sized for the window, for the in-game HUD
+
+# Render scaling: gameplay coordinates are always SCREEN_WIDTH x SCREEN_HEIGHT
+# and the window is WINDOW_SCALE times that size. The in-game world is drawn
+# at RENDER_SCALE of the window's resolution and scaled up to it once per
+# frame, so 0.5 draws a quarter of the pixels. The in-game HUD is drawn at
+# the window's native resolution; menus are drawn at game resolution.
+WINDOW_SCALE = 1.0  # Set from the environment by load_config()
+RENDER_SCALE = 1.0  # Set from the environment by load_config()
+RENDER_ZOOM = 1.0  # world_surface pixels per game pixel, set by init_display()
+SMOOTH_SCALING = False  # Filter the upscale with smoothscale; set by load_config()
+render_sprite_cache = {}  # Source sprite -> copy sized for world_surface
 
 # Image paths
 ASSETS_DIR = "assets"
@@ -109,7 +371,7 @@ BACKGROUND_IMG = os.path.join(ASSETS_DIR, "background.png")
 AI_ASSISTANT_COOLDOWN = 600  # 10 seconds at 60 FPS
 AI_ASSISTANT_DURATION = 300  # 5 seconds of assistance
 AI_ASSISTANT_COLOR = (0, 200, 255)  # Bright blue for AI elements
-ROCK_COUNT = 8  # Fewer rocks
+ROCK_COUNT = 8  # Rocks per screen-sized area of the world
 SMALL_ROCK_COUNT = 15  # Add smaller decorative rocks that don't block movement
 POWERUP_TYPES = [
     {"name": "AI Assistant", "color": (0, 200, 255), "duration": 300},
@@ -117,9 +379,205 @@ POWERUP_TYPES = [
     {"name": "Shield", "color": (200, 0, 255), "duration": 240},
     {"name": "Rapid Fire", "color": (255, 50, 50), "duration": 200},
 ]
+POWERUP_ORB_SIZE = 40  # Square a power-up orb and its largest glow fit in
+
+# Simulation level-of-detail settings for zombies far from the player.
+# Each tier is (max distance from the player, update every N ticks).
+SIM_LOD_TIERS = [
+    (200, 1),  # Close zombies get a full update every tick
+    (400, 2),  # Mid-range zombies update every other tick
+    (float("inf"), 4),  # Distant zombies update every 4th tick
+]
+
+# Wave spawn scheduler limits
+MAX_SPAWNS_PER_TICK = 2  # Zombies released from the wave plan in a single tick
+MAX_LIVE_ZOMBIES = 400  # Hard limit on zombies alive at once
+
+# Visual effect animation lengths, in frames
+BLOOD_SPLATTER_FRAMES = 5
+EXPLOSION_FRAMES = 6
+
+# Entity components: (dtype, values per entity). Each archetype below stores
+# one dense column per component, with a row per live entity.
+COMPONENTS = {
+    "position": (np.float64, 2),  # World x, y
+    "velocity": (np.float64, 2),  # Pixels moved per tick
+    "collider": (np.float64, 2),  # Width, height of the hit box
+    "speed": (np.float64, 1),  # Pixels per tick when seeking the player
+    "health": (np.int32, 1),  # Hits left; the entity dies at 0
+    "damage": (np.int32, 1),  # Health taken from whatever it hits
+    "harm": (np.int32, 1),  # Health taken from the player on contact
+    "kind": (np.int8, 1),  # Index into ZOMBIE_TYPES
+    "reload": (np.int64, 1),  # Tick from which it can spit again, or NEVER_TICK
+    "lod": (np.int64, 2),  # SimulationLOD slot, last updated tick
+    "color": (np.uint8, 3),
+    "sprite": (np.int16, 1),  # Animation frame, or index into POWERUP_TYPES
+    "animation": (np.int32, 3),  # Frames, ticks per frame, ticks on this frame
+    "lifetime": (np.int64, 1),  # Tick at the end of which the entity is removed
+}
 
-# Create assets directory if it doesn't exist
-os.makedirs(ASSETS_DIR, exist_ok=True)
+# Entity kinds and the components they are made of, with the value each
+# component starts at unless the spawn sets it
+ARCHETYPES = {
+    "zombie": {
+        "position": 0,  # Top-left corner
+        "collider": (ZOMBIE_WIDTH, ZOMBIE_HEIGHT),
+        "speed": ZOMBIE_SPEED,
+        "health": 1,
+        "harm": 25,
+        "kind": 0,
+        "reload": NEVER_TICK,
+        "lod": 0,
+    },
+    "bullet": {
+        "position": 0,  # Top-left corner; hits count where this point lands
+        "velocity": 0,
+        "collider": (BULLET_WIDTH, BULLET_HEIGHT),
+        "damage": 1,
+        "color": BULLET_COLOR,
+        "lifetime": 0,
+    },
+    "spit": {
+        "position": 0,  # Top-left corner
+        "velocity": 0,
+        "collider": (BULLET_WIDTH, BULLET_HEIGHT),
+        "harm": SPIT_HARM,
+        "color": SPIT_COLOR,
+        "lifetime": 0,
+    },
+    "powerup": {
+        "position": 0,  # Centre
+        "collider": (40, 40),  # Picked up when the player's centre is inside
+        "sprite": 0,
+    },
+    "blood_splatter": {
+        "position": 0,  # Centre
+        "sprite": 0,
+        "animation": (BLOOD_SPLATTER_FRAMES, 3, 0),
+    },
+    "explosion": {
+        "position": 0,  # Centre
+        "sprite": 0,
+        "animation": (EXPLOSION_FRAMES, 2, 0),
+    },
+}
+ARCHETYPE_CAPACITY = 64  # Rows allocated up front; columns double when full
+BROAD_PHASE_PAIRS = 4096  # Above this many target-shot pairs, cull shots first
+
+# Gameplay events the systems emit during a tick, and the sound each type
+# plays. Events with a position also carry one value each.
+GAME_EVENTS = {
+    "shot": "shoot",
+    "hit": "zombie_hit",  # Zombie centres; values are the damage dealt
+    "impact": None,  # Where projectiles struck; values are the damage dealt
+    "kill": None,  # Zombie centres; values are the score for each kill
+    "damage": "player_damage",  # Where the player was touched; health lost
+    "block": "shield_hit",  # Where the shield was touched; score bonus
+    "pickup": "powerup",
+    "wave": "wave_start",
+    "game_over": "game_over",
+}
+# Effect archetype started at each position of an event type
+EVENT_EFFECTS = {
+    "hit": "blood_splatter",
+    "impact": "explosion",
+    "damage": "blood_splatter",
+    "block": "blood_splatter",
+}
+SHIELD_BLOCK_BONUS = 5  # Score for each zombie the shield absorbs; spit scores 0
+
+# Render level-of-detail settings for dense hordes
+RENDER_LOD_CELL_SIZE = 32  # Spatial grid cell size in pixels (one zombie wide)
+RENDER_LOD_MIN_COUNT = 4  # Zombies in one cell before it is drawn as a crowd
+RENDER_LOD_MAX_SCALE = 2.0  # Largest crowd impostor size relative to a zombie
+
+# Adaptive quality tiers, from full detail down to the cheapest rendering.
+# "max_effects" caps live blood splatters and explosions (None for no cap) and
+# "effect_step" is how many animation frames effects advance per tick.
+QUALITY_TIERS = [
+    {
+        "name": "high",
+        "glows": True,
+        "rock_pulse": True,
+        "max_effects": None,
+        "effect_step": 1,
+    },
+    {
+        "name": "medium",
+        "glows": True,
+        "rock_pulse": False,
+        "max_effects": 30,
+        "effect_step": 1,
+    },
+    {
+        "name": "low",
+        "glows": False,
+        "rock_pulse": False,
+        "max_effects": 15,
+        "effect_step": 2,
+    },
+    {
+        "name": "minimal",
+        "glows": False,
+        "rock_pulse": False,
+        "max_effects": 5,
+        "effect_step": 3,
+    },
+]
+QUALITY_WINDOW = 90  # Frames of work time the governor looks at
+QUALITY_PERCENTILE = 90  # Percentile of the window compared with the frame budget
+QUALITY_STEP_DOWN = 0.9  # Drop a tier above this share of the budget
+QUALITY_STEP_UP = 0.5  # Raise a tier only below this share of the budget
+QUALITY_HOLD_FRAMES = 300  # Frames to stay in a tier before stepping back up
+quality_tier = QUALITY_TIERS[0]  # Settings in effect, changed by QualityGovernor
+
+# Leaderboard submission outbox settings
+OUTBOX_PATH = os.path.join(ASSETS_DIR, "score_outbox.json")
+OUTBOX_MAX_BACKOFF = 60  # Longest wait between retries, in seconds
+OUTBOX_KEEP_SENT = 100  # Delivered entries remembered for deduplication
+
+# Local leaderboard cache settings
+LEADERBOARD_DB_PATH = os.path.join(ASSETS_DIR, "leaderboard.db")
+LEADERBOARD_SYNC_PAGE = 1000  # Rows fetched per sync request
+LEADERBOARD_TTL = 60  # Seconds before the cached leaderboard is refreshed
+LEADERBOARD_PAGE_SIZE = 10  # Entries per leaderboard screen page
+LEADERBOARD_RANK_BUCKET = 5  # Score range covered by one rank index bucket
+
+# Score verification: submissions carry an input replay the server re-simulates
+SCORE_VERIFICATION = False  # Set from the environment by load_config()
+REPLAY_VERSION = 3  # Bump whenever a gameplay change alters replay results
+REPLAY_FLAGS = ("fire", "alt_fire", "left", "right", "up", "down")  # Per-tick bits
+REPLAY_AIM_BIT = 1 << 7  # Set on ticks that shot; an aim point follows
+MAX_REPLAY_TICKS = 30 * 60 * FPS  # Longest run (30 minutes) the server re-simulates
+
+# World saves: World.snapshot() packs the whole simulation state into a
+# little-endian blob, and save_world() writes it zlib-compressed
+SAVE_MAGIC = b"ZSAV"
+SAVE_VERSION = 1  # Bump whenever the saved state changes layout
+SAVE_TIMERS = (  # Timers a save keeps, each stored with its index here
+    "wave",
+    "powerup_spawn",
+    "ai_fire",
+    "message",
+    "wave_message",
+) + tuple(kind["name"] for kind in POWERUP_TYPES)
+
+# Threaded simulation: World.step runs on a worker thread at a fixed rate while
+# the main thread handles input and draws the newest RenderSnapshot
+SIMULATION_THREAD = False  # Set from the environment by load_config()
+SIMULATION_MAX_CATCH_UP = 5  # Late ticks run back to back before time is dropped
+INPUT_QUEUE_LENGTH = 64  # Input samples kept for the worker before the oldest go
+
+# Process simulation: the simulation runs in its own process and publishes
+# every tick into shared memory (see SharedWorld) for the game to draw
+SIMULATION_PROCESS = False  # Set from the environment by load_config()
+SHARED_SLOTS = 3  # Enough that the slot being written is never read or shown
+SHARED_MAX_BULLETS = 512  # Per-tick capacities; entities past these aren't drawn
+SHARED_MAX_POWERUPS = 64
+SHARED_MAX_EFFECTS = 256
+SHARED_TEXT_BYTES = 64  # UTF-8 bytes kept of each HUD message
+SHARED_SOUND_RING = 256  # Sound events buffered for the drawing process
+SHARED_START_TIMEOUT = 30  # Seconds to wait for the first published tick
 
 # Sound settings
 SOUND_ENABLED = True  # Allow players to toggle sounds
@@ -139,6 +597,35 @@ SOUND_VOLUME = 0.7  # Default volume (0.0 to 1.0)
 # Add this to the sound settings section
 MUSIC_ENABLED = True
 
+# Procedural music, generated in small chunks while it plays
+MUSIC_CHUNK_SECONDS = 0.1  # Length of each generated buffer; two exist at a time
+MUSIC_BASE_TEMPO = 100  # Beats per minute before the first wave
+MUSIC_MAX_INTENSITY = 8  # Waves past this one sound the same
+MUSIC_ROOT_HZ = 110.0  # A2
+MUSIC_PROGRESSION = [0, 0, 8, 7]  # Root of each bar, in semitones above A
+MUSIC_SCALE = [0, 3, 5, 7, 10, 12]  # Minor pentatonic notes for the arpeggio
+
+# Sound effect voice management
+SOUND_CHANNEL_POOLS = {  # Mixer channels reserved for each priority class
+    "critical": 2,
+    "high": 4,
+    "normal": 10,
+}
+SOUND_PRIORITIES = {  # Priority class of each sound effect
+    "game_over": "critical",
+    "player_damage": "critical",
+    "wave_start": "critical",
+    "shield_hit": "high",
+    "powerup": "high",
+    "shoot": "normal",
+    "zombie_hit": "normal",
+}
+SOUND_MAX_INSTANCES = {"shoot": 3, "zombie_hit": 4}  # Concurrent copies (default 2)
+SOUND_COALESCE_WINDOW = 0.04  # Seconds in which repeats of a sound play only once
+
+# Background asset loading
+ASSET_LOADER_WORKERS = 4  # Threads generating sprites and sounds
+
 
 # Add this function to handle background music
 def play_background_music():
@@ -163,15 +650,126 @@ def play_background_music():
         print(f"Could not play background music: {e}")
 
 
+def procedural_music_chunks(sample_rate, get_intensity, seed=None):
+    """Yield stereo int16 music chunks forever, reading the intensity per chunk."""
+    rng = np.random.default_rng(seed)
+    chunk = int(sample_rate * MUSIC_CHUNK_SECONDS)
+    offsets = np.arange(chunk)
+    arp_pattern = rng.choice(MUSIC_SCALE, 16)  # Semitones for each sixteenth
+    step_pos = 0.0  # Sixteenth notes played so far
+    bass_phase = 0.0  # Oscillator phases carry over between chunks
+    arp_phase = 0.0
+
+    while True:
+        intensity = min(MUSIC_MAX_INTENSITY, get_intensity())
+        tempo = MUSIC_BASE_TEMPO + 6 * intensity
+        rate = tempo / 60 * 4 / sample_rate  # Sixteenths per sample
+
+        steps = step_pos + offsets * rate
+        step_pos += chunk * rate
+        index = steps.astype(np.int64)
+        in_step = steps - index  # 0..1 within the current sixteenth
+        in_beat = (steps % 4) / 4  # 0..1 within the current beat
+
+        # Chord root changes every bar
+        bar = (index // 16) % len(MUSIC_PROGRESSION)
+        root = MUSIC_ROOT_HZ * 2 ** (np.take(MUSIC_PROGRESSION, bar) / 12)
+
+        # Bass: one plucked note per beat
+        phases = bass_phase + np.cumsum(2 * np.pi * root / sample_rate)
+        bass_phase = phases[-1] % (2 * np.pi)
+        mix = 0.35 * np.sin(phases) * np.exp(-3 * in_beat)
+
+        # Kick drum on every beat from the first wave
+        if intensity >= 1:
+            beat_seconds = in_beat * 4 / (rate * sample_rate)
+            kick = np.sin(2 * np.pi * 55 * beat_seconds) * np.exp(-30 * beat_seconds)
+            mix += 0.4 * kick
+
+        # Arpeggio on every sixteenth, louder as the waves build
+        if intensity >= 2:
+            notes = root * 2 * 2 ** (np.take(arp_pattern, index % 16) / 12)
+            phases = arp_phase + np.cumsum(2 * np.pi * notes / sample_rate)
+            arp_phase = phases[-1] % (2 * np.pi)
+            level = 0.08 + 0.02 * intensity
+            mix += level * np.sign(np.sin(phases)) * np.exp(-8 * in_step)
+
+        # Off-beat hi-hats in the later waves
+        if intensity >= 4:
+            hats = rng.standard_normal(chunk) * np.exp(-40 * in_step)
+            mix += 0.05 * np.where(index % 2 == 1, hats, 0.0)
+
+        # Convert to 16-bit stereo like the placeholder sounds
+        mono = (np.clip(mix, -1.0, 1.0) * 32767 * 0.8).astype(np.int16)
+        yield np.column_stack((mono, mono))
+
+
+# Streams generated music into a dedicated mixer channel
+class MusicStreamer:
+    def __init__(self, sample_rate):
+        """Take a channel of our own beyond the sound effect pools."""
+        index = pygame.mixer.get_num_channels()
+        pygame.mixer.set_num_channels(index + 1)
+        pygame.mixer.set_reserved(index + 1)
+        self.channel = pygame.mixer.Channel(index)
+        self.channel.set_volume(SOUND_VOLUME * 0.5)  # Lower volume for music
+        self.intensity = 0  # Follows current_wave during a game
+        self.chunks = procedural_music_chunks(sample_rate, lambda: self.intensity)
+        self.thread = None
+        self.running = False
+
+        # Metrics
+        self.chunks_played = 0
+        self.underruns = 0  # Times the channel ran dry before a refill
+
+    def next_sound(self):
+        self.chunks_played += 1
+        return pygame.sndarray.make_sound(next(self.chunks))
+
+    def feed(self):
+        """Keep one chunk playing and the next one queued behind it."""
+        if not self.channel.get_busy():
+            if self.chunks_played:
+                self.underruns += 1
+            self.channel.play(self.next_sound())
+        if self.channel.get_queue() is None:
+            self.channel.queue(self.next_sound())
+
+    def start(self):
+        """Play the first chunk now and keep the queue topped up in the background."""
+        self.feed()
+        if self.thread is None or not self.thread.is_alive():
+            self.running = True
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()  # Never touch the mixer while it shuts down
+        self.channel.stop()
+
+    def run(self):
+        while self.running:
+            self.feed()
+            time.sleep(MUSIC_CHUNK_SECONDS / 4)
+
+
 # Simplify the procedural music for browser compatibility
 def create_procedural_music():
-    """Create simple procedural background music with browser compatibility."""
+    """Stream procedural background music with browser compatibility."""
+    global music_streamer
+
     try:
         if IN_BROWSER:
             print("Skipping procedural music in browser mode")
             return
 
-        # Rest of your existing procedural music code...
+        if music_streamer is None:
+            sample_rate = pygame.mixer.get_init()[0]
+            music_streamer = MusicStreamer(sample_rate)
+            pygame.register_quit(music_streamer.stop)  # Before the mixer closes
+        music_streamer.start()
     except Exception as e:
         print(f"Could not create procedural music: {e}")
 
@@ -202,69 +800,111 @@ def create_placeholder_sound():
         return None
 
 
-# Modify the load_sounds function to properly load existing sound files
-def load_sounds():
-    """Load all game sound effects with improved error handling."""
-    global SOUNDS, SOUND_ENABLED
+# Expected sound files
+SOUND_FILES = {
+    "shoot": "shoot.wav",
+    "zombie_hit": "zombie_hit.wav",
+    "player_damage": "player_damage.wav",
+    "game_over": "game_over.wav",
+    "powerup": "powerup.wav",
+    "wave_start": "wave_start.wav",
+    "shield_hit": "shield_hit.wav",
+}
+
 
-    # Create sounds directory if it doesn't exist
+def load_sound(sound_name):
+    """Load one sound effect, or a placeholder; returns True if the file loaded."""
     sounds_dir = os.path.join(ASSETS_DIR, "sounds")
     os.makedirs(sounds_dir, exist_ok=True)
+    filename = SOUND_FILES[sound_name]
+    file_path = os.path.join(sounds_dir, filename)
 
-    # List of expected sound files
-    sound_files = {
-        "shoot": "shoot.wav",
-        "zombie_hit": "zombie_hit.wav",
-        "player_damage": "player_damage.wav",
-        "game_over": "game_over.wav",
-        "powerup": "powerup.wav",
-        "wave_start": "wave_start.wav",
-        "shield_hit": "shield_hit.wav",
-    }
-
-    # Try to load each sound individually
-    loaded_count = 0
-    missing_count = 0
-
-    for sound_name, filename in sound_files.items():
-        file_path = os.path.join(sounds_dir, filename)
-
-        if os.path.exists(file_path):
-            # File exists, try to load it
-            try:
-                SOUNDS[sound_name] = pygame.mixer.Sound(file_path)
-                SOUNDS[sound_name].set_volume(SOUND_VOLUME)
-                print(f"Successfully loaded sound: {sound_name} from {file_path}")
-                loaded_count += 1
-            except Exception as e:
-                print(f"Error loading sound {sound_name} from {file_path}: {e}")
-                SOUNDS[sound_name] = create_placeholder_sound()
-                print(f"Using placeholder for {sound_name}")
-        else:
-            # File doesn't exist, use placeholder
-            print(f"Sound file missing: {filename}")
+    if os.path.exists(file_path):
+        # File exists, try to load it
+        try:
+            sound = pygame.mixer.Sound(file_path)
+            sound.set_volume(SOUND_VOLUME)
+            SOUNDS[sound_name] = sound
+            print(f"Successfully loaded sound: {sound_name} from {file_path}")
+            return True
+        except Exception as e:
+            print(f"Error loading sound {sound_name} from {file_path}: {e}")
             SOUNDS[sound_name] = create_placeholder_sound()
-            missing_count += 1
-
-    # Print summary
-    if loaded_count > 0:
-        print(f"Successfully loaded {loaded_count} sound files.")
-
-    if missing_count > 0:
-        print(f"Created placeholders for {missing_count} missing sound files.")
-
-    # Enable sound if we have any sounds (real or placeholder)
-    if any(SOUNDS.values()):
-        SOUND_ENABLED = True
-        print("Sound system enabled.")
+            print(f"Using placeholder for {sound_name}")
     else:
-        SOUND_ENABLED = False
-        print("Sound system disabled - no sounds could be loaded.")
+        # File doesn't exist, use placeholder
+        print(f"Sound file missing: {filename}")
+        SOUNDS[sound_name] = create_placeholder_sound()
+    return False
+
+
+# Plays sound effects on channel pools reserved per priority class
+class VoiceManager:
+    def __init__(self, pools=None):
+        """Carve the mixer's channels into one pool per priority class."""
+        pools = pools if pools is not None else SOUND_CHANNEL_POOLS
+        pygame.mixer.set_num_channels(sum(pools.values()))
+        pygame.mixer.set_reserved(sum(pools.values()))  # Keep Sound.play() off them
+
+        self.pools = {}  # Priority class -> list of channel indices
+        next_channel = 0
+        for priority, count in pools.items():
+            self.pools[priority] = list(range(next_channel, next_channel + count))
+            next_channel += count
+        self.channels = [pygame.mixer.Channel(i) for i in range(next_channel)]
+        self.voices = [None] * next_channel  # (sound name, start time) per channel
+        self.last_played = {}  # Sound name -> time of the last accepted trigger
+
+        # Metrics
+        self.played = collections.Counter()
+        self.coalesced = collections.Counter()
+        self.dropped = collections.Counter()
+        self.stolen = collections.Counter()
+
+    def play(self, sound_name, sound):
+        """Play a sound, unless it was just triggered or has too many voices."""
+        now = time.monotonic()
+        last = self.last_played.get(sound_name)
+        if last is not None and now - last < SOUND_COALESCE_WINDOW:
+            # Merge bursts of the same trigger into one voice
+            self.coalesced[sound_name] += 1
+            return False
+
+        priority = SOUND_PRIORITIES.get(sound_name, "normal")
+        pool = self.pools[priority]
+        playing = [i for i in pool if self.channels[i].get_busy()]
+        instances = [i for i in playing if self.voices[i][0] == sound_name]
+
+        if len(instances) >= SOUND_MAX_INSTANCES.get(sound_name, 2):
+            # Restart the oldest copy instead of stacking another one
+            index = min(instances, key=lambda i: self.voices[i][1])
+        else:
+            free = [i for i in pool if not self.channels[i].get_busy()]
+            if free:
+                index = free[0]
+            elif priority == "normal":
+                self.dropped[sound_name] += 1
+                return False
+            else:
+                # Important cues always play, cutting off the oldest voice
+                index = min(playing, key=lambda i: self.voices[i][1])
+                self.stolen[self.voices[index][0]] += 1
+
+        self.channels[index].play(sound)
+        self.voices[index] = (sound_name, now)
+        self.last_played[sound_name] = now
+        self.played[sound_name] += 1
+        return True
 
-    # Debug: Print the current state of the SOUNDS dictionary
-    print("Current sounds status:")
-    for name, sound in SOUNDS.items():
-        print(f"  - {name}: {'Loaded' if sound is not None else 'None'}")
+    def report(self):
+        """Print per-sound play, coalesce, drop and steal counts."""
+        print("Sound voices:")
+        for name in sorted(set(self.played) | set(self.coalesced) | set(self.dropped)):
+            print(
+                f"  {name:14s} played={self.played[name]:5d} "
+                f"coalesced={self.coalesced[name]:5d} "
+                f"dropped={self.dropped[name]:5d} stolen={self.stolen[name]:5d}"
+            )
 
 
 # Function to play a sound
@@ -282,7 +922,10 @@ def play_sound(sound_name):
         return
 
     try:
-        SOUNDS[sound_name].play()
+        if voice_manager is not None:
+            voice_manager.play(sound_name, SOUNDS[sound_name])
+        else:
+            SOUNDS[sound_name].play()
     except Exception as e:
         print(f"Error playing sound {sound_name}: {e}")
 
@@ -297,16 +940,9 @@ def load_image(path, width, height):
         return None
 
 
-# Create images programmatically
-def initialize_images():
-    global player_img, zombie_img, bullet_img, background_img, blood_splatter_imgs, explosion_imgs, rocks
-
-    # Load sounds and ensure sound directory exists
-    load_sounds()
-    ensure_sound_directory()
-
-    # Start background music
-    play_background_music()
+# Create images programmatically, one asset loading job per image set
+def create_player_image():
+    global player_img
 
     # Create a more detailed player (AI robot with glowing elements)
     player_img = pygame.Surface((PLAYER_WIDTH, PLAYER_HEIGHT), pygame.SRCALPHA)
@@ -346,6 +982,10 @@ def initialize_images():
         pygame.draw.line(player_img, (100, 200, 255), (x, y), (x + 4, y), 1)
         pygame.draw.line(player_img, (100, 200, 255), (x, y), (x, y + 4), 1)
 
+
+def create_zombie_image():
+    global zombie_img, zombie_imgs
+
     # Create a more detailed zombie
     zombie_img = pygame.Surface((ZOMBIE_WIDTH, ZOMBIE_HEIGHT), pygame.SRCALPHA)
 
@@ -388,6 +1028,17 @@ def initialize_images():
         size = random.randint(2, 4)
         pygame.draw.circle(zombie_img, (200, 0, 0, 150), (x, y), size)
 
+    # One sprite per zombie type, scaled to its size and tinted
+    zombie_imgs = []
+    for kind in ZOMBIE_TYPES:
+        image = pygame.transform.scale(zombie_img, (kind["size"], kind["size"]))
+        image.fill(kind["tint"], special_flags=pygame.BLEND_RGB_MULT)
+        zombie_imgs.append(image)
+
+
+def create_bullet_image():
+    global bullet_img
+
     # Create a more impressive bullet (energy projectile)
     bullet_img = pygame.Surface((BULLET_WIDTH * 3, BULLET_HEIGHT * 3), pygame.SRCALPHA)
 
@@ -421,35 +1072,56 @@ def initialize_images():
             2,
         )
 
-    # Create a more detailed background (cyberpunk grid with glow effects)
-    background_img = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-    background_img.fill((5, 7, 15))  # Very dark blue
+
+def create_background_image():
+    global background_tile
+
+    # Create a more detailed background (cyberpunk grid with glow effects),
+    # as one tile repeated across the world
+    width, height = BACKGROUND_TILE_WIDTH, BACKGROUND_TILE_HEIGHT
+    background_tile = pygame.Surface((width, height))
+    background_tile.fill((5, 7, 15))  # Very dark blue
 
     # Draw main grid
-    for x in range(0, SCREEN_WIDTH, 40):
+    for x in range(0, width, 40):
         intensity = 30 + 10 * math.sin(x / 100)  # Pulsing effect
         pygame.draw.line(
-            background_img, (0, intensity, intensity * 2), (x, 0), (x, SCREEN_HEIGHT)
+            background_tile, (0, intensity, intensity * 2), (x, 0), (x, height)
         )
 
-    for y in range(0, SCREEN_HEIGHT, 40):
+    for y in range(0, height, 40):
         intensity = 30 + 10 * math.sin(y / 100)  # Pulsing effect
         pygame.draw.line(
-            background_img, (0, intensity, intensity * 2), (0, y), (SCREEN_WIDTH, y)
+            background_tile, (0, intensity, intensity * 2), (0, y), (width, y)
         )
 
     # Add some random glowing nodes at grid intersections
-    for _ in range(15):
-        x = random.randint(0, 16) * 40
-        y = random.randint(0, 12) * 40
+    for _ in range(4):
+        x = random.randint(1, width // 40 - 1) * 40
+        y = random.randint(1, height // 40 - 1) * 40
         size = random.randint(3, 6)
-        pygame.draw.circle(background_img, (0, 150, 255, 150), (x, y), size)
+        pygame.draw.circle(background_tile, (0, 150, 255, 150), (x, y), size)
         # Add glow effect
-        pygame.draw.circle(background_img, (0, 100, 200, 50), (x, y), size * 2)
+        pygame.draw.circle(background_tile, (0, 100, 200, 50), (x, y), size * 2)
+
+
+def draw_background(camera):
+    """Blit only the background tiles that overlap the camera's view."""
+    tile = render_sprite(background_tile)
+    width, height = background_tile.get_size()
+    for tile_x in range(camera.x - camera.x % width, camera.x + SCREEN_WIDTH, width):
+        for tile_y in range(
+            camera.y - camera.y % height, camera.y + SCREEN_HEIGHT, height
+        ):
+            world_surface.blit(tile, camera.to_screen(tile_x, tile_y))
+
+
+def create_blood_splatter_images():
+    global blood_splatter_imgs
 
     # Create blood splatter animation frames
     blood_splatter_imgs = []
-    for i in range(5):
+    for i in range(BLOOD_SPLATTER_FRAMES):
         splatter = pygame.Surface((40, 40), pygame.SRCALPHA)
         num_drops = 5 + i * 3
         for _ in range(num_drops):
@@ -459,9 +1131,13 @@ def initialize_images():
             pygame.draw.circle(splatter, (200, 0, 0, 200 - i * 30), (x, y), size)
         blood_splatter_imgs.append(splatter)
 
+
+def create_explosion_images():
+    global explosion_imgs
+
     # Create explosion animation frames
     explosion_imgs = []
-    for i in range(6):
+    for i in range(EXPLOSION_FRAMES):
         explosion = pygame.Surface((60, 60), pygame.SRCALPHA)
         # Inner bright core
         pygame.draw.circle(
@@ -475,30 +1151,252 @@ def initialize_images():
         pygame.draw.circle(explosion, (200, 50, 0, 150 - i * 20), (30, 30), 15 + i * 6)
         explosion_imgs.append(explosion)
 
-    # Create rocks - all decorative blue rocks now
+
+def create_rocks():
+    global rocks
+
+    # Create rocks - all decorative blue rocks now, spread over the whole world
     rocks = []
+    screens = (WORLD_WIDTH * WORLD_HEIGHT) // (SCREEN_WIDTH * SCREEN_HEIGHT)
 
     # Create medium rocks
-    for _ in range(ROCK_COUNT):
+    for _ in range(ROCK_COUNT * screens):
         size = random.randint(25, 40)
-        x = random.randint(0, SCREEN_WIDTH - size)
-        y = random.randint(0, SCREEN_HEIGHT - size)
+        x = random.randint(0, WORLD_WIDTH - size)
+        y = random.randint(0, WORLD_HEIGHT - size)
         rocks.append(Rock(x, y, size, is_obstacle=False))
 
     # Create small rocks
-    for _ in range(SMALL_ROCK_COUNT):
+    for _ in range(SMALL_ROCK_COUNT * screens):
         size = random.randint(10, 20)
-        x = random.randint(0, SCREEN_WIDTH - size)
-        y = random.randint(0, SCREEN_HEIGHT - size)
+        x = random.randint(0, WORLD_WIDTH - size)
+        y = random.randint(0, WORLD_HEIGHT - size)
         rocks.append(Rock(x, y, size, is_obstacle=False))
 
 
+def start_background_music():
+    # Ensure the sound directory exists, then start the music
+    ensure_sound_directory()
+    play_background_music()
+
+
+# Asset loading jobs as (name, function); each job publishes its own globals
+ASSET_JOBS = [
+    *((f"sound:{name}", functools.partial(load_sound, name)) for name in SOUND_FILES),
+    ("music", start_background_music),
+    ("player", create_player_image),
+    ("zombie", create_zombie_image),
+    ("bullet", create_bullet_image),
+    ("background", create_background_image),
+    ("blood", create_blood_splatter_images),
+    ("explosions", create_explosion_images),
+    ("rocks", create_rocks),
+]
+# Jobs a game needs before it can start; sounds and music can arrive later
+GAMEPLAY_ASSET_JOBS = (
+    "player",
+    "zombie",
+    "bullet",
+    "background",
+    "blood",
+    "explosions",
+    "rocks",
+)
+
+
+# Runs asset jobs on a thread pool so the title screen can show right away
+class AssetLoader:
+    def __init__(self, jobs, report=False):
+        """Submit every job; in the browser they run inline instead."""
+        self.names = [name for name, _ in jobs]
+        self.report = report  # Print job timings once everything is loaded
+        self.lock = threading.Lock()
+        self.timings = {}  # Job name -> seconds, once finished
+        self.started = time.perf_counter()
+        self.futures = {}
+
+        if IN_BROWSER:
+            for name, job in jobs:
+                self.run_job(name, job)
+            return
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=ASSET_LOADER_WORKERS, thread_name_prefix="assets"
+        )
+        for name, job in jobs:
+            self.futures[name] = executor.submit(self.run_job, name, job)
+        executor.shutdown(wait=False)  # Threads exit once the queue is drained
+
+    def run_job(self, name, job):
+        start = time.perf_counter()
+        try:
+            job()
+        except Exception as e:
+            print(f"Asset job {name} failed: {e}")
+        with self.lock:
+            self.timings[name] = time.perf_counter() - start
+            finished = len(self.timings) == len(self.names)
+        if finished and self.report:
+            self.print_report()
+
+    def progress(self):
+        """Fraction of jobs finished, from 0.0 to 1.0."""
+        with self.lock:
+            return len(self.timings) / len(self.names) if self.names else 1.0
+
+    def is_ready(self, names=None):
+        """True once the named jobs (or all jobs) have finished."""
+        with self.lock:
+            return all(name in self.timings for name in names or self.names)
+
+    def wait(self, names=None):
+        """Block until the named jobs (or all jobs) have finished."""
+        concurrent.futures.wait(
+            [self.futures[name] for name in names or self.names if name in self.futures]
+        )
+
+    def print_report(self):
+        elapsed = time.perf_counter() - self.started
+        print(f"Assets loaded in {elapsed * 1000:.1f} ms:")
+        for name, seconds in sorted(self.timings.items(), key=lambda t: -t[1]):
+            print(f"  {name:20s} {seconds * 1000:8.1f} ms")
+
+
+def start_asset_loading(report=False):
+    """Start loading every asset in the background."""
+    global asset_loader
+
+    asset_loader = AssetLoader(ASSET_JOBS, report)
+    return asset_loader
+
+
+def initialize_images():
+    """Load every asset and wait for it to finish."""
+    start_asset_loading().wait()
+
+
+# Hierarchical timer wheel for everything that counts down in ticks
+class Timer:
+    def __init__(self, wheel, expires_at, callback, interval):
+        self.wheel = wheel
+        self.expires_at = expires_at
+        self.callback = callback
+        self.interval = interval  # Reschedule period for repeating timers
+        self.cancelled = False
+        self.fired = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    @property
+    def active(self):
+        return not self.cancelled and not self.fired
+
+    def remaining(self):
+        """Ticks left before the timer fires (0 once it is done)."""
+        if not self.active:
+            return 0
+        return max(0, self.expires_at - self.wheel.now)
+
+
+class TimerWheel:
+    def __init__(self, slots=64, levels=3):
+        """Create a wheel; level n slots each cover slots**n ticks."""
+        self.now = 0
+        self.slots = slots
+        self.levels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.overflow = []  # Timers beyond the last level's range
+
+    def schedule(self, delay, callback=None, repeat=False):
+        """Fire `callback` after `delay` ticks, every `delay` ticks if repeat."""
+        delay = max(1, int(delay))
+        timer = Timer(self, self.now + delay, callback, delay if repeat else None)
+        self.insert(timer)
+        return timer
+
+    def insert(self, timer):
+        delta = timer.expires_at - self.now
+        span = 1
+        for level in self.levels:
+            if delta < span * self.slots:
+                level[(timer.expires_at // span) % self.slots].append(timer)
+                return
+            span *= self.slots
+        self.overflow.append(timer)
+
+    def entries(self):
+        """Return (level, slot, timer) for every pending timer, in the order
+        each slot fires them. The overflow list is level len(levels), slot 0."""
+        entries = []
+        for depth, level in enumerate(self.levels + [[self.overflow]]):
+            for slot, timers in enumerate(level):
+                entries += [(depth, slot, timer) for timer in timers if timer.active]
+        return entries
+
+    def restore(self, now, entries):
+        """Reset the wheel to tick `now`, holding `entries` laid out as entries()
+        returned them, so timers due on the same tick keep their order."""
+        self.now = now
+        for level in self.levels:
+            for slot in level:
+                slot.clear()
+        self.overflow.clear()
+        for depth, slot, timer in entries:
+            if depth == len(self.levels):
+                self.overflow.append(timer)
+            else:
+                self.levels[depth][slot].append(timer)
+
+    def cascade(self):
+        """Move the timers of each coarser slot that comes up now down a level."""
+        span = self.slots ** len(self.levels)
+        if self.now % span == 0 and self.overflow:
+            pending, self.overflow = self.overflow, []
+            for timer in pending:
+                self.insert(timer)
+        for depth in range(len(self.levels) - 1, 0, -1):
+            span = self.slots**depth
+            if self.now % span == 0:
+                slot = self.levels[depth][(self.now // span) % self.slots]
+                pending = slot[:]
+                slot.clear()
+                for timer in pending:
+                    self.insert(timer)
+
+    def tick(self):
+        """Advance one tick and run every timer due on it."""
+        self.now += 1
+
+        # Cascade coarser levels down when the finer level wraps around; every
+        # coarser span is a multiple of the first level's
+        if self.now % self.slots == 0:
+            self.cascade()
+
+        due = self.levels[0][self.now % self.slots]
+        if not due:
+            return self.now
+
+        fired = due[:]
+        due.clear()
+        for timer in fired:
+            if timer.cancelled:
+                continue
+            if timer.interval:
+                timer.expires_at = self.now + timer.interval
+                self.insert(timer)
+            else:
+                timer.fired = True
+            if timer.callback:
+                timer.callback()
+
+        return self.now
+
+
 # Player class
 class Player:
-    def __init__(self):
-        """Initialize the player at the center of the screen."""
-        self.x = SCREEN_WIDTH // 2 - PLAYER_WIDTH // 2
-        self.y = SCREEN_HEIGHT // 2 - PLAYER_HEIGHT // 2
+    def __init__(self, timers=None):
+        """Initialize the player at the center of the world."""
+        self.x = WORLD_WIDTH // 2 - PLAYER_WIDTH // 2
+        self.y = WORLD_HEIGHT // 2 - PLAYER_HEIGHT // 2
         self.health = 100
         self.score = 0
         self.direction = "right"  # Default direction player is facing
@@ -506,12 +1404,13 @@ class Player:
         self.mouse_y = 0
         self.angle = 0  # Angle to mouse cursor
 
-        # Power-up states
+        # Power-up states, each an expiry Timer while active
+        self.timers = timers if timers is not None else TimerWheel()
         self.active_powerups = {
-            "AI Assistant": 0,
-            "Speed Boost": 0,
-            "Shield": 0,
-            "Rapid Fire": 0,
+            "AI Assistant": None,
+            "Speed Boost": None,
+            "Shield": None,
+            "Rapid Fire": None,
         }
         self.base_speed = PLAYER_SPEED
         self.speed = self.base_speed
@@ -539,206 +1438,407 @@ class Player:
             self.direction = "left"
 
     def move(self, direction):
-        """Move the player in four directions within screen bounds."""
+        """Move the player in four directions within world bounds."""
         if direction == "left" and self.x > 0:
             self.x -= PLAYER_SPEED
-        elif direction == "right" and self.x < SCREEN_WIDTH - PLAYER_WIDTH:
+        elif direction == "right" and self.x < WORLD_WIDTH - PLAYER_WIDTH:
             self.x += PLAYER_SPEED
         elif direction == "up" and self.y > 0:
             self.y -= PLAYER_SPEED
-        elif direction == "down" and self.y < SCREEN_HEIGHT - PLAYER_HEIGHT:
+        elif direction == "down" and self.y < WORLD_HEIGHT - PLAYER_HEIGHT:
             self.y += PLAYER_SPEED
 
         self.direction = direction
 
-    def shoot(self):
-        """Create a bullet at the player's position aimed at the mouse cursor."""
-        bullet_x = self.x + PLAYER_WIDTH // 2 - BULLET_WIDTH // 2
-        bullet_y = self.y + PLAYER_HEIGHT // 2 - BULLET_HEIGHT // 2
-
-        # Create multiple bullets if Rapid Fire is active
-        bullets = []
-        if self.active_powerups["Rapid Fire"] > 0:
-            # Create 3 bullets with slight spread
-            for i in range(-1, 2):
-                spread_angle = self.angle + (i * 0.1)  # Small angle spread
-                bullets.append(Bullet(bullet_x, bullet_y, spread_angle))
-        else:
-            bullets.append(Bullet(bullet_x, bullet_y, self.angle))
-
-        return bullets
-
-    def draw(self):
-        """Draw the player using the player image."""
-        # Create a rotated version based on direction
-        if self.direction == "right":
-            rotated_img = player_img
-        elif self.direction == "left":
-            rotated_img = pygame.transform.flip(player_img, True, False)
-        elif self.direction == "up":
-            rotated_img = pygame.transform.rotate(player_img, 90)
-        else:  # down
-            rotated_img = pygame.transform.rotate(player_img, -90)
-
-        screen.blit(rotated_img, (self.x, self.y))
-
-    def apply_powerup(self, powerup):
-        self.active_powerups[powerup.name] = powerup.duration
+    def shot_angles(self):
+        """Return the angles of the bullets one shot fires at the mouse cursor."""
+        # Fire 3 bullets with a slight spread if Rapid Fire is active
+        if self.has_powerup("Rapid Fire"):
+            return [self.angle + i * 0.1 for i in range(-1, 2)]
+        return [self.angle]
+
+    def has_powerup(self, name):
+        return self.active_powerups[name] is not None
+
+    def powerup_remaining(self, name):
+        """Ticks left on a power-up, 0 if it is not active."""
+        timer = self.active_powerups[name]
+        return timer.remaining() if timer is not None else 0
+
+    def apply_powerup(self, kind):
+        """Activate a POWERUP_TYPES entry and return the message to show."""
+        name = kind["name"]
+        # Picking up the same power-up again restarts its duration
+        if self.active_powerups[name] is not None:
+            self.active_powerups[name].cancel()
+        self.active_powerups[name] = self.timers.schedule(
+            kind["duration"], lambda: self.expire_powerup(name)
+        )
 
         # Apply immediate effects
-        if powerup.name == "Speed Boost":
+        if name == "Speed Boost":
             self.speed = self.base_speed * 1.5
 
-        return f"{powerup.name} activated!"
-
-    def update_powerups(self):
-        # Update all active power-ups
-        for name in self.active_powerups:
-            if self.active_powerups[name] > 0:
-                self.active_powerups[name] -= 1
+        return f"{name} activated!"
 
-                # Handle expiration
-                if self.active_powerups[name] <= 0:
-                    if name == "Speed Boost":
-                        self.speed = self.base_speed
+    def expire_powerup(self, name):
+        """Called by the timer wheel when a power-up runs out."""
+        self.active_powerups[name] = None
+        if name == "Speed Boost":
+            self.speed = self.base_speed
 
     def take_damage(self, amount):
         """Reduce player health when hit by a zombie."""
         # If Shield is active, don't take damage
-        if self.active_powerups["Shield"] > 0:
-            play_sound("shield_hit")
-            return
+        if self.has_powerup("Shield"):
+            return False
 
         self.health -= amount
-        play_sound("player_damage")
 
         if self.health <= 0:
             self.health = 0
-            play_sound("game_over")
             return True  # Player is dead
         return False
 
 
-# Zombie class
-class Zombie:
-    def __init__(self):
-        """Initialize a zombie at a random edge of the screen."""
-        # Randomly choose which edge to spawn from
-        edge = random.choice(["top", "right", "bottom", "left"])
-
-        if edge == "top":
-            self.x = random.randint(0, SCREEN_WIDTH - ZOMBIE_WIDTH)
-            self.y = -ZOMBIE_HEIGHT
-        elif edge == "right":
-            self.x = SCREEN_WIDTH
-            self.y = random.randint(0, SCREEN_HEIGHT - ZOMBIE_HEIGHT)
-        elif edge == "bottom":
-            self.x = random.randint(0, SCREEN_WIDTH - ZOMBIE_WIDTH)
-            self.y = SCREEN_HEIGHT
-        else:  # left
-            self.x = -ZOMBIE_WIDTH
-            self.y = random.randint(0, SCREEN_HEIGHT - ZOMBIE_HEIGHT)
-
-        self.speed = ZOMBIE_SPEED  # Default speed that can be modified
-
-    def move(self, target_x, target_y):
-        # Calculate direction to player
-        dx = target_x - (self.x + ZOMBIE_WIDTH // 2)
-        dy = target_y - (self.y + ZOMBIE_HEIGHT // 2)
-
-        # Normalize the direction
-        length = max(0.1, math.sqrt(dx * dx + dy * dy))
-        dx /= length
-        dy /= length
-
-        # Move towards player with the zombie's current speed
-        self.x += dx * self.speed
-        self.y += dy * self.speed
-
-        # Update direction for animation
-        if abs(dx) > abs(dy):
-            self.direction = "right" if dx > 0 else "left"
-        else:
-            self.direction = "down" if dy > 0 else "up"
-
-    def draw(self):
-        """Draw the zombie using the zombie image."""
-        screen.blit(zombie_img, (self.x, self.y))
-
+def draw_player(x, y, direction, camera):
+    """Draw the player image facing `direction`."""
+    # Create a rotated version based on direction
+    image = render_sprite(player_img)
+    if direction == "right":
+        rotated_img = image
+    elif direction == "left":
+        rotated_img = pygame.transform.flip(image, True, False)
+    elif direction == "up":
+        rotated_img = pygame.transform.rotate(image, 90)
+    else:  # down
+        rotated_img = pygame.transform.rotate(image, -90)
 
-# Bullet class
-class Bullet:
-    def __init__(self, x, y, angle):
-        """Create a bullet at the given position with the given angle."""
-        self.x = x
-        self.y = y
-        self.angle = angle
-        self.speed = BULLET_SPEED
-        self.color = BULLET_COLOR  # Default color, can be changed for AI bullets
+    world_surface.blit(rotated_img, camera.to_screen(x, y))
 
-    def move(self):
-        """Move the bullet in the direction of its angle."""
-        self.x += math.cos(self.angle) * self.speed
-        self.y += math.sin(self.angle) * self.speed
 
-    def draw(self):
-        """Draw the bullet on the screen."""
-        # Use the bullet's color (which might be changed for AI bullets)
-        pygame.draw.rect(
-            screen, self.color, (self.x, self.y, BULLET_WIDTH, BULLET_HEIGHT)
+def wave_composition(wave):
+    """Return the chance of each zombie type id spawning in the given wave."""
+    mix = next(
+        mix for first_wave, mix in reversed(WAVE_COMPOSITION) if wave >= first_wave
+    )
+    weights = np.zeros(len(ZOMBIE_TYPES))
+    for name, weight in mix.items():
+        weights[ZOMBIE_TYPE_IDS[name]] = weight
+    return weights / weights.sum()
+
+
+# Precomputed, evenly released zombie spawns for each wave
+class SpawnScheduler:
+    def __init__(self, seed=None):
+        """Create a scheduler with its own random generator."""
+        self.rng = np.random.default_rng(seed)
+        self.plan_ticks = np.zeros(0, np.int64)
+        self.plan_x = np.zeros(0)
+        self.plan_y = np.zeros(0)
+        self.plan_speed = np.zeros(0)
+        self.plan_kind = np.zeros(0, np.int64)  # Index into ZOMBIE_TYPES
+        self.next_index = 0
+
+        # Metrics
+        self.spawned = 0
+        self.deferred = 0  # Ticks where the caps held back due spawns
+
+    def plan_wave(self, wave, zombies_per_wave, start_tick, duration):
+        """Precompute every spawn of a wave in one vectorized pass."""
+        # Same totals as spawning a batch every `spawn_rate` ticks
+        spawn_rate = max(10, 60 // zombies_per_wave)
+        batch_size = 1 + wave // 3
+        count = (duration // spawn_rate) * batch_size
+
+        # Spread the spawns evenly over the wave instead of in bursts
+        ticks = start_tick + (np.arange(1, count + 1) * duration) // count
+
+        # Pick each spawn's zombie type by the wave's mix
+        kinds = self.rng.choice(len(ZOMBIE_TYPES), count, p=wave_composition(wave))
+        size = ZOMBIE_STATS["size"][kinds]
+
+        # Positions are relative to the view at release time, just past one of
+        # its edges: 0 = top, 1 = right, 2 = bottom, 3 = left
+        edges = self.rng.integers(0, 4, count)
+        along_x = self.rng.integers(0, SCREEN_WIDTH - ZOMBIE_WIDTH + 1, count)
+        along_y = self.rng.integers(0, SCREEN_HEIGHT - ZOMBIE_HEIGHT + 1, count)
+        x = np.select([edges == 1, edges == 3], [SCREEN_WIDTH, -size], along_x)
+        y = np.select([edges == 0, edges == 2], [-size, SCREEN_HEIGHT], along_y)
+
+        # Group types bring several zombies, scattered around the same spot
+        group = ZOMBIE_STATS["group"][kinds]
+        ticks, kinds, x, y = (
+            np.repeat(column, group) for column in (ticks, kinds, x, y)
+        )
+        scatter = self.rng.integers(
+            -ZOMBIE_GROUP_SPREAD, ZOMBIE_GROUP_SPREAD + 1, (len(kinds), 2)
+        )
+        scatter[ZOMBIE_STATS["group"][kinds] == 1] = 0
+        x = x + scatter[:, 0]
+        y = y + scatter[:, 1]
+
+        # Make zombies faster in later waves, then apply each type's factor
+        speeds = min(ZOMBIE_MAX_SPEED, ZOMBIE_SPEED * (1 + wave * 0.1))
+        speeds = speeds * ZOMBIE_STATS["speed"][kinds]
+
+        # Keep anything the caps held back from the previous wave
+        i = self.next_index
+        self.plan_ticks = np.concatenate((self.plan_ticks[i:], ticks))
+        self.plan_x = np.concatenate((self.plan_x[i:], x))
+        self.plan_y = np.concatenate((self.plan_y[i:], y))
+        self.plan_speed = np.concatenate((self.plan_speed[i:], speeds))
+        self.plan_kind = np.concatenate((self.plan_kind[i:], kinds))
+        self.next_index = 0
+
+    def release(self, game_tick, live_count, view_x=0, view_y=0):
+        """Return (x, y, speed, kind) arrays of the zombies due by this tick
+        around the view, respecting the caps, or None when none are due."""
+        start = self.next_index
+        if start == len(self.plan_ticks) or self.plan_ticks[start] > game_tick:
+            return None  # Nothing due this tick
+        budget = min(MAX_SPAWNS_PER_TICK, MAX_LIVE_ZOMBIES - live_count)
+
+        # Release the run of due spawns at the front of the plan, up to the
+        # budget; one more due spawn past it means the caps held it back
+        due = self.plan_ticks[start : start + budget + 1] <= game_tick
+        count = len(due) if due.all() else int(np.argmin(due))
+        if count > budget:
+            self.deferred += 1
+            count = budget
+        end = start + count
+
+        self.next_index = end
+        self.spawned += end - start
+        return (
+            view_x + self.plan_x[start:end],
+            view_y + self.plan_y[start:end],
+            self.plan_speed[start:end],
+            self.plan_kind[start:end],
         )
 
-        # Add a small glow effect for bullets
-        glow_surf = pygame.Surface(
-            (BULLET_WIDTH + 4, BULLET_HEIGHT + 4), pygame.SRCALPHA
+
+# Time-sliced zombie updates based on distance from the player
+class SimulationLOD:
+    def __init__(self, tiers=None):
+        """Create a scheduler using (distance, interval) tiers."""
+        self.tiers = tiers if tiers is not None else SIM_LOD_TIERS
+        self.max_interval = max(interval for _, interval in self.tiers)
+        # Squared tier distances, and each tier's interval with the slowest
+        # one again for anything past the last tier
+        self.tier_limits = np.array([distance**2 for distance, _ in self.tiers])
+        self.tier_intervals = np.array(
+            [interval for _, interval in self.tiers] + [self.max_interval]
         )
-        pygame.draw.rect(
-            glow_surf, (*self.color, 100), (0, 0, BULLET_WIDTH + 4, BULLET_HEIGHT + 4)
+        self.next_slot = 0
+
+        # Metrics
+        self.updates = 0
+        self.skipped = 0
+
+    def assign_slots(self, count):
+        """Hand out update slots round-robin so each tick handles an even slice."""
+        slots = (self.next_slot + np.arange(count)) % self.max_interval
+        self.next_slot = (self.next_slot + count) % self.max_interval
+        return slots
+
+    def intervals_for(self, distance_sq):
+        """Return how many ticks apart entities at these distances should update."""
+        return self.tier_intervals[self.tier_limits.searchsorted(distance_sq)]
+
+    def steps_for(self, lod, game_tick, distance_sq):
+        """Return how many ticks each entity should advance now (0 to skip).
+
+        `lod` holds each entity's (slot, last updated tick) and is updated in
+        place for the entities that advance.
+        """
+        interval = self.intervals_for(distance_sq)
+        elapsed = game_tick - lod[:, 1]
+        # Never let an entity fall further behind than the slowest tier
+        due = ((game_tick + lod[:, 0]) % interval == 0) | (elapsed >= self.max_interval)
+        steps = elapsed * due
+        lod[:, 1] += steps
+
+        updated = int(np.count_nonzero(due))
+        self.updates += updated
+        self.skipped += len(due) - updated
+        return steps
+
+    def skipped_ratio(self):
+        """Fraction of zombie updates that were skipped so far."""
+        total = self.updates + self.skipped
+        return self.skipped / total if total else 0.0
+
+    def report(self):
+        """Print a summary of the skipped updates."""
+        print(
+            f"Simulation LOD: skipped {self.skipped} of "
+            f"{self.updates + self.skipped} zombie updates "
+            f"({self.skipped_ratio() * 100:.1f}%)"
         )
-        screen.blit(glow_surf, (self.x - 2, self.y - 2))
 
 
-# Add these classes for visual effects
-class BloodSplatter:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.frame = 0
-        self.max_frames = len(blood_splatter_imgs)
-        self.frame_delay = 3
-        self.frame_counter = 0
+# Uniform grid for bucketing entities by position
+class SpatialGrid:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
 
-    def update(self):
-        self.frame_counter += 1
-        if self.frame_counter >= self.frame_delay:
-            self.frame += 1
-            self.frame_counter = 0
-        return self.frame < self.max_frames
+    def clear(self):
+        self.cells.clear()
 
-    def draw(self):
-        if self.frame < self.max_frames:
-            screen.blit(blood_splatter_imgs[self.frame], (self.x - 20, self.y - 20))
+    def insert(self, item, x, y):
+        """Add an item to the cell containing the point (x, y)."""
+        key = (int(x // self.cell_size), int(y // self.cell_size))
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [item]
+        else:
+            bucket.append(item)
+
+    def cell_rect(self, key):
+        """Return the world rect covered by a cell."""
+        return pygame.Rect(
+            key[0] * self.cell_size,
+            key[1] * self.cell_size,
+            self.cell_size,
+            self.cell_size,
+        )
 
 
-class Explosion:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.frame = 0
-        self.max_frames = len(explosion_imgs)
-        self.frame_delay = 2
-        self.frame_counter = 0
+# Pre-rendered crowd sprites, keyed by (zombie type, size)
+crowd_impostor_cache = {}
+
+
+def get_crowd_impostor(count, kind):
+    """Return a crowd sprite standing in for `count` overlapping zombies,
+    drawn and sized as the ZOMBIE_TYPES index `kind`."""
+    scale = min(RENDER_LOD_MAX_SCALE, 1.0 + 0.1 * (count - RENDER_LOD_MIN_COUNT + 1))
+    zombie_size = ZOMBIE_TYPES[kind]["size"]
+    size = int(zombie_size * scale)
+
+    if (kind, size) not in crowd_impostor_cache:
+        if (kind, "base") not in crowd_impostor_cache:
+            # A small huddle of this type, rendered once; the offsets are
+            # laid out for a walker and scaled to the type's size
+            base = pygame.Surface((zombie_size * 2, zombie_size * 2), pygame.SRCALPHA)
+            offsets = [(0, 4), (32, 6), (16, 0), (4, 30), (30, 28), (16, 16)]
+            for offset_x, offset_y in offsets:
+                base.blit(
+                    zombie_imgs[kind],
+                    (
+                        offset_x * zombie_size // ZOMBIE_WIDTH,
+                        offset_y * zombie_size // ZOMBIE_HEIGHT,
+                    ),
+                )
+            crowd_impostor_cache[kind, "base"] = base
+        crowd_impostor_cache[kind, size] = pygame.transform.smoothscale(
+            crowd_impostor_cache[kind, "base"], (size, size)
+        )
 
-    def update(self):
-        self.frame_counter += 1
-        if self.frame_counter >= self.frame_delay:
-            self.frame += 1
-            self.frame_counter = 0
-        return self.frame < self.max_frames
+    return crowd_impostor_cache[kind, size]
+
+
+def draw_zombies_lod(positions, kinds, grid, camera):
+    """Draw zombies, collapsing dense grid cells into a single crowd sprite.
+
+    `positions` is an (n, 2) array of zombie corners in world coordinates and
+    `kinds` their ZOMBIE_TYPES indices. Cells with fewer than
+    RENDER_LOD_MIN_COUNT zombies are drawn exactly.
+    Returns the grid keys of the collapsed cells.
+    """
+    grid.clear()
+    corners = positions.tolist()
+    kind_ids = kinds
+    kinds = kinds.tolist()
+    centers = positions + (ZOMBIE_STATS["size"] // 2)[kinds][:, None]
+    for index, (x, y) in enumerate(centers.tolist()):
+        grid.insert(index, x, y)
+
+    images = [render_sprite(image) for image in zombie_imgs]
+    sprites = []
+    collapsed = []
+    for key, members in grid.cells.items():
+        if len(members) < RENDER_LOD_MIN_COUNT:
+            for index in members:
+                sprites.append(
+                    (images[kinds[index]], camera.to_screen(*corners[index]))
+                )
+            continue
 
-    def draw(self):
-        if self.frame < self.max_frames:
-            screen.blit(explosion_imgs[self.frame], (self.x - 30, self.y - 30))
+        # Draw the impostor centred on the crowd, as its most common type
+        center_x, center_y = camera.to_screen(*centers[members].mean(axis=0).tolist())
+        kind = int(np.bincount(kind_ids[members]).argmax())
+        impostor = render_sprite(get_crowd_impostor(len(members), kind))
+        sprites.append(
+            (
+                impostor,
+                (
+                    center_x - impostor.get_width() // 2,
+                    center_y - impostor.get_height() // 2,
+                ),
+            )
+        )
+        collapsed.append(key)
+
+    world_surface.blits(sprites, doreturn=False)
+    return collapsed
+
+
+def ticks_to_leave_world(x, y, velocity_x, velocity_y):
+    """Return how many moves it takes a bullet to leave the world.
+
+    Bullets fly in a straight line, so this is known when they are fired.
+    """
+    moves = math.inf
+    for start, velocity, end in (
+        (x, velocity_x, WORLD_WIDTH),
+        (y, velocity_y, WORLD_HEIGHT),
+    ):
+        if velocity > 0:
+            moves = min(moves, (end - start) / velocity)
+        elif velocity < 0:
+            moves = min(moves, start / -velocity)
+    return max(1, int(moves) + 1)
+
+
+def draw_bullets(positions, colors, camera):
+    """Draw bullets from (n, 2) positions and matching (n, 3) colors."""
+    glows = quality_tier["glows"]
+    width, height = to_render(BULLET_WIDTH), to_render(BULLET_HEIGHT)
+    margin = to_render(2)
+    for (x, y), color in zip(
+        ((positions - (camera.x, camera.y)) * RENDER_ZOOM).tolist(),
+        map(tuple, colors.tolist()),
+    ):
+        # Use the bullet's color (which might be changed for AI bullets)
+        pygame.draw.rect(world_surface, color, (x, y, width, height))
+
+        # Add a small glow effect for bullets
+        if glows:
+            glow_surf = pygame.Surface(
+                (width + 2 * margin, height + 2 * margin), pygame.SRCALPHA
+            )
+            pygame.draw.rect(
+                glow_surf,
+                (*color, 100),
+                (0, 0, width + 2 * margin, height + 2 * margin),
+            )
+            world_surface.blit(glow_surf, (x - margin, y - margin))
+
+
+def draw_effects(effects, images, camera):
+    """Draw (n, 3) rows of x, y, frame, each image centred on its point."""
+    images = [render_sprite(image) for image in images]
+    sprites = []
+    for x, y, frame in effects.tolist():
+        if frame < len(images):
+            image = images[frame]
+            x, y = camera.to_screen(x, y)
+            sprites.append(
+                (image, (x - image.get_width() // 2, y - image.get_height() // 2))
+            )
+    world_surface.blits(sprites, doreturn=False)
 
 
 # Text input class for email entry
@@ -758,7 +1858,7 @@ class TextInput:
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
             # Toggle active state if clicked
-            self.active = self.rect.collidepoint(event.pos)
+            self.active = self.rect.collidepoint(to_game_pos(event.pos))
 
         if event.type == pygame.KEYDOWN and self.active:
             if event.key == pygame.K_BACKSPACE:
@@ -811,16 +1911,17 @@ class TextInput:
 
 
 # Function to submit score to leaderboard
-def submit_score_to_leaderboard(email, score):
+def submit_score_to_leaderboard(email, score, replay=None):
     if supabase is None:
         print(f"Offline mode: Would submit score {score} for {email}")
         return True
 
     try:
         # Insert the score into the scores table with correct column names
-        data = (
-            supabase.table("scores").insert({"email": email, "score": score}).execute()
-        )
+        row = {"email": email, "score": score}
+        if replay is not None:
+            row["replay"] = replay  # Checked by a verifying server
+        data = supabase.table("scores").insert(row).execute()
         print(f"Score submitted: {score} for {email}")
         return True
     except Exception as e:
@@ -828,31 +1929,418 @@ def submit_score_to_leaderboard(email, score):
         return False
 
 
+# Persistent queue of score submissions, delivered by a background thread
+class ScoreOutbox:
+    def __init__(self, path=OUTBOX_PATH, send=None):
+        """Load any submissions left over from a previous session."""
+        self.path = path
+        self.send = send  # Defaults to submit_score_to_leaderboard
+        self.entries = {}  # Keyed by (email, score, session), in insert order
+        self.condition = threading.Condition()
+        self.thread = None
+        self.load()
+
+    @staticmethod
+    def make_key(email, score, session):
+        return f"{email}|{score}|{session}"
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        for entry in saved:
+            if entry["status"] == "sending":
+                # Interrupted mid-send; try again
+                entry["status"] = "queued"
+            key = self.make_key(entry["email"], entry["score"], entry["session"])
+            self.entries[key] = entry
+
+    def save(self):
+        """Write the outbox to disk. Call with the condition held."""
+        try:
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w") as f:
+                json.dump(list(self.entries.values()), f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not save score outbox: {e}")
+
+    def submit(self, email, score, session, replay=None):
+        """Queue a score for delivery and return its key right away."""
+        key = self.make_key(email, score, session)
+        with self.condition:
+            if key not in self.entries:
+                self.entries[key] = {
+                    "email": email,
+                    "score": score,
+                    "session": session,
+                    "replay": replay,
+                    "status": "queued",
+                    "attempts": 0,
+                    "next_attempt": 0,
+                }
+                self.save()
+            self.condition.notify()
+
+        self.start()
+        return key
+
+    def status(self, key):
+        """Return (status, seconds until the next retry) for a submission."""
+        with self.condition:
+            entry = self.entries.get(key)
+            if entry is None:
+                return "unknown", 0
+            return entry["status"], max(0, entry["next_attempt"] - time.time())
+
+    def pending_count(self):
+        with self.condition:
+            return sum(1 for e in self.entries.values() if e["status"] != "sent")
+
+    def start(self):
+        """Start the delivery thread, or deliver inline where threads are unavailable."""
+        if IN_BROWSER:
+            self.flush()
+            return
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def next_due(self):
+        """Return (key, seconds to wait) for the next entry to send."""
+        now = time.time()
+        best_key, best_time = None, None
+        for key, entry in self.entries.items():
+            if entry["status"] in ("queued", "retrying"):
+                if best_time is None or entry["next_attempt"] < best_time:
+                    best_key, best_time = key, entry["next_attempt"]
+        if best_key is None:
+            return None, None
+        return best_key, max(0, best_time - now)
+
+    def deliver(self, key):
+        """Send one entry and record the outcome."""
+        with self.condition:
+            entry = self.entries[key]
+            entry["status"] = "sending"
+            email, score = entry["email"], entry["score"]
+            replay = entry.get("replay")  # Missing in outboxes from older versions
+
+        send = self.send or submit_score_to_leaderboard
+        try:
+            ok = send(email, score, replay)
+        except Exception as e:
+            print(f"Error delivering score: {e}")
+            ok = False
+
+        with self.condition:
+            entry["attempts"] += 1
+            if ok:
+                entry["status"] = "sent"
+                self.prune()
+            else:
+                backoff = min(OUTBOX_MAX_BACKOFF, 2 ** entry["attempts"])
+                entry["status"] = "retrying"
+                entry["next_attempt"] = time.time() + backoff
+            self.save()
+
+    def prune(self):
+        """Forget the oldest delivered entries. Call with the condition held."""
+        sent = [k for k, e in self.entries.items() if e["status"] == "sent"]
+        for key in sent[: max(0, len(sent) - OUTBOX_KEEP_SENT)]:
+            del self.entries[key]
+
+    def flush(self):
+        """Deliver everything that is due now on the calling thread."""
+        while True:
+            with self.condition:
+                key, wait = self.next_due()
+            if key is None or wait > 0:
+                return
+            self.deliver(key)
+
+    def run(self):
+        while True:
+            with self.condition:
+                key, wait = self.next_due()
+                if key is None or wait > 0:
+                    self.condition.wait(timeout=wait)
+                    continue
+            self.deliver(key)
+
+
+def describe_submission_status(status, retry_in):
+    """Return the on-screen message for an outbox status."""
+    if status == "sent":
+        return "Score submitted successfully!"
+    if status == "retrying":
+        return f"Network error, retrying in {int(retry_in) + 1}s..."
+    return "Submitting score..."
+
+
+# Fenwick tree over score buckets for O(log n) rank lookups
+class ScoreRankIndex:
+    def __init__(self, bucket_size=LEADERBOARD_RANK_BUCKET, capacity=1024):
+        self.bucket_size = bucket_size
+        self.counts = [0] * capacity  # Plain per-bucket counts, used to regrow
+        self.tree = [0] * (capacity + 1)
+        self.total = 0
+
+    def bucket(self, score):
+        return max(0, int(score) // self.bucket_size)
+
+    def add(self, score, count=1):
+        bucket = self.bucket(score)
+        if bucket >= len(self.counts):
+            self.grow(bucket + 1)
+        self.counts[bucket] += count
+        self.total += count
+        i = bucket + 1
+        while i < len(self.tree):
+            self.tree[i] += count
+            i += i & -i
+
+    def grow(self, needed):
+        """Rebuild the tree with room for at least `needed` buckets."""
+        capacity = len(self.counts)
+        while capacity < needed:
+            capacity *= 2
+        self.counts.extend([0] * (capacity - len(self.counts)))
+        self.tree = [0] * (capacity + 1)
+        for bucket, count in enumerate(self.counts):
+            i = bucket + 1
+            while i < len(self.tree) and count:
+                self.tree[i] += count
+                i += i & -i
+
+    def count_through(self, bucket):
+        """Number of scores in buckets 0..bucket."""
+        total = 0
+        i = min(bucket + 1, len(self.tree) - 1)
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def count_above_bucket(self, score):
+        """Number of scores in buckets strictly above the one holding `score`."""
+        return self.total - self.count_through(self.bucket(score))
+
+
+# Local SQLite copy of the leaderboard, synced incrementally from Supabase
+class LeaderboardStore:
+    def __init__(self, path=LEADERBOARD_DB_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.revision = 0  # Bumped whenever the stored rows change
+        self.sync_thread = None
+        self.sync_lock = threading.Lock()  # Single-flight guard for syncs
+        self.last_sync = None  # time.monotonic() of the last successful sync
+        self.top_cache = {}  # (limit, offset) -> (revision, rows)
+        self.rank_index = None  # Built on the first rank lookup
+        self.create_schema()
+
+    def create_schema(self):
+        with self.lock:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS scores (
+                    id INTEGER PRIMARY KEY,
+                    remote_id INTEGER UNIQUE,
+                    email TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    session TEXT UNIQUE
+                );
+                CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC);
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                """)
+            self.connection.commit()
+
+    def top(self, limit=10, offset=0):
+        """Return one page of scores, highest first."""
+        cached = self.top_cache.get((limit, offset))
+        if cached is not None and cached[0] == self.revision:
+            return cached[1]
+
+        with self.lock:
+            revision = self.revision
+            rows = self.connection.execute(
+                "SELECT email, score FROM scores ORDER BY score DESC, id "
+                "LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+        result = [{"email": email, "score": score} for email, score in rows]
+        self.top_cache[(limit, offset)] = (revision, result)
+        return result
+
+    def count(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def rank(self, score):
+        """Return the 1-based rank `score` would have among the stored scores."""
+        with self.lock:
+            if self.rank_index is None:
+                self.rank_index = ScoreRankIndex()
+                for (stored,) in self.connection.execute("SELECT score FROM scores"):
+                    self.rank_index.add(stored)
+
+            # Whole buckets above come from the tree; the score's own bucket
+            # is a short range scan on the score index
+            above = self.rank_index.count_above_bucket(score)
+            bucket_end = (self.rank_index.bucket(score) + 1) * (
+                self.rank_index.bucket_size
+            )
+            above += self.connection.execute(
+                "SELECT COUNT(*) FROM scores WHERE score > ? AND score < ?",
+                (score, bucket_end),
+            ).fetchone()[0]
+        return above + 1
+
+    def record_local(self, email, score, session):
+        """Store a score from this machine so it shows up before any sync."""
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO scores (email, score, session) VALUES (?, ?, ?)",
+                (email, score, session),
+            )
+            self.connection.commit()
+            if cursor.rowcount and self.rank_index is not None:
+                self.rank_index.add(score)
+            self.revision += 1
+
+    def watermark(self):
+        """Highest remote row id seen so far."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value FROM sync_state WHERE name = 'remote_id'"
+            ).fetchone()
+        return row[0] if row else 0
+
+    def merge_remote(self, rows):
+        """Add rows fetched from Supabase and advance the watermark."""
+        with self.lock:
+            for row in rows:
+                # A local copy of the same score becomes the remote row
+                cursor = self.connection.execute(
+                    """
+                    UPDATE scores SET remote_id = ? WHERE id = (
+                        SELECT id FROM scores
+                        WHERE remote_id IS NULL AND email = ? AND score = ?
+                        LIMIT 1
+                    )
+                    """,
+                    (row["id"], row["email"], row["score"]),
+                )
+                if cursor.rowcount == 0:
+                    cursor = self.connection.execute(
+                        "INSERT OR IGNORE INTO scores (remote_id, email, score) "
+                        "VALUES (?, ?, ?)",
+                        (row["id"], row["email"], row["score"]),
+                    )
+                    if cursor.rowcount and self.rank_index is not None:
+                        self.rank_index.add(row["score"])
+
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_state (name, value) "
+                "VALUES ('remote_id', ?)",
+                (max(row["id"] for row in rows),),
+            )
+            self.connection.commit()
+            self.revision += 1
+
+    def sync(self):
+        """Fetch only the rows newer than the watermark. Returns the row count."""
+        if supabase is None:
+            return 0
+
+        fetched = 0
+        while True:
+            response = (
+                supabase.table("scores")
+                .select("id,email,score")
+                .gt("id", self.watermark())
+                .order("id")
+                .limit(LEADERBOARD_SYNC_PAGE)
+                .execute()
+            )
+            rows = response.data
+            if rows:
+                self.merge_remote(rows)
+                fetched += len(rows)
+            if len(rows) < LEADERBOARD_SYNC_PAGE:
+                return fetched
+
+    def is_stale(self):
+        if self.last_sync is None:
+            return True
+        return time.monotonic() - self.last_sync > LEADERBOARD_TTL
+
+    def refresh(self):
+        """Revalidate in the background if the data is older than the TTL."""
+        if self.is_stale():
+            self.sync_in_background()
+
+    def sync_in_background(self):
+        """Start a sync on a worker thread unless one is already running."""
+        if supabase is None or IN_BROWSER:
+            return
+        with self.sync_lock:
+            if self.sync_thread is not None and self.sync_thread.is_alive():
+                return
+            self.sync_thread = threading.Thread(target=self.run_sync, daemon=True)
+            self.sync_thread.start()
+
+    def run_sync(self):
+        try:
+            fetched = self.sync()
+            self.last_sync = time.monotonic()
+            if fetched:
+                print(f"Leaderboard synced {fetched} new scores")
+        except Exception as e:
+            print(f"Error syncing leaderboard: {e}")
+
+
+def submit_score(email, score, session, replay=None):
+    """Queue a score for the leaderboard and show it locally right away."""
+    leaderboard_store.record_local(email, score, session)
+    if not SCORE_VERIFICATION:
+        replay = None  # Only verifying servers need the replay
+    return score_outbox.submit(email, score, session, replay)
+
+
 # Function to get top scores from leaderboard
-def get_leaderboard():
-    if supabase is None:
-        # Return placeholder data in offline mode
-        return [
-            {"email": "example1@example.com", "score": 1000},
-            {"email": "example2@example.com", "score": 800},
-            {"email": "example3@example.com", "score": 600},
-            {"email": "example4@example.com", "score": 400},
-            {"email": "example5@example.com", "score": 200},
-        ]
+def get_leaderboard(offset=0, limit=10):
+    """Return a cached page of scores, revalidating in the background when stale."""
+    leaderboard_store.refresh()
+    return leaderboard_store.top(limit, offset)
+
+
+def get_rank(score):
+    """Return the leaderboard rank a score would have (1 is best)."""
+    # The local index is complete once synced, or on its own when offline
+    if supabase is None or leaderboard_store.last_sync is not None:
+        return leaderboard_store.rank(score)
 
     try:
-        # Get top 10 scores, ordered by score descending with correct column names
+        # Count the better scores on the server without fetching the rows
         response = (
             supabase.table("scores")
-            .select("email,score")
-            .order("score", desc=True)
-            .limit(10)
+            .select("id", count="exact")
+            .gt("score", score)
+            .limit(1)
             .execute()
         )
-        return response.data
+        return response.count + 1
     except Exception as e:
-        print(f"Error fetching leaderboard: {e}")
-        return []
+        print(f"Error fetching rank: {e}")
+        return leaderboard_store.rank(score)
 
 
 # Function to mask email for privacy
@@ -874,7 +2362,7 @@ def mask_email(email):
 
 
 # Email input screen
-def show_email_input_screen(score):
+async def show_email_input_screen(score, session=None, replay=None):
     email_input = TextInput(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2, 300, 40)
 
     title_font = pygame.font.SysFont("arial", 36)
@@ -904,6 +2392,10 @@ def show_email_input_screen(score):
 
     show_error = False
     submitted = False
+    session = session or uuid.uuid4().hex
+    pending_key = None  # Outbox key once the score has been queued
+    sent_at = None
+    scheduler = FrameScheduler(60)
 
     while not submitted:
         for event in pygame.event.get():
@@ -914,24 +2406,35 @@ def show_email_input_screen(score):
             if email_input.handle_event(event):
                 # Enter key was pressed
                 if email_input.is_valid_email():
-                    submit_score_to_leaderboard(email_input.text, score)
-                    submitted = True
+                    pending_key = submit_score(email_input.text, score, session, replay)
+                    show_error = False
                 else:
                     show_error = True
 
             if event.type == pygame.MOUSEBUTTONDOWN:
-                if submit_button.collidepoint(event.pos):
+                if submit_button.collidepoint(to_game_pos(event.pos)):
                     if email_input.is_valid_email():
-                        submit_score_to_leaderboard(email_input.text, score)
-                        submitted = True
+                        pending_key = submit_score(
+                            email_input.text, score, session, replay
+                        )
+                        show_error = False
                     else:
                         show_error = True
-                elif skip_button.collidepoint(event.pos):
+                elif skip_button.collidepoint(to_game_pos(event.pos)):
+                    # Any queued submission keeps retrying in the background
                     submitted = True
 
         # Update
         email_input.update()
 
+        # Move on shortly after the submission has been delivered
+        if pending_key is not None:
+            status, retry_in = score_outbox.status(pending_key)
+            if status == "sent" and sent_at is None:
+                sent_at = pygame.time.get_ticks()
+            if sent_at is not None and pygame.time.get_ticks() - sent_at > 1000:
+                submitted = True
+
         # Draw
         # Background with grid effect
         screen.fill((5, 7, 15))
@@ -972,7 +2475,7 @@ def show_email_input_screen(score):
             ),
         )
 
-        # Draw error message if needed
+        # Draw error message or delivery status if needed
         if show_error:
             screen.blit(
                 error_text,
@@ -981,6 +2484,17 @@ def show_email_input_screen(score):
                     SCREEN_HEIGHT // 2 + 180,
                 ),
             )
+        elif pending_key is not None:
+            status_text = error_font.render(
+                describe_submission_status(status, retry_in), True, (200, 255, 200)
+            )
+            screen.blit(
+                status_text,
+                (
+                    SCREEN_WIDTH // 2 - status_text.get_width() // 2,
+                    SCREEN_HEIGHT // 2 + 180,
+                ),
+            )
 
         # Draw submit button
         button_color = (0, 120, 200) if email_input.is_valid_email() else (80, 80, 80)
@@ -1004,16 +2518,18 @@ def show_email_input_screen(score):
             ),
         )
 
-        pygame.display.flip()
+        present()
+        await scheduler.next_frame()
 
     # Show leaderboard after submission
-    show_leaderboard_screen()
+    await show_leaderboard_screen()
     return True
 
 
 # Leaderboard display screen
-def show_leaderboard_screen():
-    leaderboard_data = get_leaderboard()
+async def show_leaderboard_screen():
+    offset = 0  # Index of the first entry on the current page
+    leaderboard_data = get_leaderboard(offset, LEADERBOARD_PAGE_SIZE)
 
     title_font = pygame.font.SysFont("arial", 40)
     entry_font = pygame.font.SysFont("arial", 24)
@@ -1021,15 +2537,16 @@ def show_leaderboard_screen():
 
     title_text = title_font.render("LEADERBOARD", True, (0, 200, 255))
     instruction_text = instruction_font.render(
-        "Press any key to continue", True, (200, 200, 200)
+        "Left/Right to change page, any other key to continue", True, (200, 200, 200)
     )
 
     # Animation variables
     entry_positions = [SCREEN_WIDTH for _ in range(len(leaderboard_data))]
     target_positions = [SCREEN_WIDTH // 2 - 150 for _ in range(len(leaderboard_data))]
+    revision = leaderboard_store.revision
 
     waiting = True
-    clock = pygame.time.Clock()
+    scheduler = FrameScheduler(60)
 
     while waiting:
         for event in pygame.event.get():
@@ -1037,7 +2554,29 @@ def show_leaderboard_screen():
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN:
-                waiting = False
+                if event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                    step = LEADERBOARD_PAGE_SIZE
+                    new_offset = offset + (
+                        step if event.key == pygame.K_RIGHT else -step
+                    )
+                    if 0 <= new_offset < leaderboard_store.count():
+                        offset = new_offset
+                        leaderboard_data = get_leaderboard(offset, step)
+                        # Slide the new page in from the right
+                        entry_positions = [SCREEN_WIDTH] * len(leaderboard_data)
+                        target_positions = [SCREEN_WIDTH // 2 - 150] * len(
+                            leaderboard_data
+                        )
+                else:
+                    waiting = False
+
+        # Pick up new rows once the background sync delivers them
+        if leaderboard_store.revision != revision:
+            revision = leaderboard_store.revision
+            leaderboard_data = leaderboard_store.top(LEADERBOARD_PAGE_SIZE, offset)
+            while len(entry_positions) < len(leaderboard_data):
+                entry_positions.append(SCREEN_WIDTH)
+                target_positions.append(SCREEN_WIDTH // 2 - 150)
 
         # Update entry animations
         for i in range(len(entry_positions)):
@@ -1071,7 +2610,7 @@ def show_leaderboard_screen():
 
         # Draw leaderboard entries
         for i, entry in enumerate(leaderboard_data):
-            rank = i + 1
+            rank = offset + i + 1
             email = mask_email(entry["email"])
             score = entry["score"]
 
@@ -1115,414 +2654,2338 @@ def show_leaderboard_screen():
             (SCREEN_WIDTH // 2 - instruction_text.get_width() // 2, SCREEN_HEIGHT - 50),
         )
 
-        pygame.display.flip()
-        clock.tick(60)
+        present()
+        await scheduler.next_frame()
 
     return True
 
 
-# Main game loop
-def game_loop():
-    """Run the main game loop."""
-    clock = pygame.time.Clock()
-    player = Player()
-    zombies = []
-    bullets = []
-    zombie_spawn_timer = 0
-    game_over = False
-    powerup_timer = 0
-    powerups = []
-    mouse_cooldown = 0
-    blood_splatters = []
-    explosions = []
-    message_text = ""
-    message_timer = 0
-    game_tick = 0  # Add a game tick counter
-
-    # Wave system variables
-    current_wave = 1
-    wave_timer = 0
-    wave_duration = 1800  # 30 seconds per wave at 60 FPS
-    zombies_per_wave = 1  # Base number of zombies to spawn per second
-    wave_message = ""
-    wave_message_timer = 0
-
-    while not game_over:
-        # Increment game tick each frame
-        game_tick += 1
-
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                game_over = True
-
-        # Get mouse position and update player aim
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        player.update_aim(mouse_x, mouse_y)
+# Inputs sampled for one simulation tick
+PlayerInput = collections.namedtuple(
+    "PlayerInput", ["aim_x", "aim_y", "fire", "alt_fire", "left", "right", "up", "down"]
+)
+NO_INPUT = PlayerInput(0, 0, False, False, False, False, False, False)
 
-        # Handle mouse shooting with cooldown
-        mouse_buttons = pygame.mouse.get_pressed()
-        if mouse_buttons[0] and mouse_cooldown <= 0:  # Left mouse button
-            new_bullets = player.shoot()
-            bullets.extend(new_bullets)
-            # Set cooldown based on power-up status
-            mouse_cooldown = 5 if player.active_powerups["Rapid Fire"] > 0 else 10
-            play_sound("shoot")  # Play shooting sound
 
-        if mouse_cooldown > 0:
-            mouse_cooldown -= 1
+# Screen-sized view of the world that follows the player
+class Camera:
+    def __init__(self, x=0, y=0):
+        self.x = x  # World position of the view's top-left corner
+        self.y = y
 
-        # Also keep keyboard shooting for those who prefer it
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_SPACE] and mouse_cooldown <= 0:
-            bullets.extend(player.shoot())
-            mouse_cooldown = 10
-            play_sound("shoot")  # Play shooting sound
-
-        # Handle player input
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            player.move("left")
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            player.move("right")
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            player.move("up")
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            player.move("down")
+    def follow(self, target_x, target_y):
+        """Centre the view on a world point without showing past the world's edge."""
+        self.x = min(
+            max(0, int(target_x) - SCREEN_WIDTH // 2), WORLD_WIDTH - SCREEN_WIDTH
+        )
+        self.y = min(
+            max(0, int(target_y) - SCREEN_HEIGHT // 2), WORLD_HEIGHT - SCREEN_HEIGHT
+        )
 
-        # Replace the zombie spawning code with this wave-based system
-        # Update wave timer
-        wave_timer += 1
-        if wave_timer >= wave_duration:
-            current_wave += 1
-            wave_timer = 0
-            wave_message = f"Wave {current_wave} incoming!"
-            wave_message_timer = 180  # Show for 3 seconds
-            play_sound("wave_start")  # Play wave start sound
-
-            # Increase difficulty with each wave
-            zombies_per_wave = (
-                1 + current_wave // 2
-            )  # Increase zombies per second every 2 waves
-
-        # Spawn zombies based on current wave
-        zombie_spawn_timer += 1
-        spawn_rate = max(
-            10, 60 // zombies_per_wave
-        )  # Adjust spawn rate based on zombies per wave
-        if zombie_spawn_timer >= spawn_rate:  # Spawn rate increases with wave
-            # Spawn multiple zombies at once in later waves
-            zombies_to_spawn = (
-                1 + current_wave // 3
-            )  # Spawn more zombies at once in later waves
-            for _ in range(zombies_to_spawn):
-                new_zombie = Zombie()
-                # Make zombies faster in later waves
-                new_zombie.speed = min(
-                    4.0, ZOMBIE_SPEED * (1 + current_wave * 0.1)
-                )  # Cap at 4.0
-                zombies.append(new_zombie)
-            zombie_spawn_timer = 0
-
-        # Update zombies and check collisions
-        for zombie in zombies[:]:
-            zombie.move(player.x + PLAYER_WIDTH // 2, player.y + PLAYER_HEIGHT // 2)
-
-            # Check if zombie collides with player
-            if (
-                zombie.x < player.x + PLAYER_WIDTH
-                and zombie.x + ZOMBIE_WIDTH > player.x
-                and zombie.y < player.y + PLAYER_HEIGHT
-                and zombie.y + ZOMBIE_HEIGHT > player.y
-            ):
-                # Add blood splatter effect
-                blood_splatters.append(
-                    BloodSplatter(
-                        zombie.x + ZOMBIE_WIDTH // 2, zombie.y + ZOMBIE_HEIGHT // 2
-                    )
-                )
+    def to_world(self, x, y):
+        """Convert a screen position (such as the mouse) to world coordinates."""
+        return x + self.x, y + self.y
 
-                zombies.remove(zombie)
+    def to_screen(self, x, y):
+        """Convert a world position to where it is drawn on world_surface."""
+        return (x - self.x) * RENDER_ZOOM, (y - self.y) * RENDER_ZOOM
 
-                # Only take damage if shield is not active
-                if player.active_powerups["Shield"] <= 0:
-                    player.take_damage(25)  # Increased from 10 to 25 (4 hits to kill)
-                    play_sound("player_damage")  # Play player damage sound
-                else:
-                    # Shield absorbs the hit
-                    player.score += 5  # Bonus for blocking with shield
-                    play_sound("shield_hit")  # Play shield hit sound
-                continue
+    def visible(self, items, width, height, anchor=0):
+        """Return the items whose width x height box overlaps the view.
 
-            # Check bullet collisions
-            for bullet in bullets[:]:
-                if (
-                    zombie.x < bullet.x < zombie.x + ZOMBIE_WIDTH
-                    and zombie.y < bullet.y < zombie.y + ZOMBIE_HEIGHT
-                ):
-                    # Add blood splatter effect
-                    blood_splatters.append(
-                        BloodSplatter(
-                            zombie.x + ZOMBIE_WIDTH // 2, zombie.y + ZOMBIE_HEIGHT // 2
-                        )
-                    )
-                    # Add explosion effect for the bullet impact
-                    explosions.append(Explosion(bullet.x, bullet.y))
-
-                    play_sound("zombie_hit")  # Play zombie hit sound
-
-                    zombies.remove(zombie)
-                    bullets.remove(bullet)
-                    player.score += 10
-                    break
-
-        # Update bullets
-        for bullet in bullets[:]:
-            bullet.move()
-            # Remove bullets that go off-screen
-            if (
-                bullet.x < 0
-                or bullet.x > SCREEN_WIDTH
-                or bullet.y < 0
-                or bullet.y > SCREEN_HEIGHT
-            ):
-                bullets.remove(bullet)
-
-        # Check for game over
-        if player.health <= 0:
-            game_over = True
-            play_sound("game_over")  # Play game over sound
-
-        # Update player power-ups
-        player.update_powerups()
-
-        # Spawn power-ups periodically
-        powerup_timer += 1
-        if powerup_timer >= 600:  # Every 10 seconds
-            power_up_x = random.randint(50, SCREEN_WIDTH - 50)
-            power_up_y = random.randint(50, SCREEN_HEIGHT - 50)
-
-            # Make sure it doesn't spawn on a rock
-            valid_position = True
-            for rock in rocks:
-                if rock.collides_with(power_up_x - 15, power_up_y - 15, 30, 30):
-                    valid_position = False
-                    break
-
-            if valid_position:
-                powerups.append(PowerUp(power_up_x, power_up_y))
-                powerup_timer = 0
-
-        # Check if player collects power-ups
-        for powerup in powerups[:]:
-            if (
-                powerup.x - 20 < player.x + PLAYER_WIDTH // 2 < powerup.x + 20
-                and powerup.y - 20 < player.y + PLAYER_HEIGHT // 2 < powerup.y + 20
-            ):
-                message_text = player.apply_powerup(powerup)
-                message_timer = 120  # Show message for 2 seconds
-                powerups.remove(powerup)
-                play_sound("powerup")  # Play powerup sound
-
-                # Special handling for AI Assistant
-                if powerup.name == "AI Assistant" and zombies:
-                    # Set the power-up as active, the actual shooting will happen in the main loop
-                    player.active_powerups["AI Assistant"] = powerup.duration
-                    message_text = "AI Assistant activated!"
-                    message_timer = 120
-
-        # Update power-ups
-        for powerup in powerups:
-            powerup.update()
-
-        # Update visual effects
-        for splatter in blood_splatters[:]:
-            if not splatter.update():
-                blood_splatters.remove(splatter)
-
-        for explosion in explosions[:]:
-            if not explosion.update():
-                explosions.remove(explosion)
+        Each box's top-left corner is `anchor` pixels up and left of the item's
+        (x, y), for sprites drawn centred on their position.
+        """
+        left = self.x + anchor - width
+        top = self.y + anchor - height
+        right = self.x + SCREEN_WIDTH + anchor
+        bottom = self.y + SCREEN_HEIGHT + anchor
+        return [
+            item for item in items if left < item.x < right and top < item.y < bottom
+        ]
 
-        # Draw background
-        screen.blit(background_img, (0, 0))
+    def visible_rows(self, positions, width, height, anchor=0):
+        """Like visible(), for an (n, 2+) array whose first columns are x, y."""
+        x = positions[:, 0]
+        y = positions[:, 1]
+        inside = (
+            (x > self.x + anchor - width)
+            & (x < self.x + SCREEN_WIDTH + anchor)
+            & (y > self.y + anchor - height)
+            & (y < self.y + SCREEN_HEIGHT + anchor)
+        )
+        return positions[inside], inside
+
+
+# Dense component columns for every entity of one kind (see ARCHETYPES)
+class Archetype:
+    def __init__(self, name, defaults, capacity=ARCHETYPE_CAPACITY):
+        self.name = name
+        self.defaults = defaults  # {component: value a spawn starts with}
+        self.components = frozenset(defaults)
+        self.count = 0
+        self.columns = {}
+        self.views = {}  # Live rows of each column, until the count changes
+        for component in defaults:
+            dtype, width = COMPONENTS[component]
+            shape = (capacity,) if width == 1 else (capacity, width)
+            self.columns[component] = np.zeros(shape, dtype)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, component):
+        """Live rows of a component column; writes go straight to the entities."""
+        view = self.views.get(component)
+        if view is None:
+            view = self.views[component] = self.columns[component][: self.count]
+        return view
+
+    def spawn(self, count, **values):
+        """Append `count` entities, filling unset components with the defaults."""
+        start = self.count
+        end = start + count
+        capacity = len(next(iter(self.columns.values())))
+        if end > capacity:
+            capacity = max(end, capacity * 2)
+            for component, column in self.columns.items():
+                grown = np.zeros((capacity, *column.shape[1:]), column.dtype)
+                grown[:start] = column[:start]
+                self.columns[component] = grown
+
+        for component, column in self.columns.items():
+            column[start:end] = values.get(component, self.defaults[component])
+        self.count = end
+        self.views.clear()
+
+    def keep(self, mask):
+        """Remove every entity whose mask entry is False, keeping the rest in order."""
+        kept = int(np.count_nonzero(mask))
+        if kept == self.count:
+            return
+        for column in self.columns.values():
+            column[:kept] = column[: self.count][mask]
+        self.count = kept
+        self.views.clear()
 
-        # Draw rocks
-        for rock in rocks:
-            rock.draw()
+    def keep_last(self, count):
+        """Remove all but the newest `count` entities."""
+        if self.count > count:
+            mask = np.zeros(self.count, bool)
+            mask[self.count - count :] = True
+            self.keep(mask)
 
-        # Draw visual effects under entities
-        for splatter in blood_splatters:
-            splatter.draw()
 
-        # Draw entities
-        player.draw()
-        for zombie in zombies:
-            zombie.draw()
-        for bullet in bullets:
-            bullet.draw()
+# Time spent in each system, summed over the ticks it ran
+class SystemProfiler:
+    def __init__(self):
+        self.seconds = collections.Counter()
+        self.worst = collections.Counter()  # Slowest single run of each system
+        self.ticks = 0
+
+    def run(self, systems, world):
+        """Run the systems in order, timing each."""
+        clock = time.perf_counter
+        for system in systems:
+            started = clock()
+            system(world)
+            elapsed = clock() - started
+            name = system.__name__
+            self.seconds[name] += elapsed
+            if elapsed > self.worst[name]:
+                self.worst[name] = elapsed
+        self.ticks += 1
+
+    def report(self):
+        """Print the mean and worst time per tick of each system."""
+        total = sum(self.seconds.values())
+        print(f"Systems over {self.ticks} ticks (mean / worst per tick):")
+        for name, seconds in self.seconds.items():
+            print(
+                f"  {name.replace('_system', ''):10s} "
+                f"{seconds / max(self.ticks, 1) * 1e6:8.1f} us "
+                f"{self.worst[name] * 1e6:8.1f} us "
+                f"{seconds / max(total, 1e-9) * 100:5.1f}%"
+            )
 
-        # Draw explosions on top
-        for explosion in explosions:
-            explosion.draw()
 
-        # Draw health bar
-        pygame.draw.rect(screen, RED, (10, 10, 200, 20))  # Background
-        pygame.draw.rect(
-            screen, GREEN, (10, 10, (player.health / 100) * 200, 20)  # Health
+# One tick's events of one type, merged. positions and values are None for
+# types emitted without them.
+GameEvents = collections.namedtuple("GameEvents", "count positions values")
+
+
+# Buffers the events emitted during a tick and hands them to every consumer
+# in one batch per type when drained
+class EventBus:
+    def __init__(self):
+        self.pending = {kind: [] for kind in GAME_EVENTS}
+        self.queued = False  # Whether anything was emitted since the last drain
+        self.consumers = []
+
+    def subscribe(self, consumer):
+        """Call `consumer({type: GameEvents})` on every drain with events."""
+        self.consumers.append(consumer)
+
+    def emit(self, kind, positions=None, values=None):
+        """Queue one event, or a batch with (n, 2) positions and n values."""
+        self.pending[kind].append((positions, values))
+        self.queued = True
+
+    def drain(self):
+        """Merge the queued events by type and pass them to the consumers."""
+        if not self.queued:
+            return
+        self.queued = False
+        events = {}
+        for kind, batches in self.pending.items():
+            if not batches:
+                continue
+            if batches[0][0] is None:
+                events[kind] = GameEvents(len(batches), None, None)
+            elif len(batches) == 1:
+                positions, values = batches[0]
+                events[kind] = GameEvents(len(positions), positions, values)
+            else:
+                positions = np.concatenate([batch[0] for batch in batches])
+                values = np.concatenate([batch[1] for batch in batches])
+                events[kind] = GameEvents(len(positions), positions, values)
+            batches.clear()
+
+        if events:
+            for consumer in self.consumers:
+                consumer(events)
+
+
+# Event consumer counting each type, for the end-of-run report
+class EventTelemetry:
+    def __init__(self):
+        self.events = collections.Counter()
+        self.ticks = collections.Counter()  # Ticks with at least one of the type
+
+    def __call__(self, events):
+        for kind, batch in events.items():
+            self.events[kind] += batch.count
+            self.ticks[kind] += 1
+
+    def report(self):
+        """Print how many events of each type fired, and on how many ticks."""
+        print("Game events (events / ticks):")
+        for kind in GAME_EVENTS:
+            if self.events[kind]:
+                print(f"  {kind:10s} {self.events[kind]:8d} {self.ticks[kind]:8d}")
+
+
+def spawn_system(world):
+    """Release this tick's share of the wave's zombies just outside the view."""
+    zombies = world.entities["zombie"]
+    released = world.spawn_scheduler.release(
+        world.game_tick, len(zombies), world.camera.x, world.camera.y
+    )
+    if released is not None and len(released[0]):
+        x, y, speed, kind = released
+        lod = np.empty((len(x), 2), np.int64)
+        lod[:, 0] = world.sim_lod.assign_slots(len(x))
+        lod[:, 1] = world.game_tick - 1
+        size = ZOMBIE_STATS["size"][kind]
+        zombies.spawn(
+            len(x),
+            position=np.column_stack((x, y)),
+            collider=np.column_stack((size, size)),
+            speed=speed,
+            health=ZOMBIE_STATS["health"][kind],
+            harm=ZOMBIE_STATS["harm"][kind],
+            kind=kind,
+            reload=ZOMBIE_FIRST_SPIT[kind],
+            lod=lod,
         )
 
-        # Draw score
-        score_text = SCORE_FONT.render(f"Score: {player.score}", True, WHITE)
-        screen.blit(score_text, (SCREEN_WIDTH - 150, 10))
 
-        # Draw power-ups
-        for powerup in powerups:
-            powerup.draw()
+def seek_system(world):
+    """Move zombies towards the player, including those out of view."""
+    target = np.array(world.player_center())
+    for archetype in world.query("position", "collider", "speed", "kind", "lod"):
+        if not len(archetype):
+            continue
+        position = archetype["position"]
+        offset = position + archetype["collider"] // 2
+        np.subtract(target, offset, out=offset)
+        offset_x, offset_y = offset[:, 0], offset[:, 1]
+        distance_sq = offset_x * offset_x + offset_y * offset_y
+
+        # Distant entities only move every few ticks, taking a larger step;
+        # the rest get a step of 0
+        steps = world.sim_lod.steps_for(archetype["lod"], world.game_tick, distance_sq)
+        hold = ZOMBIE_STATS["range"][archetype["kind"]]
+
+        # Normalize the direction, and don't overshoot the target when several
+        # ticks are taken at once or move closer than the type's range
+        length = np.sqrt(distance_sq)
+        np.maximum(length, 0.1, out=length)
+        distance = np.subtract(length, hold)
+        np.maximum(distance, 0, out=distance)
+        np.minimum(archetype["speed"] * steps, distance, out=distance)
+        offset /= length[:, None]
+        offset *= distance[:, None]
+        position += offset
+
+
+def spit_system(world):
+    """Spitters in range of the player spit at it, once per reload."""
+    zombies = world.entities["zombie"]
+    if not len(zombies):
+        return
+    reload = zombies["reload"]
+    # Types that don't spit are never ready
+    ready = (reload <= world.game_tick).nonzero()[0]
+    if not len(ready):
+        return
 
-        # Draw active power-up indicators
-        active_powerup_count = 0
-        for name, duration in player.active_powerups.items():
-            if duration > 0:
-                # Find the color for this power-up type
-                color = next(
-                    (p["color"] for p in POWERUP_TYPES if p["name"] == name),
-                    (255, 255, 255),
-                )
+    # Only spit from about where they stop, not on the way in
+    kind = zombies["kind"][ready]
+    center = zombies["position"][ready] + zombies["collider"][ready] // 2
+    offset = np.subtract(world.player_center(), center)
+    offset_x, offset_y = offset[:, 0], offset[:, 1]
+    length = np.maximum(0.1, np.sqrt(offset_x * offset_x + offset_y * offset_y))
+    close = (length <= ZOMBIE_STATS["range"][kind] + ZOMBIE_WIDTH).nonzero()[0]
+    if not len(close):
+        return
+    spitting = ready[close]
+    reload[spitting] = world.game_tick + ZOMBIE_STATS["spit_interval"][kind[close]]
+    world.entities["spit"].spawn(
+        len(spitting),
+        position=center[close] - (BULLET_WIDTH // 2, BULLET_HEIGHT // 2),
+        velocity=offset[close] / length[close][:, None] * SPIT_SPEED,
+        lifetime=world.game_tick + SPIT_LIFETIME,
+    )
 
-                # Draw indicator
-                indicator_text = SCORE_FONT.render(
-                    f"{name}: {duration//60}s", True, color
-                )
-                screen.blit(indicator_text, (10, 40 + active_powerup_count * 25))
-                active_powerup_count += 1
-
-        # Draw message if active
-        if message_timer > 0:
-            message_timer -= 1
-            message_surf = SCORE_FONT.render(message_text, True, (255, 255, 255))
-            # Fade out near the end
-            if message_timer < 30:
-                alpha = int(255 * (message_timer / 30))
-                temp_surf = pygame.Surface(message_surf.get_size(), pygame.SRCALPHA)
-                temp_surf.fill((255, 255, 255, alpha))
-                message_surf.blit(
-                    temp_surf, (0, 0), special_flags=pygame.BLEND_RGBA_MULT
-                )
 
-            screen.blit(
-                message_surf, (SCREEN_WIDTH // 2 - message_surf.get_width() // 2, 50)
+def contact_system(world):
+    """Resolve whatever touches the player and projectile hits on zombies."""
+    player = world.player
+    projectiles = [p for p in world.query("position", "damage") if len(p)]
+    if len(projectiles) == 1:
+        shots, damage = projectiles[0]["position"], projectiles[0]["damage"]
+    elif projectiles:
+        shots = np.concatenate([p["position"] for p in projectiles])
+        damage = np.concatenate([p["damage"] for p in projectiles])
+    else:
+        shots = damage = None
+    spent = set()  # Indices into shots of the projectiles used up this tick
+    player_min = np.array((player.x, player.y))
+    player_max = player_min + (PLAYER_WIDTH, PLAYER_HEIGHT)
+
+    for archetype in world.query("position", "collider", "harm"):
+        count = len(archetype)
+        if not count:
+            continue
+        position = archetype["position"]
+        collider = archetype["collider"]
+        far_corner = position + collider
+
+        # Anything overlapping the player hurts it and is used up
+        inside = (position < player_max) & (far_corner > player_min)
+        touching = (inside[:, 0] & inside[:, 1]).nonzero()[0]
+        if len(touching):
+            touched = position[touching] + collider[touching] // 2
+            if player.has_powerup("Shield"):
+                # Shield absorbs the hits; only zombies earn the bonus, so
+                # standing in a spitter's fire is not a way to farm score
+                scored = "health" in archetype.components
+                bonus = np.full(len(touched), SHIELD_BLOCK_BONUS if scored else 0)
+                world.events.emit("block", touched, bonus)
+            else:
+                harm = archetype["harm"][touching]
+                player.take_damage(int(harm.sum()))
+                world.events.emit("damage", touched, harm)
+        if "health" not in archetype.components:
+            if len(touching):
+                kept = np.ones(count, bool)
+                kept[touching] = False
+                archetype.keep(kept)
+            continue
+
+        # Projectile points inside the rest; each projectile hits one target,
+        # the earliest one in line, and a target takes one hit per tick
+        targets = []
+        used = []
+        if shots is not None and len(spent) < len(shots):
+            x, y = position[:, 0], position[:, 1]
+            x2, y2 = far_corner[:, 0], far_corner[:, 1]
+            shot_x, shot_y = shots[:, 0], shots[:, 1]
+            if count * len(shots) > BROAD_PHASE_PAIRS:
+                # Only shots inside the archetype's bounding box can hit it
+                near = (shot_x > x.min()) & (shot_x < x2.max())
+                near &= (shot_y > y.min()) & (shot_y < y2.max())
+                near = near.nonzero()[0]
+            else:
+                near = np.arange(len(shots))
+            if len(near):
+                near_x, near_y = shot_x[near], shot_y[near]
+                hits = (x[:, None] < near_x) & (near_x < x2[:, None])
+                hits &= (y[:, None] < near_y) & (near_y < y2[:, None])
+                if len(touching):
+                    hits[touching] = False
+                # (target, shot) pairs in order, taking a target's first
+                # unspent shot
+                hit, shot = hits.nonzero()
+                previous = -1
+                for i, j in zip(hit.tolist(), near[shot].tolist()):
+                    if i != previous and j not in spent:
+                        spent.add(j)
+                        targets.append(i)
+                        used.append(j)
+                        previous = i
+
+        health = archetype["health"]
+        killed = ()
+        if targets:
+            targets, used = np.array(targets), np.array(used)
+            dealt = damage[used]
+            health[targets] -= dealt
+            centers = position[targets] + collider[targets] // 2
+            world.events.emit("hit", centers, dealt)
+            world.events.emit("impact", shots[used], dealt)
+
+            # Score each kill by its type
+            dead = health[targets] <= 0
+            killed = targets[dead]
+            if len(killed):
+                scores = ZOMBIE_STATS["score"][archetype["kind"][killed]]
+                world.events.emit("kill", centers[dead], scores)
+        if len(touching) or len(killed):
+            kept = health > 0
+            kept[touching] = False
+            archetype.keep(kept)
+
+    # Remove the projectiles that hit something
+    if spent:
+        kept = np.ones(len(shots), bool)
+        kept[list(spent)] = False
+        start = 0
+        for archetype in projectiles:
+            end = start + len(archetype)
+            archetype.keep(kept[start:end])
+            start = end
+
+    if player.health <= 0:
+        world.game_over = True
+        world.events.emit("game_over")
+
+
+def movement_system(world):
+    for archetype in world.query("position", "velocity"):
+        if not len(archetype):
+            continue
+        position = archetype["position"]
+        position += archetype["velocity"]
+
+
+def lifetime_system(world):
+    """Remove entities whose lifetime ends this tick, such as bullets leaving the world."""
+    for archetype in world.query("lifetime"):
+        if len(archetype):
+            archetype.keep(archetype["lifetime"] > world.game_tick)
+
+
+def pickup_system(world):
+    """Apply the power-ups the player walks into."""
+    powerups = world.entities["powerup"]
+    if not len(powerups):
+        return
+    position = powerups["position"]
+    half = powerups["collider"] / 2
+    center = np.array(world.player_center())
+    inside = (position - half < center) & (center < position + half)
+    picked = (inside[:, 0] & inside[:, 1]).nonzero()[0]
+    if not len(picked):
+        return
+    for kind in powerups["sprite"][picked].tolist():
+        world.collect_powerup(POWERUP_TYPES[kind])
+    kept = np.ones(len(powerups), bool)
+    kept[picked] = False
+    powerups.keep(kept)
+
+
+def animation_system(world):
+    """Advance effect animations and remove the finished ones."""
+    step = quality_tier["effect_step"]
+    for archetype in world.query("sprite", "animation"):
+        if not len(archetype):
+            continue
+        animation = archetype["animation"]
+        animation[:, 2] += 1
+        due = animation[:, 2] >= animation[:, 1]
+        archetype["sprite"][due] += step
+        animation[due, 2] = 0
+        archetype.keep(archetype["sprite"] < animation[:, 0])
+
+
+def event_system(world):
+    """Hand the tick's events to the scoring, audio, effects and telemetry consumers."""
+    world.events.drain()
+
+
+# Run in this order every tick, after the player has moved
+WORLD_SYSTEMS = (
+    spawn_system,
+    seek_system,
+    spit_system,
+    contact_system,
+    movement_system,
+    lifetime_system,
+    pickup_system,
+    animation_system,
+    event_system,
+)
+
+
+# All gameplay state, advanced one fixed tick at a time
+class World:
+    def __init__(
+        self, seed=None, rocks=(), headless=False, on_sound=None, profile=True
+    ):
+        """Start a new run; the same seed and inputs always give the same game."""
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)  # Power-up placement and type
+        self.rocks = rocks
+        self.headless = headless  # No audio or effects consumers
+        self.on_sound = on_sound if on_sound is not None else play_sound
+
+        self.timers = TimerWheel()  # All countdowns are scheduled on this wheel
+        self.player = Player(self.timers)
+        self.entities = {
+            name: Archetype(name, defaults) for name, defaults in ARCHETYPES.items()
+        }
+        self.queries = {}  # Component tuples -> matching archetypes
+        # Time spent in each of WORLD_SYSTEMS; score verification runs without
+        self.profiler = SystemProfiler() if profile else None
+        self.telemetry = EventTelemetry()
+        self.events = EventBus()  # Drained by event_system at the end of each tick
+        self.events.subscribe(self.score_events)
+        self.events.subscribe(self.telemetry)
+        if not headless:
+            self.events.subscribe(self.play_event_sounds)
+            self.events.subscribe(self.spawn_event_effects)
+        self.game_over = False
+        self.fired = False  # Whether the player shot during the last step
+        self.next_shot_tick = 0  # Shooting cooldown deadline
+        self.message_text = ""
+        self.message_timer = None
+        self.ai_fire_timer = None
+        self.ai_target_line = None  # Targeting line drawn when the AI Assistant fires
+        self.sim_lod = SimulationLOD()  # Time-sliced updates for distant zombies
+        self.camera = Camera()  # Part of the simulation: spawns happen around the view
+        self.camera.follow(
+            self.player.x + PLAYER_WIDTH // 2, self.player.y + PLAYER_HEIGHT // 2
+        )
+
+        # Wave system variables
+        self.current_wave = 1
+        self.wave_duration = 1800  # 30 seconds per wave at 60 FPS
+        self.zombies_per_wave = 1  # Base number of zombies to spawn per second
+        self.wave_message = ""
+        self.wave_message_timer = None
+        self.spawn_scheduler = SpawnScheduler(self.seed)
+        self.spawn_scheduler.plan_wave(
+            self.current_wave, self.zombies_per_wave, 0, self.wave_duration
+        )
+
+        self.wave_timer = self.timers.schedule(
+            self.wave_duration, self.start_next_wave, repeat=True
+        )
+        self.powerup_timer = self.timers.schedule(600, self.spawn_powerup)
+
+    @property
+    def game_tick(self):
+        return self.timers.now
+
+    def score_events(self, events):
+        """Scoring consumer: kills and shield blocks earn points."""
+        for kind in ("kill", "block"):
+            if kind in events:
+                self.player.score += int(events[kind].values.sum())
+
+    def play_event_sounds(self, events):
+        """Audio consumer: each event type plays its sound once per tick."""
+        for kind in events:
+            sound = GAME_EVENTS[kind]
+            if sound is not None:
+                self.on_sound(sound)
+
+    def spawn_event_effects(self, events):
+        """Effects consumer: start an effect animation at every event position."""
+        for kind, effect in EVENT_EFFECTS.items():
+            if kind in events:
+                positions = events[kind].positions
+                self.entities[effect].spawn(len(positions), position=positions)
+
+    def query(self, *components):
+        """Return the archetypes that have all of the given components."""
+        matches = self.queries.get(components)
+        if matches is None:
+            matches = self.queries[components] = [
+                archetype
+                for archetype in self.entities.values()
+                if archetype.components.issuperset(components)
+            ]
+        return matches
+
+    def player_center(self):
+        return (
+            self.player.x + PLAYER_WIDTH // 2,
+            self.player.y + PLAYER_HEIGHT // 2,
+        )
+
+    def spawn_bullets(self, angles, color=BULLET_COLOR):
+        """Fire bullets from the player's centre at the given angles."""
+        player = self.player
+        x = float(player.x + PLAYER_WIDTH // 2 - BULLET_WIDTH // 2)
+        y = float(player.y + PLAYER_HEIGHT // 2 - BULLET_HEIGHT // 2)
+        # Bullets fly in a straight line, so the velocity is fixed at spawn
+        velocity = [
+            (math.cos(angle) * BULLET_SPEED, math.sin(angle) * BULLET_SPEED)
+            for angle in angles
+        ]
+        # They move on the tick they are fired and are gone once past the edge
+        lifetime = [
+            self.game_tick + ticks_to_leave_world(x, y, *move) - 1 for move in velocity
+        ]
+        self.entities["bullet"].spawn(
+            len(angles),
+            position=(x, y),
+            velocity=velocity,
+            color=color,
+            lifetime=lifetime,
+        )
+
+    def start_next_wave(self):
+        self.current_wave += 1
+        self.wave_message = f"Wave {self.current_wave} incoming!"
+        self.wave_message_timer = self.timers.schedule(180)  # Show for 3 seconds
+        self.events.emit("wave")
+
+        # Increase difficulty with each wave
+        self.zombies_per_wave = (
+            1 + self.current_wave // 2
+        )  # Increase zombies per second every 2 waves
+
+        # Plan the whole wave's spawns up front
+        self.spawn_scheduler.plan_wave(
+            self.current_wave,
+            self.zombies_per_wave,
+            self.timers.now,
+            self.wave_duration,
+        )
+
+    def spawn_powerup(self):
+        # Place it in view so the player can see it
+        power_up_x = self.camera.x + self.rng.randint(50, SCREEN_WIDTH - 50)
+        power_up_y = self.camera.y + self.rng.randint(50, SCREEN_HEIGHT - 50)
+
+        # Make sure it doesn't spawn on a rock, otherwise retry next tick
+        for rock in self.rocks:
+            if rock.collides_with(power_up_x - 15, power_up_y - 15, 30, 30):
+                self.powerup_timer = self.timers.schedule(1, self.spawn_powerup)
+                return
+
+        kind = self.rng.choice(POWERUP_TYPES)
+        self.entities["powerup"].spawn(
+            1, position=(power_up_x, power_up_y), sprite=POWERUP_TYPES.index(kind)
+        )
+        # Every 10 seconds
+        self.powerup_timer = self.timers.schedule(600, self.spawn_powerup)
+
+    def ai_assistant_fire(self):
+        player = self.player
+        if not player.has_powerup("AI Assistant"):
+            self.ai_fire_timer.cancel()
+            return
+
+        # Find the nearest target
+        nearest = None
+        for archetype in self.query("position", "collider", "health"):
+            if not len(archetype):
+                continue
+            position = archetype["position"]
+            distance = np.sqrt(
+                (position[:, 0] - player.x) ** 2 + (position[:, 1] - player.y) ** 2
             )
+            i = int(np.argmin(distance))
+            if nearest is None or distance[i] < nearest[0]:
+                nearest = (distance[i], position[i], archetype["collider"][i])
+        if nearest is None:
+            return
+        _, (target_x, target_y), (width, height) = nearest
+
+        # Calculate direction to the target
+        center_x, center_y = self.player_center()
+        angle = math.atan2(target_y - center_y, target_x - center_x)
+
+        # Create the AI bullet with a special color
+        self.spawn_bullets([angle], AI_ASSISTANT_COLOR)
 
-        # Draw shield effect if active
-        if player.active_powerups["Shield"] > 0:
-            shield_radius = 25 + int(5 * math.sin(pygame.time.get_ticks() / 100))
-            shield_surf = pygame.Surface(
-                (shield_radius * 2, shield_radius * 2), pygame.SRCALPHA
+        # Remember the targeting line for the visual effect
+        self.ai_target_line = (
+            (center_x, center_y),
+            (target_x + width // 2, target_y + height // 2),
+        )
+
+    def fire(self, cooldown):
+        self.spawn_bullets(self.player.shot_angles())
+        self.next_shot_tick = self.game_tick + cooldown
+        self.fired = True
+        self.events.emit("shot")
+
+    def collect_powerup(self, kind):
+        self.message_text = self.player.apply_powerup(kind)
+        self.message_timer = self.timers.schedule(120)  # Show for 2 seconds
+        self.events.emit("pickup")
+
+        # Special handling for AI Assistant
+        if kind["name"] == "AI Assistant":
+            # Fire every 10 ticks (6 times per second) while it lasts
+            if self.ai_fire_timer is None or not self.ai_fire_timer.active:
+                self.ai_fire_timer = self.timers.schedule(
+                    10, self.ai_assistant_fire, repeat=True
+                )
+
+    def step(self, inputs):
+        """Advance the simulation by one tick using this tick's inputs."""
+        player = self.player
+
+        # Advance the game tick and run any timers that are due
+        game_tick = self.timers.tick()
+        self.fired = False
+
+        # Update player aim
+        player.update_aim(inputs.aim_x, inputs.aim_y)
+
+        # Handle mouse shooting with cooldown, set by power-up status
+        if inputs.fire and game_tick >= self.next_shot_tick:
+            self.fire(5 if player.has_powerup("Rapid Fire") else 10)
+
+        # Also keep keyboard shooting for those who prefer it
+        if inputs.alt_fire and game_tick >= self.next_shot_tick:
+            self.fire(10)
+
+        # Handle player movement
+        if inputs.left:
+            player.move("left")
+        if inputs.right:
+            player.move("right")
+        if inputs.up:
+            player.move("up")
+        if inputs.down:
+            player.move("down")
+
+        # Keep the view on the player
+        self.camera.follow(*self.player_center())
+
+        # Spawning, movement, collisions and effects for every entity kind
+        if self.profiler is not None:
+            self.profiler.run(WORLD_SYSTEMS, self)
+        else:
+            for system in WORLD_SYSTEMS:
+                system(self)
+
+    def saved_timers(self):
+        """The timers a save keeps, in SAVE_TIMERS order (None when unset)."""
+        return [
+            self.wave_timer,
+            self.powerup_timer,
+            self.ai_fire_timer,
+            self.message_timer,
+            self.wave_message_timer,
+        ] + [self.player.active_powerups[kind["name"]] for kind in POWERUP_TYPES]
+
+    def timer_callback(self, role):
+        """Return what the SAVE_TIMERS timer `role` calls when it fires."""
+        if role in self.player.active_powerups:
+            return functools.partial(self.player.expire_powerup, role)
+        return {
+            "wave": self.start_next_wave,
+            "powerup_spawn": self.spawn_powerup,
+            "ai_fire": self.ai_assistant_fire,
+        }.get(role)
+
+    def snapshot(self):
+        """Pack the simulation state between ticks into a SAVE_VERSION blob.
+
+        Restoring it and stepping on gives the same game as stepping this
+        world, so a save can stand in for the ticks it took to get there.
+        """
+        out = SaveWriter()
+        out.data += SAVE_MAGIC
+        out.pack("H", SAVE_VERSION)
+
+        # Wave, shooting and message state
+        out.pack(
+            "q?qqqqq",
+            self.seed,
+            self.game_over,
+            self.timers.now,
+            self.next_shot_tick,
+            self.current_wave,
+            self.wave_duration,
+            self.zombies_per_wave,
+        )
+        out.text(self.message_text)
+        out.text(self.wave_message)
+        out.pack("qq", self.camera.x, self.camera.y)
+
+        # Player
+        player = self.player
+        out.pack(
+            "qqqqBddddd",
+            player.x,
+            player.y,
+            player.health,
+            player.score,
+            PLAYER_DIRECTIONS.index(player.direction),
+            player.mouse_x,
+            player.mouse_y,
+            player.angle,
+            player.speed,
+            player.base_speed,
+        )
+
+        # Random generators: the world's Mersenne Twister and the spawn
+        # planner's PCG64
+        version, state, gauss_next = self.rng.getstate()
+        out.pack(
+            "B625Id", version, *state, math.nan if gauss_next is None else gauss_next
+        )
+        planner = self.spawn_scheduler.rng.bit_generator.state
+        out.pack(
+            "QQQQ?I",
+            planner["state"]["state"] >> 64,
+            planner["state"]["state"] & (2**64 - 1),
+            planner["state"]["inc"] >> 64,
+            planner["state"]["inc"] & (2**64 - 1),
+            planner["has_uint32"],
+            planner["uinteger"],
+        )
+
+        # What is left of the spawn plan, and the LOD round-robin
+        scheduler = self.spawn_scheduler
+        start = scheduler.next_index
+        out.array(scheduler.plan_ticks[start:], np.int64)
+        out.array(scheduler.plan_x[start:], np.float64)
+        out.array(scheduler.plan_y[start:], np.float64)
+        out.array(scheduler.plan_speed[start:], np.float64)
+        out.array(scheduler.plan_kind[start:], np.int64)
+        out.pack("q", self.sim_lod.next_slot)
+
+        # Pending timers in wheel order, so same-tick timers fire in order
+        roles = {id(timer): i for i, timer in enumerate(self.saved_timers()) if timer}
+        entries = []
+        for depth, slot, timer in self.timers.entries():
+            if id(timer) in roles:
+                entries.append((depth, slot, timer, roles[id(timer)]))
+            elif timer.callback is not None:
+                raise ValueError(f"Cannot save timer {timer.callback!r}")
+            # Replaced message timers have nothing left to do
+        out.pack("I", len(entries))
+        for depth, slot, timer, role in entries:
+            out.pack("BHqqB", depth, slot, timer.expires_at, timer.interval or 0, role)
+
+        # Every entity, component by component
+        for archetype in self.entities.values():
+            out.pack("I", len(archetype))
+            for component in archetype.defaults:
+                out.rows(archetype[component], COMPONENTS[component][0])
+        return bytes(out.data)
+
+    def restore(self, data):
+        """Replace this world's state with a snapshot() blob.
+
+        Rocks, sound hooks and the headless setting stay this world's own.
+        """
+        source = SaveReader(data)
+        if bytes(source.take(len(SAVE_MAGIC))) != SAVE_MAGIC:
+            raise ValueError("Not a world save")
+        (version,) = source.unpack("H")
+        if version != SAVE_VERSION:
+            raise ValueError(f"Unsupported save version: {version}")
+
+        (
+            self.seed,
+            self.game_over,
+            now,
+            self.next_shot_tick,
+            self.current_wave,
+            self.wave_duration,
+            self.zombies_per_wave,
+        ) = source.unpack("q?qqqqq")
+        self.message_text = source.text()
+        self.wave_message = source.text()
+        self.camera.x, self.camera.y = source.unpack("qq")
+        self.fired = False
+        self.ai_target_line = None
+
+        player = self.player
+        (
+            player.x,
+            player.y,
+            player.health,
+            player.score,
+            direction,
+            player.mouse_x,
+            player.mouse_y,
+            player.angle,
+            player.speed,
+            player.base_speed,
+        ) = source.unpack("qqqqBddddd")
+        player.direction = PLAYER_DIRECTIONS[direction]
+
+        version, *state, gauss_next = source.unpack("B625Id")
+        self.rng.setstate(
+            (version, tuple(state), None if math.isnan(gauss_next) else gauss_next)
+        )
+        state_high, state_low, inc_high, inc_low, has_uint32, uinteger = source.unpack(
+            "QQQQ?I"
+        )
+        scheduler = self.spawn_scheduler
+        scheduler.rng.bit_generator.state = {
+            "bit_generator": "PCG64",
+            "state": {
+                "state": state_high << 64 | state_low,
+                "inc": inc_high << 64 | inc_low,
+            },
+            "has_uint32": int(has_uint32),
+            "uinteger": uinteger,
+        }
+
+        scheduler.plan_ticks = source.array(np.int64)
+        scheduler.plan_x = source.array(np.float64)
+        scheduler.plan_y = source.array(np.float64)
+        scheduler.plan_speed = source.array(np.float64)
+        scheduler.plan_kind = source.array(np.int64)
+        scheduler.next_index = 0
+        (self.sim_lod.next_slot,) = source.unpack("q")
+
+        # Rebuild the timers with fresh callbacks; unsaved ones are unset
+        timers = [None] * len(SAVE_TIMERS)
+        entries = []
+        for _ in range(source.unpack("I")[0]):
+            depth, slot, expires_at, interval, role = source.unpack("BHqqB")
+            timer = Timer(
+                self.timers,
+                expires_at,
+                self.timer_callback(SAVE_TIMERS[role]),
+                interval or None,
             )
-            pygame.draw.circle(
-                shield_surf,
-                (200, 0, 255, 100),
-                (shield_radius, shield_radius),
-                shield_radius,
-                3,
+            timers[role] = timer
+            entries.append((depth, slot, timer))
+        self.timers.restore(now, entries)
+        (
+            self.wave_timer,
+            self.powerup_timer,
+            self.ai_fire_timer,
+            self.message_timer,
+            self.wave_message_timer,
+        ) = timers[:5]
+        for kind, timer in zip(POWERUP_TYPES, timers[5:]):
+            player.active_powerups[kind["name"]] = timer
+
+        for archetype in self.entities.values():
+            (count,) = source.unpack("I")
+            values = {}
+            for component in archetype.defaults:
+                dtype, width = COMPONENTS[component]
+                values[component] = source.rows(dtype, count, width)
+            archetype.keep_last(0)
+            archetype.spawn(count, **values)
+        if source.offset != len(data):
+            raise ValueError("World save has trailing data")
+
+
+# Compact input recording for server-side score verification
+class ReplayRecorder:
+    def __init__(self, seed):
+        self.seed = seed
+        self.flags = bytearray()  # One byte of REPLAY_FLAGS bits per tick
+        self.aims = bytearray()  # Packed aim point, only for ticks that fired
+
+    def record(self, inputs, fired):
+        """Append one tick; the aim only matters on ticks where a shot went out."""
+        flags = 0
+        for bit, name in enumerate(REPLAY_FLAGS):
+            if getattr(inputs, name):
+                flags |= 1 << bit
+        if fired:
+            flags |= REPLAY_AIM_BIT
+            self.aims += struct.pack(
+                "<hh",
+                max(-32768, min(32767, int(inputs.aim_x))),
+                max(-32768, min(32767, int(inputs.aim_y))),
             )
-            screen.blit(
-                shield_surf,
+        self.flags.append(flags)
+
+    @property
+    def ticks(self):
+        return len(self.flags)
+
+    def to_dict(self):
+        """Serialize as a JSON-friendly dict."""
+        data = zlib.compress(bytes(self.flags) + bytes(self.aims), 9)
+        return {
+            "version": REPLAY_VERSION,
+            "seed": self.seed,
+            "ticks": self.ticks,
+            "inputs": base64.b64encode(data).decode("ascii"),
+        }
+
+
+def replay_inputs(replay):
+    """Decode a replay dict into a list of per-tick PlayerInputs."""
+    if replay.get("version") != REPLAY_VERSION:
+        raise ValueError(f"Unsupported replay version: {replay.get('version')}")
+    ticks = int(replay["ticks"])
+    if not 0 <= ticks <= MAX_REPLAY_TICKS:
+        raise ValueError(f"Replay tick count out of range: {ticks}")
+
+    # A flag byte per tick plus an aim point on ticks that shot; stop
+    # inflating as soon as the data runs past that
+    limit = ticks * 5
+    decompressor = zlib.decompressobj()
+    data = decompressor.decompress(base64.b64decode(replay["inputs"]), limit + 1)
+    if len(data) > limit:
+        raise ValueError("Replay inputs are longer than its tick count allows")
+    flags, aims = data[:ticks], data[ticks:]
+    if len(flags) != ticks:
+        raise ValueError("Replay is shorter than its tick count")
+
+    inputs = []
+    decoded = {}  # Most ticks repeat an earlier input; PlayerInputs are shared
+    aim_x = aim_y = 0
+    aim_offset = 0
+    for flag in flags:
+        if flag & REPLAY_AIM_BIT:
+            aim_x, aim_y = struct.unpack_from("<hh", aims, aim_offset)
+            aim_offset += 4
+        tick_inputs = decoded.get((flag, aim_x, aim_y))
+        if tick_inputs is None:
+            tick_inputs = decoded[flag, aim_x, aim_y] = PlayerInput(
+                aim_x,
+                aim_y,
+                *(bool(flag & (1 << bit)) for bit in range(len(REPLAY_FLAGS))),
+            )
+        inputs.append(tick_inputs)
+    if aim_offset != len(aims):
+        raise ValueError("Replay has trailing aim data")
+    return inputs
+
+
+def little_endian(dtype):
+    return np.dtype(dtype).newbyteorder("<")
+
+
+# Little-endian byte builder behind World.snapshot()
+class SaveWriter:
+    def __init__(self):
+        self.data = bytearray()
+
+    def pack(self, fmt, *values):
+        self.data += struct.pack("<" + fmt, *values)
+
+    def text(self, value):
+        encoded = value.encode("utf-8")
+        self.pack("H", len(encoded))
+        self.data += encoded
+
+    def rows(self, values, dtype):
+        """Append an array's raw little-endian bytes."""
+        self.data += (
+            np.asarray(values).astype(little_endian(dtype), copy=False).tobytes()
+        )
+
+    def array(self, values, dtype):
+        """Append a 1-D array with its length."""
+        self.pack("I", len(values))
+        self.rows(values, dtype)
+
+
+# Reads back what SaveWriter wrote, for World.restore()
+class SaveReader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def take(self, size):
+        if self.offset + size > len(self.data):
+            raise ValueError("World save is truncated")
+        chunk = self.data[self.offset : self.offset + size]
+        self.offset += size
+        return chunk
+
+    def unpack(self, fmt):
+        fmt = "<" + fmt
+        return struct.unpack(fmt, self.take(struct.calcsize(fmt)))
+
+    def text(self):
+        (size,) = self.unpack("H")
+        return bytes(self.take(size)).decode("utf-8")
+
+    def rows(self, dtype, count, width=1):
+        """Return `count` rows written by SaveWriter.rows() (a read-only view)."""
+        dtype = little_endian(dtype)
+        values = np.frombuffer(self.take(count * width * dtype.itemsize), dtype)
+        return values if width == 1 else values.reshape(count, width)
+
+    def array(self, dtype):
+        """Return a copy of a 1-D array written by SaveWriter.array()."""
+        (count,) = self.unpack("I")
+        return self.rows(dtype, count).astype(dtype)
+
+
+def save_world(world, path):
+    """Write a zlib-compressed World.snapshot() to `path`."""
+    with open(path, "wb") as f:
+        f.write(zlib.compress(world.snapshot()))
+
+
+def load_world(path, **options):
+    """Return a new World restored from a save_world() file.
+
+    `options` are World() arguments such as rocks and headless.
+    """
+    with open(path, "rb") as f:
+        data = zlib.decompress(f.read())
+    world = World(**options)
+    world.restore(data)
+    return world
+
+
+def verify_replay(replay, claimed_score):
+    """Re-simulate a replay headless; returns (accepted, simulated score)."""
+    try:
+        inputs = replay_inputs(replay)
+        world = World(int(replay["seed"]), headless=True, profile=False)
+    except (KeyError, TypeError, ValueError, struct.error, zlib.error) as e:
+        print(f"Rejected malformed replay: {e}")
+        return False, None
+
+    for tick_inputs in inputs:
+        if world.game_over:
+            # Inputs after the player died cannot come from a real run
+            return False, world.player.score
+        world.step(tick_inputs)
+
+    score = world.player.score
+    return score == claimed_score, score
+
+
+# Paces frames and yields to the event loop (the browser under pygbag) once each
+class FrameScheduler:
+    def __init__(self, fps=None):
+        self.fps = FPS if fps is None else fps
+        self.budget = 1 / self.fps if self.fps else None  # Seconds per frame
+        self.clock = pygame.time.Clock()
+        self.frame_started = time.perf_counter()
+        self.last_work_time = 0.0  # Seconds of work in the previous frame
+
+        # Metrics
+        self.frames = 0
+        self.over_budget_frames = 0
+        self.lean_frames = 0  # Frames that skipped optional work
+
+    def skip_optional(self):
+        """True when this frame should drop optional work to stay on budget."""
+        if self.budget is None:
+            return False
+        elapsed = time.perf_counter() - self.frame_started
+        if self.last_work_time > self.budget or elapsed > self.budget:
+            self.lean_frames += 1
+            return True
+        return False
+
+    async def next_frame(self):
+        """Finish the frame, wait for the next one and let other tasks run."""
+        self.last_work_time = time.perf_counter() - self.frame_started
+        self.frames += 1
+        if self.budget is not None and self.last_work_time > self.budget:
+            self.over_budget_frames += 1
+        self.clock.tick(self.fps)
+        await asyncio.sleep(0)
+        self.frame_started = time.perf_counter()
+
+    def report(self):
+        """Print how many frames went over budget or ran lean."""
+        print(
+            f"Frames: {self.frames}, over budget: {self.over_budget_frames}, "
+            f"lean (optional work skipped): {self.lean_frames}"
+        )
+
+
+# Everything the renderer needs from one simulation tick. capture_snapshot()
+# fills it into the back half of a SnapshotBuffers pair, so it can be drawn on
+# one thread while the next one is built on another; its arrays are read-only
+# and stay intact until the capture after next.
+RenderSnapshot = collections.namedtuple(
+    "RenderSnapshot",
+    [
+        "tick",
+        "game_over",
+        "camera",  # Camera copy for this tick's view
+        "player",  # (x, y, direction, shielded)
+        "zombies",  # (n, 2) float32 corners
+        "zombie_kinds",  # (n,) int8 indices into ZOMBIE_TYPES
+        "bullets",  # (n, 2) float32 corners, spit included
+        "bullet_colors",  # (n, 3) uint8
+        "powerups",  # (n, 2) int32 centres
+        "powerup_kinds",  # (n,) int8 indices into POWERUP_TYPES
+        "blood_splatters",  # (n, 3) int32 x, y, frame
+        "explosions",  # (n, 3) int32 x, y, frame
+        "ai_target_line",  # ((x, y), (x, y)) or None
+        "hud",
+    ],
+)
+HudState = collections.namedtuple(
+    "HudState",
+    [
+        "health",
+        "score",
+        "wave",
+        "powerups",  # (name, ticks left) for each active power-up
+        "message",
+        "message_remaining",
+        "wave_message",
+        "wave_message_remaining",
+        "lod_skipped",
+    ],
+)
+
+
+# Two preallocated sets of the arrays render snapshots point into. Each
+# capture writes the back set and swaps it to the front by reference.
+class SnapshotBuffers:
+    def __init__(self):
+        self.front = {}
+        self.back = {}
+
+    def rows(self, name, count, dtype, columns):
+        """The first `count` rows of the back array `name`, grown when full."""
+        array = self.back.get(name)
+        if array is None or len(array) < count:
+            capacity = ARCHETYPE_CAPACITY if array is None else 2 * len(array)
+            capacity = max(count, capacity)
+            shape = (capacity,) if columns == 1 else (capacity, columns)
+            array = self.back[name] = np.empty(shape, dtype)
+        return array[:count]
+
+    def copy(self, name, dtype, columns, *sources):
+        """Copy `sources` one after another into the back array `name`;
+        returns the rows written, read-only."""
+        rows = self.rows(name, sum(len(source) for source in sources), dtype, columns)
+        start = 0
+        for source in sources:
+            end = start + len(source)
+            np.copyto(rows[start:end], source, casting="unsafe")
+            start = end
+        rows.flags.writeable = False
+        return rows
+
+    def copy_effects(self, name, archetype):
+        """Copy an effect archetype as (n, 3) rows of x, y, frame."""
+        rows = self.rows(name, len(archetype), np.int32, 3)
+        np.copyto(rows[:, :2], archetype["position"], casting="unsafe")
+        np.copyto(rows[:, 2], archetype["sprite"], casting="unsafe")
+        rows.flags.writeable = False
+        return rows
+
+    def swap(self):
+        """Publish the back set; the old front is written by the next capture."""
+        self.front, self.back = self.back, self.front
+
+
+def projectile_rows(world):
+    """Return (positions, colors) of everything that flies, bullets and spit."""
+    flying = world.query("position", "velocity", "color")
+    return (
+        np.concatenate([archetype["position"] for archetype in flying]),
+        np.concatenate([archetype["color"] for archetype in flying]),
+    )
+
+
+def effect_rows(archetype):
+    """Return an effect archetype as (n, 3) rows of x, y, frame."""
+    return np.column_stack((archetype["position"], archetype["sprite"]))
+
+
+def capture_snapshot(world, buffers):
+    """Copy the renderer's view of the world out after a step, into the back
+    half of `buffers` (a SnapshotBuffers), and swap it to the front."""
+    player = world.player
+    line, world.ai_target_line = world.ai_target_line, None  # Drawn once
+    message_timer = world.message_timer
+    wave_timer = world.wave_message_timer
+    entities = world.entities
+    zombies = entities["zombie"]
+    powerups = entities["powerup"]
+    flying = world.query("position", "velocity", "color")
+
+    snapshot = RenderSnapshot(
+        tick=world.game_tick,
+        game_over=world.game_over,
+        camera=Camera(world.camera.x, world.camera.y),
+        player=(player.x, player.y, player.direction, player.has_powerup("Shield")),
+        zombies=buffers.copy("zombies", np.float32, 2, zombies["position"]),
+        zombie_kinds=buffers.copy("zombie_kinds", np.int8, 1, zombies["kind"]),
+        bullets=buffers.copy(
+            "bullets", np.float32, 2, *(archetype["position"] for archetype in flying)
+        ),
+        bullet_colors=buffers.copy(
+            "bullet_colors", np.uint8, 3, *(archetype["color"] for archetype in flying)
+        ),
+        powerups=buffers.copy("powerups", np.int32, 2, powerups["position"]),
+        powerup_kinds=buffers.copy("powerup_kinds", np.int8, 1, powerups["sprite"]),
+        blood_splatters=buffers.copy_effects(
+            "blood_splatters", entities["blood_splatter"]
+        ),
+        explosions=buffers.copy_effects("explosions", entities["explosion"]),
+        ai_target_line=line,
+        hud=HudState(
+            health=player.health,
+            score=player.score,
+            wave=world.current_wave,
+            powerups=tuple(
+                (name, player.powerup_remaining(name))
+                for name in player.active_powerups
+                if player.powerup_remaining(name) > 0
+            ),
+            message=world.message_text,
+            message_remaining=(
+                message_timer.remaining()
+                if message_timer is not None and message_timer.active
+                else 0
+            ),
+            wave_message=world.wave_message,
+            wave_message_remaining=(
+                wave_timer.remaining()
+                if wave_timer is not None and wave_timer.active
+                else 0
+            ),
+            lod_skipped=world.sim_lod.skipped_ratio(),
+        ),
+    )
+    buffers.swap()
+    return snapshot
+
+
+def advance_world(world, recorder, inputs):
+    """Run one tick with the given input and record it for the replay."""
+    world.step(inputs)
+    recorder.record(inputs, world.fired)
+
+    # Keep only the newest effects when the quality tier caps them
+    max_effects = quality_tier["max_effects"]
+    if max_effects is not None:
+        for archetype in world.query("animation"):
+            archetype.keep_last(max_effects)
+
+
+# Sleeps between fixed-rate simulation ticks, catching up a little when late
+class TickPacer:
+    def __init__(self, fps):
+        self.interval = 1 / fps if fps else 0.0
+        self.deadline = time.perf_counter()
+
+        # Metrics
+        self.late_ticks = 0  # Ticks that started behind schedule
+        self.dropped_time = 0.0  # Seconds given up after falling too far behind
+
+    def wait(self):
+        """Sleep until the next tick is due."""
+        self.deadline += self.interval
+        delay = self.deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+            return
+        self.late_ticks += 1
+        if -delay > self.interval * SIMULATION_MAX_CATCH_UP:
+            self.dropped_time += -delay
+            self.deadline = time.perf_counter()
+
+    def summary(self):
+        return f"late: {self.late_ticks}, time dropped: {self.dropped_time:.2f}s"
+
+
+# Runs the simulation at a fixed rate on a worker thread (SIMULATION_THREAD)
+class SimulationThread:
+    def __init__(self, world, recorder, fps=None):
+        self.world = world
+        self.recorder = recorder
+        self.fps = FPS if fps is None else fps
+        # deque appends and pops are atomic, so the two threads share it
+        # without a lock: the main thread appends, the worker pops
+        self.inputs = collections.deque(maxlen=INPUT_QUEUE_LENGTH)
+        # Front buffer: the newest published snapshot. The worker fills the
+        # next one into the back buffers and swaps this reference.
+        self.buffers = SnapshotBuffers()
+        self.snapshot = capture_snapshot(world, self.buffers)
+        self.running = False
+        self.thread = None
+        self.error = None  # Exception that stopped the worker, re-raised by stop()
+
+        # Metrics
+        self.ticks = 0
+        self.slowest_tick = 0.0
+        self.pacer = None
+
+    def push_input(self, inputs):
+        self.inputs.append(inputs)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the worker and wait for it; raises anything it died with."""
+        self.close()
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        """Stop the worker and wait for it; safe to call again, never raises."""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+
+    def run(self):
+        self.pacer = TickPacer(self.fps)
+        current = NO_INPUT
+        try:
+            while self.running and not self.world.game_over:
+                # Only the newest sample matters; held keys repeat anyway
+                while self.inputs:
+                    current = self.inputs.popleft()
+
+                started = time.perf_counter()
+                advance_world(self.world, self.recorder, current)
+                self.snapshot = capture_snapshot(self.world, self.buffers)
+                self.ticks += 1
+                self.slowest_tick = max(
+                    self.slowest_tick, time.perf_counter() - started
+                )
+                self.pacer.wait()
+        except Exception as e:
+            self.error = e
+
+    def result(self):
+        """Final (score, replay) of the run."""
+        return self.world.player.score, self.recorder.to_dict()
+
+    def report(self):
+        print(
+            f"Simulation thread: {self.ticks} ticks, {self.pacer.summary()}, "
+            f"slowest tick: {self.slowest_tick * 1000:.1f}ms"
+        )
+
+
+# Scalars published for each tick, stored as float64 in SharedWorld slots
+SHARED_FIELDS = (
+    "tick",
+    "game_over",
+    "camera_x",
+    "camera_y",
+    "player_x",
+    "player_y",
+    "direction",  # Index into PLAYER_DIRECTIONS
+    "shielded",
+    "health",
+    "score",
+    "wave",
+    "message_remaining",
+    "wave_message_remaining",
+    "lod_skipped",
+    "zombies",  # Counts of the rows in use in each array
+    "bullets",
+    "powerups",
+    "blood_splatters",
+    "explosions",
+    "ai_line",  # 1 when the AI Assistant fired this tick
+    "ai_start_x",
+    "ai_start_y",
+    "ai_end_x",
+    "ai_end_y",
+)
+# Control words shared by both processes
+SHARED_CONTROL = (
+    "published_slot",  # Newest complete slot, -1 before the first tick
+    "published_seq",  # Ticks published so far
+    "reading_slot",  # Slot claimed by the reader, never written meanwhile
+    "stop",  # Set by the game to end the simulation process
+    "input_seq",  # Odd while the game is writing the input words below
+    "aim_x",
+    "aim_y",
+    "input_flags",  # REPLAY_FLAGS bits
+    "quality_tier",  # Index into QUALITY_TIERS, for the effect caps
+    "sounds_written",  # Sound events pushed into the ring so far
+)
+PLAYER_DIRECTIONS = ("right", "left", "up", "down")
+
+
+def shared_world_layout():
+    """Return ({array name: (dtype, shape, offset)}, total bytes) for SharedWorld."""
+    arrays = [
+        ("control", np.int64, (len(SHARED_CONTROL),)),
+        ("slot_seq", np.int64, (SHARED_SLOTS,)),  # Odd while a slot is written
+        ("sounds", np.uint8, (SHARED_SOUND_RING,)),  # Indices into SOUNDS
+    ]
+    for slot in range(SHARED_SLOTS):
+        arrays += [
+            (f"{slot}.scalars", np.float64, (len(SHARED_FIELDS),)),
+            (f"{slot}.zombies", np.float32, (MAX_LIVE_ZOMBIES, 2)),
+            (f"{slot}.zombie_kinds", np.int8, (MAX_LIVE_ZOMBIES,)),
+            (f"{slot}.bullets", np.float32, (SHARED_MAX_BULLETS, 2)),
+            (f"{slot}.bullet_colors", np.uint8, (SHARED_MAX_BULLETS, 3)),
+            (f"{slot}.powerups", np.int32, (SHARED_MAX_POWERUPS, 2)),
+            (f"{slot}.powerup_kinds", np.int8, (SHARED_MAX_POWERUPS,)),
+            (f"{slot}.powerup_time", np.int32, (len(POWERUP_TYPES),)),
+            (f"{slot}.blood_splatters", np.int32, (SHARED_MAX_EFFECTS, 3)),
+            (f"{slot}.explosions", np.int32, (SHARED_MAX_EFFECTS, 3)),
+            (f"{slot}.text", np.uint8, (2, SHARED_TEXT_BYTES)),  # Both messages
+        ]
+
+    layout = {}
+    offset = 0
+    for name, dtype, shape in arrays:
+        offset += -offset % 8  # Keep every array 8-byte aligned
+        layout[name] = (dtype, shape, offset)
+        offset += np.dtype(dtype).itemsize * int(np.prod(shape))
+    return layout, offset
+
+
+# One running simulation's state in shared memory. The simulation process
+# publishes each tick into one of SHARED_SLOTS slots; readers attach by name
+# (the game, or an external tool such as a spectator view) and draw straight
+# from NumPy views of the newest slot.
+class SharedWorld:
+    def __init__(self, name=None):
+        """Create the shared memory block, or attach to an existing one by name."""
+        from multiprocessing import shared_memory  # Only this mode needs it
+
+        layout, size = shared_world_layout()
+        self.owner = name is None
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+
+        views = {
+            key: np.ndarray(shape, dtype, self.memory.buf, offset)
+            for key, (dtype, shape, offset) in layout.items()
+        }
+        self.control = views["control"]
+        self.slot_seq = views["slot_seq"]
+        self.sounds = views["sounds"]
+        self.slots = [
+            {
+                key.split(".", 1)[1]: view
+                for key, view in views.items()
+                if key.startswith(f"{slot}.")
+            }
+            for slot in range(SHARED_SLOTS)
+        ]
+        self.field = {name: i for i, name in enumerate(SHARED_FIELDS)}
+        self.word = {name: i for i, name in enumerate(SHARED_CONTROL)}
+        if self.owner:
+            self.control[:] = 0
+            self.control[self.word["published_slot"]] = -1
+            self.control[self.word["reading_slot"]] = -1
+
+        # Reader state
+        self.claimed = None  # (slot, its sequence number) being drawn
+        self.sounds_read = 0
+
+        # Metrics
+        self.torn_frames = 0  # Reads the writer overwrote (should stay 0)
+
+    # Writer side (simulation process)
+
+    def publish(self, world):
+        """Write the world into a free slot, then make it the newest."""
+        control = self.control
+        word = self.word
+        busy = (control[word["published_slot"]], control[word["reading_slot"]])
+        slot = next(i for i in range(SHARED_SLOTS) if i not in busy)
+
+        self.slot_seq[slot] += 1  # Odd: being written
+        self.write_slot(self.slots[slot], world)
+        self.slot_seq[slot] += 1  # Even: complete
+        control[word["published_slot"]] = slot
+        control[word["published_seq"]] += 1
+
+    def write_slot(self, views, world):
+        player = world.player
+        scalars = views["scalars"]
+        field = self.field
+
+        def fill(name, rows, capacity):
+            count = min(len(rows), capacity)
+            if count:
+                views[name][:count] = rows[:count]
+            scalars[field[name]] = count
+
+        entities = world.entities
+        fill("zombies", entities["zombie"]["position"], MAX_LIVE_ZOMBIES)
+        zombies = len(entities["zombie"])
+        views["zombie_kinds"][:zombies] = entities["zombie"]["kind"]
+        projectiles, colors = projectile_rows(world)
+        fill("bullets", projectiles, SHARED_MAX_BULLETS)
+        bullets = int(scalars[field["bullets"]])
+        views["bullet_colors"][:bullets] = colors[:bullets]
+        fill("powerups", entities["powerup"]["position"], SHARED_MAX_POWERUPS)
+        powerups = int(scalars[field["powerups"]])
+        views["powerup_kinds"][:powerups] = entities["powerup"]["sprite"][:powerups]
+        fill(
+            "blood_splatters",
+            effect_rows(entities["blood_splatter"]),
+            SHARED_MAX_EFFECTS,
+        )
+        fill("explosions", effect_rows(entities["explosion"]), SHARED_MAX_EFFECTS)
+        views["powerup_time"][:] = [
+            player.powerup_remaining(kind["name"]) for kind in POWERUP_TYPES
+        ]
+
+        # HUD messages, truncated and zero padded
+        for row, text in enumerate((world.message_text, world.wave_message)):
+            data = text.encode("utf-8")[:SHARED_TEXT_BYTES]
+            views["text"][row] = 0
+            views["text"][row, : len(data)] = np.frombuffer(data, np.uint8)
+
+        line, world.ai_target_line = world.ai_target_line, None  # Drawn once
+        if line is not None:
+            (start_x, start_y), (end_x, end_y) = line
+            scalars[field["ai_start_x"]] = start_x
+            scalars[field["ai_start_y"]] = start_y
+            scalars[field["ai_end_x"]] = end_x
+            scalars[field["ai_end_y"]] = end_y
+
+        message_timer = world.message_timer
+        wave_timer = world.wave_message_timer
+        for name, value in (
+            ("tick", world.game_tick),
+            ("game_over", world.game_over),
+            ("camera_x", world.camera.x),
+            ("camera_y", world.camera.y),
+            ("player_x", player.x),
+            ("player_y", player.y),
+            ("direction", PLAYER_DIRECTIONS.index(player.direction)),
+            ("shielded", player.has_powerup("Shield")),
+            ("health", player.health),
+            ("score", player.score),
+            ("wave", world.current_wave),
+            (
+                "message_remaining",
+                (
+                    message_timer.remaining()
+                    if message_timer is not None and message_timer.active
+                    else 0
+                ),
+            ),
+            (
+                "wave_message_remaining",
                 (
-                    player.x + PLAYER_WIDTH // 2 - shield_radius,
-                    player.y + PLAYER_HEIGHT // 2 - shield_radius,
+                    wave_timer.remaining()
+                    if wave_timer is not None and wave_timer.active
+                    else 0
                 ),
+            ),
+            ("lod_skipped", world.sim_lod.skipped_ratio()),
+            ("ai_line", line is not None),
+        ):
+            scalars[field[name]] = value
+
+    def read_input(self):
+        """Return (PlayerInput, quality tier) written by the game, or None mid-write."""
+        control = self.control
+        word = self.word
+        seq = control[word["input_seq"]]
+        if seq % 2:
+            return None
+        aim_x = int(control[word["aim_x"]])
+        aim_y = int(control[word["aim_y"]])
+        flags = int(control[word["input_flags"]])
+        tier = int(control[word["quality_tier"]])
+        if control[word["input_seq"]] != seq:
+            return None  # Rewritten while we read it; use the previous input
+        buttons = (bool(flags & (1 << bit)) for bit in range(len(REPLAY_FLAGS)))
+        return PlayerInput(aim_x, aim_y, *buttons), tier
+
+    def queue_sound(self, name):
+        """World sound hook: pass the sound to the drawing process to play."""
+        written = self.word["sounds_written"]
+        count = int(self.control[written])
+        self.sounds[count % SHARED_SOUND_RING] = list(SOUNDS).index(name)
+        self.control[written] = count + 1
+
+    def stop_requested(self):
+        return bool(self.control[self.word["stop"]])
+
+    # Reader side (game and other tools)
+
+    def write_input(self, inputs, tier):
+        control = self.control
+        word = self.word
+        flags = 0
+        for bit, name in enumerate(REPLAY_FLAGS):
+            if getattr(inputs, name):
+                flags |= 1 << bit
+        control[word["input_seq"]] += 1  # Odd: being written
+        control[word["aim_x"]] = int(inputs.aim_x)
+        control[word["aim_y"]] = int(inputs.aim_y)
+        control[word["input_flags"]] = flags
+        control[word["quality_tier"]] = tier
+        control[word["input_seq"]] += 1
+
+    def published(self):
+        return int(self.control[self.word["published_seq"]])
+
+    def snapshot(self):
+        """Claim the newest slot and wrap views of it in a RenderSnapshot."""
+        control = self.control
+        word = self.word
+        if self.claimed is not None:
+            slot, seq = self.claimed
+            if self.slot_seq[slot] != seq:
+                self.torn_frames += 1
+
+        # Claim the slot, then make sure it was still the newest one; the
+        # writer skips a claimed slot, so once this holds it is ours
+        while True:
+            slot = int(control[word["published_slot"]])
+            control[word["reading_slot"]] = slot
+            if control[word["published_slot"]] == slot:
+                break
+        self.claimed = (slot, int(self.slot_seq[slot]))
+
+        views = self.slots[slot]
+        scalars = views["scalars"]
+        value = dict(zip(SHARED_FIELDS, scalars.tolist()))
+        text = [
+            bytes(row).rstrip(b"\0").decode("utf-8", "ignore") for row in views["text"]
+        ]
+        powerups = int(value["powerups"])
+        ai_line = None
+        if value["ai_line"]:
+            ai_line = (
+                (value["ai_start_x"], value["ai_start_y"]),
+                (value["ai_end_x"], value["ai_end_y"]),
             )
 
-        # AI Assistant logic - continuously target zombies while active
-        if player.active_powerups["AI Assistant"] > 0:
-            if (
-                game_tick % 10 == 0
-            ):  # Fire every 10 frames (6 times per second at 60 FPS)
-                # Find the nearest zombie
-                if zombies:
-                    nearest_zombie = min(
-                        zombies,
-                        key=lambda z: ((z.x - player.x) ** 2 + (z.y - player.y) ** 2)
-                        ** 0.5,
+        return RenderSnapshot(
+            tick=int(value["tick"]),
+            game_over=bool(value["game_over"]),
+            camera=Camera(int(value["camera_x"]), int(value["camera_y"])),
+            player=(
+                value["player_x"],
+                value["player_y"],
+                PLAYER_DIRECTIONS[int(value["direction"])],
+                bool(value["shielded"]),
+            ),
+            zombies=views["zombies"][: int(value["zombies"])],
+            zombie_kinds=views["zombie_kinds"][: int(value["zombies"])],
+            bullets=views["bullets"][: int(value["bullets"])],
+            bullet_colors=views["bullet_colors"][: int(value["bullets"])],
+            powerups=views["powerups"][:powerups],
+            powerup_kinds=views["powerup_kinds"][:powerups],
+            blood_splatters=views["blood_splatters"][: int(value["blood_splatters"])],
+            explosions=views["explosions"][: int(value["explosions"])],
+            ai_target_line=ai_line,
+            hud=HudState(
+                health=int(value["health"]),
+                score=int(value["score"]),
+                wave=int(value["wave"]),
+                powerups=tuple(
+                    (kind["name"], remaining)
+                    for kind, remaining in zip(
+                        POWERUP_TYPES, views["powerup_time"].tolist()
                     )
+                    if remaining > 0
+                ),
+                message=text[0],
+                message_remaining=int(value["message_remaining"]),
+                wave_message=text[1],
+                wave_message_remaining=int(value["wave_message_remaining"]),
+                lod_skipped=value["lod_skipped"],
+            ),
+        )
 
-                    # Calculate direction to the zombie
-                    dx = nearest_zombie.x - (player.x + PLAYER_WIDTH // 2)
-                    dy = nearest_zombie.y - (player.y + PLAYER_HEIGHT // 2)
-
-                    # Calculate angle
-                    angle = math.atan2(dy, dx)
-
-                    # Create a bullet
-                    bullet_x = player.x + PLAYER_WIDTH // 2 - BULLET_WIDTH // 2
-                    bullet_y = player.y + PLAYER_HEIGHT // 2 - BULLET_HEIGHT // 2
-
-                    # Create the AI bullet with a special color
-                    ai_bullet = Bullet(bullet_x, bullet_y, angle)
-                    ai_bullet.color = (
-                        0,
-                        200,
-                        255,
-                    )  # Special color for AI bullets
-                    bullets.append(ai_bullet)
-
-                    # Visual effect for AI shooting
-                    # Create a temporary line showing the targeting
-                    pygame.draw.line(
-                        screen,
-                        (0, 200, 255, 150),
-                        (
-                            player.x + PLAYER_WIDTH // 2,
-                            player.y + PLAYER_HEIGHT // 2,
-                        ),
+    def drain_sounds(self):
+        """Return the names of sounds queued since the last call."""
+        written = int(self.control[self.word["sounds_written"]])
+        start = max(self.sounds_read, written - SHARED_SOUND_RING)
+        names = list(SOUNDS)
+        queued = [
+            names[self.sounds[i % SHARED_SOUND_RING]] for i in range(start, written)
+        ]
+        self.sounds_read = written
+        return queued
+
+    def close(self):
+        """Drop the views and detach; the creator also frees the memory."""
+        self.control = self.slot_seq = self.sounds = self.slots = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def run_simulation_process(name, seed, fps, results):
+    """Simulation process entry point: step the world into SharedWorld `name`."""
+    global quality_tier
+
+    shared = SharedWorld(name)
+    world = World(seed, on_sound=shared.queue_sound)
+    recorder = ReplayRecorder(world.seed)
+    pacer = TickPacer(fps)
+    current = NO_INPUT
+    ticks = 0
+    slowest = 0.0
+
+    while not shared.stop_requested():
+        if world.game_over:
+            time.sleep(0.01)  # Wait for the game to collect the result
+            continue
+
+        sample = shared.read_input()
+        if sample is not None:
+            current, tier = sample
+            quality_tier = QUALITY_TIERS[tier]
+
+        started = time.perf_counter()
+        advance_world(world, recorder, current)
+        shared.publish(world)
+        ticks += 1
+        slowest = max(slowest, time.perf_counter() - started)
+        pacer.wait()
+
+    world.sim_lod.report()
+    world.profiler.report()
+    world.telemetry.report()
+    results.send(
+        (
+            world.player.score,
+            recorder.to_dict(),
+            f"Simulation process: {ticks} ticks, {pacer.summary()}, "
+            f"slowest tick: {slowest * 1000:.1f}ms",
+        )
+    )
+    results.close()
+    shared.close()
+
+
+# Runs the simulation in a separate process (SIMULATION_PROCESS)
+class SimulationProcess:
+    def __init__(self, seed, fps=None):
+        import multiprocessing  # Only this mode needs it
+
+        self.shared = SharedWorld()
+        # Spawn rather than fork: this process already has threads and a window
+        context = multiprocessing.get_context("spawn")
+        self.results, child_results = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=run_simulation_process,
+            args=(self.shared.name, seed, FPS if fps is None else fps, child_results),
+            daemon=True,
+        )
+        self.outcome = None  # (score, replay, report) once stopped
+        self.closed = False
+
+    @property
+    def error(self):
+        if not self.process.is_alive() and self.outcome is None:
+            return RuntimeError(
+                f"Simulation process exited with code {self.process.exitcode}"
+            )
+        return None
+
+    def start(self):
+        """Start the process and wait until it has published its first tick."""
+        self.process.start()
+        print(f"Simulation process publishing to shared memory {self.shared.name}")
+        deadline = time.monotonic() + SHARED_START_TIMEOUT
+        while self.shared.published() == 0:
+            if self.error is not None or time.monotonic() > deadline:
+                self.process.kill()
+                self.close()
+                raise RuntimeError("Simulation process did not start")
+            time.sleep(0.001)
+
+    def push_input(self, inputs):
+        self.shared.write_input(inputs, QUALITY_TIERS.index(quality_tier))
+
+    @property
+    def snapshot(self):
+        return self.shared.snapshot()
+
+    def drain_sounds(self):
+        return self.shared.drain_sounds()
+
+    def stop(self):
+        """End the process, collect its result and free the shared memory."""
+        self.shared.control[self.shared.word["stop"]] = 1
+        if self.results.poll(SHARED_START_TIMEOUT):
+            self.outcome = self.results.recv()
+        self.close()
+        if self.outcome is None:
+            raise RuntimeError("Simulation process ended without a result")
+
+    def close(self):
+        """End the process and free the shared memory; safe to call again."""
+        if self.closed:
+            return
+        self.closed = True
+        self.shared.control[self.shared.word["stop"]] = 1
+        if self.process.is_alive():  # False if it never started
+            self.process.join(SHARED_START_TIMEOUT)
+        if self.process.is_alive():
+            self.process.kill()  # Stuck: the shared memory goes either way
+            self.process.join()
+        self.shared.close()
+
+    def result(self):
+        """Final (score, replay) of the run."""
+        return self.outcome[0], self.outcome[1]
+
+    def report(self):
+        print(self.outcome[2])
+        print(f"Shared memory: {self.shared.torn_frames} torn frames")
+
+
+# Steps render quality down when frames run long and back up when there is headroom
+class QualityGovernor:
+    def __init__(self, budget):
+        self.budget = budget  # Seconds per frame, or None to keep the current tier
+        self.samples = collections.deque(maxlen=QUALITY_WINDOW)
+        self.tier = QUALITY_TIERS.index(quality_tier)  # Carry over between runs
+        self.frames_in_tier = 0
+
+        # Telemetry
+        self.changes = []  # (frame, old tier, new tier, percentile seconds)
+        self.tier_frames = collections.Counter()  # Tier name -> frames spent
+        self.frames = 0
+
+    @property
+    def settings(self):
+        return QUALITY_TIERS[self.tier]
+
+    def percentile(self):
+        """Work time of the QUALITY_PERCENTILE-th slowest frame in the window."""
+        ordered = sorted(self.samples)
+        index = len(ordered) * QUALITY_PERCENTILE // 100
+        return ordered[min(index, len(ordered) - 1)]
+
+    def record(self, work_time):
+        """Add one frame's work time and change tier when the window calls for it."""
+        self.frames += 1
+        self.frames_in_tier += 1
+        self.tier_frames[self.settings["name"]] += 1
+        if self.budget is None:
+            return
+
+        self.samples.append(work_time)
+        if len(self.samples) < QUALITY_WINDOW:
+            return  # Judge only full windows, so one hitch never changes the tier
+
+        frame_time = self.percentile()
+        if frame_time > self.budget * QUALITY_STEP_DOWN:
+            if self.tier < len(QUALITY_TIERS) - 1:
+                self.set_tier(self.tier + 1, frame_time)
+        elif frame_time < self.budget * QUALITY_STEP_UP:
+            if self.tier > 0 and self.frames_in_tier >= QUALITY_HOLD_FRAMES:
+                self.set_tier(self.tier - 1, frame_time)
+
+    def set_tier(self, tier, frame_time):
+        global quality_tier
+        old_name = self.settings["name"]
+        self.changes.append(
+            (self.frames, old_name, QUALITY_TIERS[tier]["name"], frame_time)
+        )
+        self.tier = tier
+        quality_tier = QUALITY_TIERS[tier]
+        self.frames_in_tier = 0
+        self.samples.clear()  # Measure the new tier from scratch
+        print(
+            f"Quality {old_name} -> {quality_tier['name']} "
+            f"(p{QUALITY_PERCENTILE} frame time {frame_time * 1000:.1f}ms)"
+        )
+
+    def report(self):
+        """Print the final tier, how often it changed and time spent in each tier."""
+        spent = ", ".join(
+            f"{tier['name']}: {self.tier_frames[tier['name']]}"
+            for tier in QUALITY_TIERS
+            if self.tier_frames[tier["name"]]
+        )
+        print(
+            f"Quality tier: {self.settings['name']}, changes: {len(self.changes)}, "
+            f"frames per tier: {spent}"
+        )
+
+
+# Renders HUD labels only when their text changes
+class HudText:
+    def __init__(self, font):
+        self.font = font
+        self.surfaces = {}  # Label key -> ((text, color), surface)
+
+    def render(self, key, text, color, refresh=True):
+        """Return the label's surface; with refresh False a stale one may be reused."""
+        cached = self.surfaces.get(key)
+        if cached is not None and (cached[0] == (text, color) or not refresh):
+            return cached[1]
+        surface = self.font.render(text, True, color)
+        self.surfaces[key] = ((text, color), surface)
+        return surface
+
+
+# Main game loop, shared by the desktop and browser builds
+async def game_loop():
+    """Run the main game loop."""
+    if asset_loader is not None:
+        asset_loader.wait(GAMEPLAY_ASSET_JOBS)
+    scheduler = FrameScheduler()
+    quality = QualityGovernor(scheduler.budget)
+    hud = HudText(HUD_FONT)
+    wave_msg_font = pygame.font.SysFont("arial", round(36 * WINDOW_SCALE))
+    session_id = uuid.uuid4().hex  # Identifies this run for leaderboard dedup
+    show_debug = False  # Toggle with F3
+    zombie_grid = SpatialGrid(RENDER_LOD_CELL_SIZE)
+    show_lod_cells = False  # Toggle with F4 to outline collapsed crowd cells
+    quit_requested = False
+
+    # Keep the leaderboard warm during the run so it opens instantly afterwards
+    leaderboard_store.refresh()
+    next_leaderboard_refresh = time.monotonic() + LEADERBOARD_TTL
+
+    # With a simulation thread or process this loop only samples input and
+    # draws snapshots
+    simulation = None
+    try:
+        if SIMULATION_PROCESS:
+            world = recorder = None  # They live in the simulation process
+            simulation = SimulationProcess(random.getrandbits(32))
+            simulation.start()
+            snapshot = simulation.snapshot
+        else:
+            world = World(rocks=rocks)
+            recorder = ReplayRecorder(world.seed)  # Inputs for score verification
+            simulation = (
+                SimulationThread(world, recorder) if SIMULATION_THREAD else None
+            )
+            if simulation is not None:
+                simulation.start()
+            snapshot_buffers = SnapshotBuffers()
+            snapshot = capture_snapshot(world, snapshot_buffers)
+
+        while not snapshot.game_over and not quit_requested:
+            # Handle events
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    quit_requested = True
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    show_debug = not show_debug
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                    show_lod_cells = not show_lod_cells
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                    # Save the world for a bug report; only this loop's own world
+                    # is safe to read mid-run
+                    if simulation is None:
+                        path = f"world-{world.seed}-{world.game_tick}.sav"
+                        save_world(world, path)
+                        print(f"Saved the world at tick {world.game_tick} to {path}")
+
+            # Sample this tick's input; the aim point is in world coordinates,
+            # under the view the player is looking at
+            mouse_x, mouse_y = snapshot.camera.to_world(
+                *to_game_pos(pygame.mouse.get_pos())
+            )
+            keys = pygame.key.get_pressed()
+            inputs = PlayerInput(
+                mouse_x,
+                mouse_y,
+                pygame.mouse.get_pressed()[0],  # Left mouse button
+                keys[pygame.K_SPACE],
+                keys[pygame.K_LEFT] or keys[pygame.K_a],
+                keys[pygame.K_RIGHT] or keys[pygame.K_d],
+                keys[pygame.K_UP] or keys[pygame.K_w],
+                keys[pygame.K_DOWN] or keys[pygame.K_s],
+            )
+
+            # Advance the simulation, or hand the input over and take whatever
+            # was published last
+            if simulation is None:
+                advance_world(world, recorder, inputs)
+                snapshot = capture_snapshot(world, snapshot_buffers)
+            else:
+                simulation.push_input(inputs)
+                snapshot = simulation.snapshot
+                if simulation.error is not None:
+                    raise simulation.error
+            if SIMULATION_PROCESS:
+                for name in simulation.drain_sounds():
+                    play_sound(name)
+
+            if time.monotonic() >= next_leaderboard_refresh:
+                leaderboard_store.refresh()
+                next_leaderboard_refresh = time.monotonic() + LEADERBOARD_TTL
+
+            status = snapshot.hud
+            player_x, player_y, player_direction, shielded = snapshot.player
+
+            # Build the music up with each wave
+            if music_streamer is not None:
+                music_streamer.intensity = status.wave
+
+            # Drop effects and HUD re-rendering while running behind
+            lean = scheduler.skip_optional()
+
+            # Only draw what overlaps the view; everything else is still simulated
+            camera = snapshot.camera
+            visible_zombies, zombies_in_view = camera.visible_rows(
+                snapshot.zombies, ZOMBIE_MAX_SIZE, ZOMBIE_MAX_SIZE
+            )
+
+            # Draw background
+            draw_background(camera)
+
+            # Draw rocks
+            for rock in camera.visible(rocks, 40, 40):  # Rocks are at most 40px
+                rock.draw(camera)
+
+            # Draw visual effects under entities
+            if not lean:
+                splatters, _ = camera.visible_rows(snapshot.blood_splatters, 40, 40, 20)
+                draw_effects(splatters, blood_splatter_imgs, camera)
+
+            # Draw entities
+            draw_player(player_x, player_y, player_direction, camera)
+            collapsed_cells = draw_zombies_lod(
+                visible_zombies,
+                snapshot.zombie_kinds[zombies_in_view],
+                zombie_grid,
+                camera,
+            )
+            bullets, in_view = camera.visible_rows(
+                snapshot.bullets, BULLET_WIDTH + 4, BULLET_HEIGHT + 4, 2
+            )
+            draw_bullets(bullets, snapshot.bullet_colors[in_view], camera)
+
+            if show_lod_cells:
+                for key in collapsed_cells:
+                    cell = zombie_grid.cell_rect(key)
+                    pygame.draw.rect(
+                        world_surface,
+                        (255, 160, 0),
                         (
-                            nearest_zombie.x + ZOMBIE_WIDTH // 2,
-                            nearest_zombie.y + ZOMBIE_HEIGHT // 2,
+                            *camera.to_screen(*cell.topleft),
+                            to_render(cell.w),
+                            to_render(cell.h),
                         ),
                         1,
                     )
 
-        # Add this to the drawing section, after drawing the score
-        # Draw wave number
-        wave_text = SCORE_FONT.render(f"Wave: {current_wave}", True, (200, 200, 255))
-        screen.blit(wave_text, (SCREEN_WIDTH - 150, 40))
-
-        # Draw wave message if active
-        if wave_message_timer > 0:
-            wave_message_timer -= 1
-            wave_msg_font = pygame.font.SysFont("arial", 36)
-            wave_msg_surf = wave_msg_font.render(wave_message, True, (255, 100, 100))
-
-            # Fade out near the end
-            if wave_message_timer < 60:
-                alpha = int(255 * (wave_message_timer / 60))
-                temp_surf = pygame.Surface(wave_msg_surf.get_size(), pygame.SRCALPHA)
-                temp_surf.fill((255, 255, 255, alpha))
-                wave_msg_surf.blit(
-                    temp_surf, (0, 0), special_flags=pygame.BLEND_RGBA_MULT
+            # Draw explosions on top
+            if not lean:
+                explosions, _ = camera.visible_rows(snapshot.explosions, 60, 60, 30)
+                draw_effects(explosions, explosion_imgs, camera)
+
+            # Draw power-ups
+            powerups, in_view = camera.visible_rows(snapshot.powerups, 40, 40, 20)
+            for (x, y), kind in zip(
+                powerups.tolist(), snapshot.powerup_kinds[in_view].tolist()
+            ):
+                draw_powerup(x, y, POWERUP_TYPES[kind], camera)
+
+            # Draw shield effect if active
+            if shielded and not lean:
+                shield_radius = 25 + int(5 * math.sin(pygame.time.get_ticks() / 100))
+                radius = to_render(shield_radius)
+                shield_surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+                pygame.draw.circle(
+                    shield_surf,
+                    (200, 0, 255, 100),
+                    (radius, radius),
+                    radius,
+                    to_render(3),
+                )
+                center_x, center_y = camera.to_screen(
+                    player_x + PLAYER_WIDTH // 2, player_y + PLAYER_HEIGHT // 2
+                )
+                world_surface.blit(shield_surf, (center_x - radius, center_y - radius))
+
+            # Visual effect for AI shooting - a line showing the targeting
+            if snapshot.ai_target_line is not None:
+                start, end = snapshot.ai_target_line
+                pygame.draw.line(
+                    world_surface,
+                    (0, 200, 255, 150),
+                    camera.to_screen(*start),
+                    camera.to_screen(*end),
+                    to_render(1),
                 )
 
-            screen.blit(
-                wave_msg_surf,
-                (
-                    SCREEN_WIDTH // 2 - wave_msg_surf.get_width() // 2,
-                    SCREEN_HEIGHT // 3,
-                ),
+            # Scale the world to the window; the HUD is drawn on top at native size
+            scale_to_window(world_surface)
+
+            # Draw health bar
+            bar_x, bar_y = to_window_pos(10, 10)
+            bar_width, bar_height = to_window_pos(200, 20)
+            pygame.draw.rect(window, RED, (bar_x, bar_y, bar_width, bar_height))
+            pygame.draw.rect(
+                window,
+                GREEN,
+                (bar_x, bar_y, (status.health / 100) * bar_width, bar_height),  # Health
             )
 
-        pygame.display.flip()
-        clock.tick(FPS)
+            # Draw score
+            score_text = hud.render("score", f"Score: {status.score}", WHITE, not lean)
+            window.blit(score_text, to_window_pos(SCREEN_WIDTH - 150, 10))
+
+            # Draw active power-up indicators
+            for active_powerup_count, (name, duration) in enumerate(status.powerups):
+                # Find the color for this power-up type
+                color = next(
+                    (p["color"] for p in POWERUP_TYPES if p["name"] == name),
+                    (255, 255, 255),
+                )
+
+                # Draw indicator
+                indicator_text = hud.render(
+                    name, f"{name}: {duration//60}s", color, not lean
+                )
+                window.blit(
+                    indicator_text, to_window_pos(10, 40 + active_powerup_count * 25)
+                )
+
+            # Draw message if active
+            if status.message_remaining:
+                remaining = status.message_remaining
+                message_surf = HUD_FONT.render(status.message, True, (255, 255, 255))
+                # Fade out near the end
+                if remaining < 30:
+                    alpha = int(255 * (remaining / 30))
+                    temp_surf = pygame.Surface(message_surf.get_size(), pygame.SRCALPHA)
+                    temp_surf.fill((255, 255, 255, alpha))
+                    message_surf.blit(
+                        temp_surf, (0, 0), special_flags=pygame.BLEND_RGBA_MULT
+                    )
+
+                window.blit(
+                    message_surf,
+                    (
+                        window.get_width() // 2 - message_surf.get_width() // 2,
+                        to_window_pos(0, 50)[1],
+                    ),
+                )
+
+            # Add this to the drawing section, after drawing the score
+            # Draw wave number
+            wave_text = hud.render(
+                "wave", f"Wave: {status.wave}", (200, 200, 255), not lean
+            )
+            window.blit(wave_text, to_window_pos(SCREEN_WIDTH - 150, 40))
+
+            # Draw wave message if active
+            if status.wave_message_remaining:
+                remaining = status.wave_message_remaining
+                wave_msg_surf = wave_msg_font.render(
+                    status.wave_message, True, (255, 100, 100)
+                )
+
+                # Fade out near the end
+                if remaining < 60:
+                    alpha = int(255 * (remaining / 60))
+                    temp_surf = pygame.Surface(
+                        wave_msg_surf.get_size(), pygame.SRCALPHA
+                    )
+                    temp_surf.fill((255, 255, 255, alpha))
+                    wave_msg_surf.blit(
+                        temp_surf, (0, 0), special_flags=pygame.BLEND_RGBA_MULT
+                    )
+
+                window.blit(
+                    wave_msg_surf,
+                    (
+                        window.get_width() // 2 - wave_msg_surf.get_width() // 2,
+                        window.get_height() // 3,
+                    ),
+                )
+
+            # Draw debug overlay
+            if show_debug:
+                debug_text = HUD_FONT.render(
+                    f"Zombies: {len(visible_zombies)}/{len(snapshot.zombies)} drawn  "
+                    f"LOD skipped: {status.lod_skipped * 100:.0f}%  "
+                    f"FPS: {scheduler.clock.get_fps():.0f}  "
+                    f"Quality: {quality.settings['name']}",
+                    True,
+                    (180, 180, 180),
+                )
+                window.blit(debug_text, to_window_pos(10, SCREEN_HEIGHT - 30))
+                if voice_manager is not None:
+                    voice_text = HUD_FONT.render(
+                        f"Sounds coalesced: {sum(voice_manager.coalesced.values())}  "
+                        f"dropped: {sum(voice_manager.dropped.values())}  "
+                        f"stolen: {sum(voice_manager.stolen.values())}",
+                        True,
+                        (180, 180, 180),
+                    )
+                    window.blit(voice_text, to_window_pos(10, SCREEN_HEIGHT - 55))
+                if SIMULATION_PROCESS:
+                    sim_mode = "process"
+                else:
+                    sim_mode = "thread" if simulation else "inline"
+                render_text = HUD_FONT.render(
+                    f"Render: {world_surface.get_width()}x{world_surface.get_height()} -> "
+                    f"{window.get_width()}x{window.get_height()}  "
+                    f"Sim: {sim_mode} tick {snapshot.tick}",
+                    True,
+                    (180, 180, 180),
+                )
+                window.blit(render_text, to_window_pos(10, SCREEN_HEIGHT - 80))
+
+            pygame.display.flip()
+            await scheduler.next_frame()
+            quality.record(scheduler.last_work_time)
+
+        snapshot = None  # May hold views into the simulation's shared memory
+        if simulation is not None:
+            simulation.stop()
+            simulation.report()
+            score, replay = simulation.result()
+        else:
+            score, replay = world.player.score, recorder.to_dict()
+    finally:
+        # Also on an error in the draw loop: end the simulation and free its
+        # shared memory. Does nothing when stop() already ran
+        snapshot = None
+        if simulation is not None:
+            simulation.close()
+    if world is not None:
+        world.sim_lod.report()
+        world.profiler.report()
+        world.telemetry.report()
+    scheduler.report()
+    quality.report()
+    if voice_manager is not None:
+        voice_manager.report()
+    if music_streamer is not None:
+        music_streamer.intensity = 0  # Back to the calm menu music
 
     # Display game over screen
-    if show_game_over_screen(player.score):
+    if await show_game_over_screen(score, session_id, replay):
         # Restart the game if the function returns True
         return True
     else:
         return False  # Return to title screen instead of restarting
 
 
-def show_title_screen():
+async def show_title_screen():
     """Display an AI-themed title screen with leaderboard option."""
     global SOUND_ENABLED, SOUND_VOLUME  # Declare globals at the beginning of the function
 
@@ -1544,7 +5007,9 @@ def show_title_screen():
     )
 
     start_text = subtitle_font.render("Start Game", True, (255, 255, 255))
+    loading_text = subtitle_font.render("Loading...", True, (200, 200, 200))
     leaderboard_text = subtitle_font.render("Leaderboard", True, (255, 255, 255))
+    start_requested = False  # Start clicked; waiting on gameplay assets
 
     # Create background elements
     background_img = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -1572,16 +5037,24 @@ def show_title_screen():
         # Add glow effect
         pygame.draw.circle(background_img, (0, 100, 200, 50), (x, y), size * 2)
 
+    scheduler = FrameScheduler(60)
     while title_screen:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.MOUSEBUTTONDOWN:
-                if start_button.collidepoint(event.pos):
-                    title_screen = False
-                elif leaderboard_button.collidepoint(event.pos):
-                    show_leaderboard_screen()
+                if start_button.collidepoint(to_game_pos(event.pos)):
+                    start_requested = True
+                elif leaderboard_button.collidepoint(to_game_pos(event.pos)):
+                    await show_leaderboard_screen()
+
+        # Start as soon as the assets the game needs have loaded
+        assets_ready = asset_loader is None or asset_loader.is_ready(
+            GAMEPLAY_ASSET_JOBS
+        )
+        if start_requested and assets_ready:
+            title_screen = False
 
         # Update pulse effect
         pulse_value += 0.05 * pulse_direction
@@ -1659,21 +5132,32 @@ def show_title_screen():
             )
 
         # Draw buttons with hover effect
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = to_game_pos(pygame.mouse.get_pos())
 
         # Start button
         start_color = (
             (0, 150, 250) if start_button.collidepoint(mouse_pos) else (0, 120, 200)
         )
         pygame.draw.rect(screen, start_color, start_button, border_radius=5)
+        button_text = (
+            start_text if assets_ready or not start_requested else loading_text
+        )
         screen.blit(
-            start_text,
+            button_text,
             (
-                start_button.x + (start_button.width - start_text.get_width()) // 2,
-                start_button.y + (start_button.height - start_text.get_height()) // 2,
+                start_button.x + (start_button.width - button_text.get_width()) // 2,
+                start_button.y + (start_button.height - button_text.get_height()) // 2,
             ),
         )
 
+        # Asset loading progress bar
+        if asset_loader is not None and not asset_loader.is_ready():
+            bar = pygame.Rect(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT - 30, 200, 8)
+            pygame.draw.rect(screen, (0, 60, 100), bar, border_radius=4)
+            filled = bar.copy()
+            filled.width = int(bar.width * asset_loader.progress())
+            pygame.draw.rect(screen, (0, 200, 255), filled, border_radius=4)
+
         # Leaderboard button
         leaderboard_color = (
             (0, 130, 220)
@@ -1690,18 +5174,29 @@ def show_title_screen():
                 + (leaderboard_button.height - leaderboard_text.get_height()) // 2,
             ),
         )
-        pygame.display.flip()
-        pygame.time.Clock().tick(60)
+        present()
+        await scheduler.next_frame()
 
 
-def show_game_over_screen(score):
+async def show_game_over_screen(score, session=None, replay=None):
     """Display an enhanced game over screen with integrated email input."""
     screen.fill((5, 7, 15))  # Dark background
 
     email = ""
     input_active = True
-    submitted = False
     message = ""
+    session = session or uuid.uuid4().hex
+    pending_key = None  # Outbox key once the score has been queued
+    sent_at = None
+
+    # Look up the player's rank without holding up the screen
+    rank_lookup = {}
+    if IN_BROWSER:
+        rank_lookup["rank"] = get_rank(score)
+    else:
+        threading.Thread(
+            target=lambda: rank_lookup.update(rank=get_rank(score)), daemon=True
+        ).start()
 
     # Create input box
     input_box = pygame.Rect(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 40, 300, 40)
@@ -1741,7 +5236,7 @@ def show_game_over_screen(score):
 
     # Main loop
     waiting = True
-    clock = pygame.time.Clock()
+    scheduler = FrameScheduler(60)
 
     while waiting:
         for event in pygame.event.get():
@@ -1751,22 +5246,17 @@ def show_game_over_screen(score):
 
             if event.type == pygame.MOUSEBUTTONDOWN:
                 # Check if input box clicked
-                if input_box.collidepoint(event.pos):
+                if input_box.collidepoint(to_game_pos(event.pos)):
                     input_active = True
                 # Check if submit button clicked
-                elif submit_button.collidepoint(event.pos) and email:
+                elif submit_button.collidepoint(to_game_pos(event.pos)) and email:
                     if email_regex.match(email):
-                        # Submit score to leaderboard
-                        if submit_score_to_leaderboard(email, score):
-                            message = "Score submitted successfully!"
-                            submitted = True
-                            waiting = False
-                        else:
-                            message = "Error submitting score. Please try again."
+                        # Queue the score; delivery happens in the background
+                        pending_key = submit_score(email, score, session, replay)
                     else:
                         message = "Please enter a valid email address."
                 # Check if skip button clicked
-                elif skip_button.collidepoint(event.pos):
+                elif skip_button.collidepoint(to_game_pos(event.pos)):
                     waiting = False
 
             if event.type == pygame.KEYDOWN:
@@ -1774,12 +5264,7 @@ def show_game_over_screen(score):
                     if event.key == pygame.K_RETURN:
                         # Submit on Enter key
                         if email and email_regex.match(email):
-                            if submit_score_to_leaderboard(email, score):
-                                message = "Score submitted successfully!"
-                                submitted = True
-                                waiting = False
-                            else:
-                                message = "Error submitting score. Please try again."
+                            pending_key = submit_score(email, score, session, replay)
                         else:
                             message = "Please enter a valid email address."
                     elif event.key == pygame.K_BACKSPACE:
@@ -1789,6 +5274,13 @@ def show_game_over_screen(score):
                         if len(email) < 30 and event.unicode.isprintable():
                             email += event.unicode
 
+        # Show the delivery status as it changes
+        if pending_key is not None:
+            status, retry_in = score_outbox.status(pending_key)
+            message = describe_submission_status(status, retry_in)
+            if status == "sent" and sent_at is None:
+                sent_at = pygame.time.get_ticks()
+
         # Draw background with grid effect
         screen.fill((5, 7, 15))
         for x in range(0, SCREEN_WIDTH, 20):
@@ -1835,8 +5327,11 @@ def show_game_over_screen(score):
             ),
         )
 
-        # Score text
-        score_text = score_font.render(f"Your Score: {score}", True, (200, 255, 255))
+        # Score text, with the rank once it is known
+        score_line = f"Your Score: {score}"
+        if "rank" in rank_lookup:
+            score_line += f"  (Rank #{rank_lookup['rank']})"
+        score_text = score_font.render(score_line, True, (200, 255, 255))
         screen.blit(
             score_text,
             (SCREEN_WIDTH // 2 - score_text.get_width() // 2, title_y + 70),
@@ -1871,7 +5366,7 @@ def show_game_over_screen(score):
             )
 
         # Draw submit button with hover effect
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = to_game_pos(pygame.mouse.get_pos())
         submit_color = (
             (0, 150, 250) if submit_button.collidepoint(mouse_pos) else (100, 100, 100)
         )
@@ -1945,7 +5440,11 @@ def show_game_over_screen(score):
             message_surface = message_font.render(
                 message,
                 True,
-                (255, 200, 200) if "Error" in message else (200, 255, 200),
+                (
+                    (255, 200, 200)
+                    if "Error" in message or "retrying" in message
+                    else (200, 255, 200)
+                ),
             )
             screen.blit(
                 message_surface,
@@ -1955,14 +5454,13 @@ def show_game_over_screen(score):
                 ),
             )
 
-        pygame.display.flip()
-        clock.tick(60)
+        present()
+        await scheduler.next_frame()
 
-        # If submitted, wait a moment then continue
-        if submitted:
-            pygame.time.delay(1500)
+        # If submitted, keep the screen up a moment then continue
+        if sent_at is not None and pygame.time.get_ticks() - sent_at >= 1500:
             if random.random() < 0.5:  # 50% chance to show leaderboard first
-                show_leaderboard_screen()
+                await show_leaderboard_screen()
             return False  # Return to title screen instead of restarting
 
     # If skipped, just return to title screen
@@ -2013,474 +5511,113 @@ class Rock:
         # Create a collision rect - but it won't be used for collision detection
         self.rect = pygame.Rect(x, y, size, size)
 
-    def draw(self):
+    def draw(self, camera):
+        surface = render_sprite(self.surface)
+        if not quality_tier["rock_pulse"]:
+            world_surface.blit(surface, camera.to_screen(self.x, self.y))
+            return
+
         # Add a subtle pulsing effect to match the environment
         pulse = math.sin(pygame.time.get_ticks() / 1000) * 0.2 + 0.8
-        temp_surf = self.surface.copy()
+        temp_surf = surface.copy()
 
         # Apply pulsing to the highlights
         if random.random() < 0.01:  # Occasional stronger pulse
-            glow = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
+            size = temp_surf.get_width()
+            glow = pygame.Surface((size, size), pygame.SRCALPHA)
             pygame.draw.circle(
                 glow,
                 (0, 200, 255, 40),
-                (self.size // 2, self.size // 2),
-                self.size // 2 + 4,
+                (size // 2, size // 2),
+                size // 2 + to_render(4),
             )
             temp_surf.blit(glow, (0, 0))
 
-        screen.blit(temp_surf, (self.x, self.y))
+        world_surface.blit(temp_surf, camera.to_screen(self.x, self.y))
 
     def collides_with(self, x, y, width, height):
         # Always return False - no collision detection
         return False
 
 
-# Add this class for power-ups
-class PowerUp:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.type = random.choice(POWERUP_TYPES)
-        self.name = self.type["name"]
-        self.color = self.type["color"]
-        self.duration = self.type["duration"]
-        self.pulse = 0
-        self.pulse_dir = 1
+# Pre-rendered power-up orbs, keyed by (name, glow size, glows)
+powerup_sprite_cache = {}
 
-    def update(self):
-        # Update pulse animation
-        self.pulse += 0.1 * self.pulse_dir
-        if self.pulse >= 1.0:
-            self.pulse_dir = -1
-        elif self.pulse <= 0.0:
-            self.pulse_dir = 1
-
-    def draw(self):
-        # Draw glowing orb
-        glow_size = 15 + int(5 * math.sin(pygame.time.get_ticks() / 200))
-
-        # Outer glow
-        for radius in range(glow_size, glow_size - 10, -2):
-            alpha = max(0, 150 - (glow_size - radius) * 30)
-            glow_surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(
-                glow_surf, (*self.color, alpha), (radius, radius), radius
-            )
-            screen.blit(glow_surf, (self.x - radius, self.y - radius))
 
-        # Core
-        pygame.draw.circle(screen, (255, 255, 255), (self.x, self.y), 6)
+def get_powerup_sprite(kind, glow_size, glows):
+    """Return a POWERUP_TYPES entry's orb at game resolution, centred in a
+    POWERUP_ORB_SIZE square."""
+    key = (kind["name"], glow_size, glows)
+    if key in powerup_sprite_cache:
+        return powerup_sprite_cache[key]
 
-        # Symbol based on power-up type
-        if self.name == "AI Assistant":
-            # AI symbol (resembling a circuit)
-            pygame.draw.line(
-                screen, (255, 255, 255), (self.x - 4, self.y), (self.x + 4, self.y), 2
-            )
-            pygame.draw.line(
-                screen, (255, 255, 255), (self.x, self.y - 4), (self.x, self.y + 4), 2
-            )
-            pygame.draw.circle(screen, (255, 255, 255), (self.x, self.y), 2)
-        elif self.name == "Speed Boost":
-            # Lightning bolt symbol
-            points = [
-                (self.x - 3, self.y - 5),
-                (self.x + 1, self.y - 1),
-                (self.x - 1, self.y + 1),
-                (self.x + 3, self.y + 5),
-            ]
-            pygame.draw.lines(screen, (255, 255, 255), False, points, 2)
-        elif self.name == "Shield":
-            # Shield symbol
-            pygame.draw.arc(
-                screen,
-                (255, 255, 255),
-                (self.x - 5, self.y - 5, 10, 10),
-                math.pi * 0.75,
-                math.pi * 2.25,
-                2,
-            )
-        elif self.name == "Rapid Fire":
-            # Rapid fire symbol
-            pygame.draw.circle(screen, (255, 255, 255), (self.x - 2, self.y), 1)
-            pygame.draw.circle(screen, (255, 255, 255), (self.x, self.y), 1)
-            pygame.draw.circle(screen, (255, 255, 255), (self.x + 2, self.y), 1)
-
-
-# Modify your game_loop function to be async-compatible
-async def async_game_loop():
-    """Async version of game_loop for browser compatibility"""
-    # Create game objects - same as in game_loop
-    clock = pygame.time.Clock()
-    player = Player()
-    zombies = []
-    bullets = []
-    zombie_spawn_timer = 0
-    game_over = False
-    powerup_timer = 0
-    powerups = []
-    mouse_cooldown = 0
-    blood_splatters = []
-    explosions = []
-    message_text = ""
-    message_timer = 0
-    game_tick = 0
-
-    # Wave system variables
-    current_wave = 1
-    wave_timer = 0
-    wave_duration = 1800
-    zombies_per_wave = 1
-    wave_message = ""
-    wave_message_timer = 0
-
-    # Create rocks
-    rocks = []
-    for _ in range(ROCK_COUNT):
-        size = random.randint(30, 50)
-        x = random.randint(0, SCREEN_WIDTH - size)
-        y = random.randint(0, SCREEN_HEIGHT - size)
-        rocks.append(Rock(x, y, size, False))  # No obstacles
-
-    for _ in range(SMALL_ROCK_COUNT):
-        size = random.randint(10, 25)
-        x = random.randint(0, SCREEN_WIDTH - size)
-        y = random.randint(0, SCREEN_HEIGHT - size)
-        rocks.append(Rock(x, y, size, False))
-
-    while not game_over:
-        # Allow browser to update
-        await asyncio.sleep(0)
+    orb = pygame.Surface((POWERUP_ORB_SIZE, POWERUP_ORB_SIZE), pygame.SRCALPHA)
+    x = y = POWERUP_ORB_SIZE // 2
+    color = kind["color"]
+    name = kind["name"]
 
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-        # Get input state
-        keys = pygame.key.get_pressed()
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_buttons = pygame.mouse.get_pressed()
+    # Outer glow, or a flat ring when glows are off
+    if not glows:
+        pygame.draw.circle(orb, color, (x, y), 10)
+    else:
+        for radius in range(glow_size, glow_size - 10, -2):
+            alpha = max(0, 150 - (glow_size - radius) * 30)
+            glow_surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(glow_surf, (*color, alpha), (radius, radius), radius)
+            orb.blit(glow_surf, (x - radius, y - radius))
+
+    # Core
+    pygame.draw.circle(orb, (255, 255, 255), (x, y), 6)
+
+    # Symbol based on power-up type
+    if name == "AI Assistant":
+        # AI symbol (resembling a circuit)
+        pygame.draw.line(orb, (255, 255, 255), (x - 4, y), (x + 4, y), 2)
+        pygame.draw.line(orb, (255, 255, 255), (x, y - 4), (x, y + 4), 2)
+        pygame.draw.circle(orb, (255, 255, 255), (x, y), 2)
+    elif name == "Speed Boost":
+        # Lightning bolt symbol
+        points = [
+            (x - 3, y - 5),
+            (x + 1, y - 1),
+            (x - 1, y + 1),
+            (x + 3, y + 5),
+        ]
+        pygame.draw.lines(orb, (255, 255, 255), False, points, 2)
+    elif name == "Shield":
+        # Shield symbol
+        pygame.draw.arc(
+            orb,
+            (255, 255, 255),
+            (x - 5, y - 5, 10, 10),
+            math.pi * 0.75,
+            math.pi * 2.25,
+            2,
+        )
+    elif name == "Rapid Fire":
+        # Rapid fire symbol
+        pygame.draw.circle(orb, (255, 255, 255), (x - 2, y), 1)
+        pygame.draw.circle(orb, (255, 255, 255), (x, y), 1)
+        pygame.draw.circle(orb, (255, 255, 255), (x + 2, y), 1)
 
-        # Rest of your game loop code - copy from game_loop but add await asyncio.sleep(0) periodically
+    powerup_sprite_cache[key] = orb
+    return orb
 
-        # Update display
-        pygame.display.flip()
-        clock.tick(FPS)
 
-    # Game over handling
-    if show_game_over_screen(player.score):
-        return True
-    else:
-        return False
+def draw_powerup(x, y, kind, camera):
+    """Draw a power-up orb of the given POWERUP_TYPES entry centred on (x, y)."""
+    glow_size = 15 + int(5 * math.sin(pygame.time.get_ticks() / 200))
+    orb = render_sprite(get_powerup_sprite(kind, glow_size, quality_tier["glows"]))
+    x, y = camera.to_screen(x, y)
+    world_surface.blit(orb, (x - orb.get_width() // 2, y - orb.get_height() // 2))
 
 
-# Create an async version of your main function
+# Title screen and game loop, shared by the desktop and browser builds
 async def async_main():
-    """Async version of main for browser compatibility"""
-    global player_img, zombie_img, bullet_img, background_img, blood_splatter_imgs, explosion_imgs, rocks
-
-    print("Starting async_main for browser")
     browser_debug_info()  # Print debug info
-
-    # Initialize game assets
-    await initialize_images_async()
-
     while True:
-        # Show title screen and wait for player to start
-        restart = await async_show_title_screen()
-        if restart:
-            # Run game loop
-            play_again = await async_game_loop()
-            if not play_again:
-                # If player doesn't want to play again, show title screen
-                continue
-
-        # Allow browser to update
-        await asyncio.sleep(0)
-
-
-# Create an async version of initialize_images
-async def initialize_images_async():
-    """Async version of initialize_images for browser compatibility"""
-    global player_img, zombie_img, bullet_img, background_img, blood_splatter_imgs, explosion_imgs, rocks
-
-    print("Initializing images in async mode")
-
-    # Load sounds with browser compatibility
-    if not IN_BROWSER:
-        load_sounds()
-        ensure_sound_directory()
-        play_background_music()
-    else:
-        # Simplified sound loading for browser
-        try:
-            load_sounds()
-            print("Sounds loaded in browser mode")
-        except Exception as e:
-            print(f"Error loading sounds in browser: {e}")
-
-    # Create player image
-    player_img = pygame.Surface((PLAYER_WIDTH, PLAYER_HEIGHT), pygame.SRCALPHA)
-    pygame.draw.rect(player_img, (40, 90, 180), (6, 6, 20, 20), border_radius=3)
-    pygame.draw.circle(player_img, (0, 200, 255, 200), (16, 16), 5)
-
-    # Create zombie image
-    zombie_img = pygame.Surface((ZOMBIE_WIDTH, ZOMBIE_HEIGHT), pygame.SRCALPHA)
-    pygame.draw.rect(zombie_img, (100, 150, 50), (6, 6, 20, 20), border_radius=3)
-
-    # Create bullet image
-    bullet_img = pygame.Surface((BULLET_WIDTH, BULLET_HEIGHT), pygame.SRCALPHA)
-    pygame.draw.circle(
-        bullet_img,
-        (255, 100, 50),
-        (BULLET_WIDTH // 2, BULLET_HEIGHT // 2),
-        BULLET_WIDTH // 2,
-    )
-
-    # Create background
-    background_img = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-    background_img.fill((10, 10, 20))
-
-    # Create blood splatter images
-    blood_splatter_imgs = []
-    for _ in range(3):
-        img = pygame.Surface((20, 20), pygame.SRCALPHA)
-        pygame.draw.circle(img, (150, 0, 0, 200), (10, 10), random.randint(5, 10))
-        blood_splatter_imgs.append(img)
-
-    # Create explosion images
-    explosion_imgs = []
-    for size in range(5, 20, 5):
-        img = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-        pygame.draw.circle(img, (255, 200, 50, 200), (size, size), size)
-        explosion_imgs.append(img)
-
-    # Allow browser to update
-    await asyncio.sleep(0)
-    print("Async image initialization complete")
-
-
-# Create a proper async version of the title screen
-async def async_show_title_screen():
-    """Async version of show_title_screen for browser compatibility"""
-    global SOUND_ENABLED, SOUND_VOLUME, MUSIC_ENABLED
-
-    print("Showing async title screen")
-    title_screen = True
-    title_font = pygame.font.SysFont("arial", 50)
-    subtitle_font = pygame.font.SysFont("arial", 24)
-
-    # Create buttons
-    start_button = pygame.Rect(
-        SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 80, 200, 40
-    )
-    start_text = subtitle_font.render("Start Game", True, (255, 255, 255))
-
-    # Background
-    background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-    background.fill((10, 10, 20))
-
-    # Main loop
-    while title_screen:
-        # Allow browser to update
-        await asyncio.sleep(0)
-
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if start_button.collidepoint(event.pos):
-                    title_screen = False
-                    return True
-
-        # Get mouse position
-        mouse_pos = pygame.mouse.get_pos()
-
-        # Draw background
-        screen.blit(background, (0, 0))
-
-        # Draw title
-        title_text = title_font.render("Zombie Shooter", True, (0, 200, 255))
-        screen.blit(
-            title_text,
-            (SCREEN_WIDTH // 2 - title_text.get_width() // 2, SCREEN_HEIGHT // 4),
-        )
-
-        # Draw start button
-        start_color = (
-            (0, 150, 250) if start_button.collidepoint(mouse_pos) else (0, 120, 200)
-        )
-        pygame.draw.rect(screen, start_color, start_button, border_radius=5)
-        screen.blit(
-            start_text,
-            (
-                start_button.x + (start_button.width - start_text.get_width()) // 2,
-                start_button.y + (start_button.height - start_text.get_height()) // 2,
-            ),
-        )
-
-        # Update display
-        pygame.display.flip()
-
-    return True
-
-
-# Update the async_game_loop to be a complete implementation
-async def async_game_loop():
-    """Complete async version of game_loop for browser compatibility"""
-    print("Starting async game loop")
-
-    # Create game objects
-    clock = pygame.time.Clock()
-    player = Player()
-    zombies = []
-    bullets = []
-    zombie_spawn_timer = 0
-    game_over = False
-
-    # Wave system variables
-    current_wave = 1
-    wave_timer = 0
-    wave_duration = 1800  # 30 seconds at 60 FPS
-    zombies_per_wave = 1
-
-    # Main game loop
-    while not game_over:
-        # Allow browser to update
-        await asyncio.sleep(0)
-
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-        # Get input state
-        keys = pygame.key.get_pressed()
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_buttons = pygame.mouse.get_pressed()
-
-        # Move player based on keyboard input
-        if keys[pygame.K_w] or keys[pygame.K_UP]:
-            player.move("up")
-        if keys[pygame.K_s] or keys[pygame.K_DOWN]:
-            player.move("down")
-        if keys[pygame.K_a] or keys[pygame.K_LEFT]:
-            player.move("left")
-        if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
-            player.move("right")
-
-        # Shoot bullets
-        if mouse_buttons[0]:  # Left mouse button
-            new_bullet = Bullet(
-                player.x + PLAYER_WIDTH // 2,
-                player.y + PLAYER_HEIGHT // 2,
-                mouse_pos[0],
-                mouse_pos[1],
-            )
-            bullets.append(new_bullet)
-            play_sound("shoot")
-
-        # Update wave timer
-        wave_timer += 1
-        if wave_timer >= wave_duration:
-            current_wave += 1
-            wave_timer = 0
-            play_sound("wave_start")
-            zombies_per_wave = 1 + current_wave // 2
-
-        # Spawn zombies
-        zombie_spawn_timer += 1
-        spawn_rate = max(10, 60 // zombies_per_wave)
-        if zombie_spawn_timer >= spawn_rate:
-            zombies_to_spawn = 1 + current_wave // 3
-            for _ in range(zombies_to_spawn):
-                new_zombie = Zombie()
-                new_zombie.speed = min(4.0, ZOMBIE_SPEED * (1 + current_wave * 0.1))
-                zombies.append(new_zombie)
-            zombie_spawn_timer = 0
-
-        # Update zombies
-        for zombie in zombies[:]:
-            zombie.move(player.x + PLAYER_WIDTH // 2, player.y + PLAYER_HEIGHT // 2)
-
-            # Check collision with player
-            if (
-                zombie.x < player.x + PLAYER_WIDTH
-                and zombie.x + ZOMBIE_WIDTH > player.x
-                and zombie.y < player.y + PLAYER_HEIGHT
-                and zombie.y + ZOMBIE_HEIGHT > player.y
-            ):
-                zombies.remove(zombie)
-                player.take_damage(25)
-                play_sound("player_damage")
-                if player.health <= 0:
-                    game_over = True
-                    play_sound("game_over")
-
-        # Update bullets
-        for bullet in bullets[:]:
-            bullet.move()
-
-            # Remove bullets that go off screen
-            if (
-                bullet.x < 0
-                or bullet.x > SCREEN_WIDTH
-                or bullet.y < 0
-                or bullet.y > SCREEN_HEIGHT
-            ):
-                bullets.remove(bullet)
-                continue
-
-            # Check bullet collisions with zombies
-            for zombie in zombies[:]:
-                if (
-                    zombie.x < bullet.x < zombie.x + ZOMBIE_WIDTH
-                    and zombie.y < bullet.y < zombie.y + ZOMBIE_HEIGHT
-                ):
-                    zombies.remove(zombie)
-                    bullets.remove(bullet)
-                    player.score += 10
-                    play_sound("zombie_hit")
-                    break
-
-        # Draw everything
-        screen.fill((10, 10, 20))
-
-        # Draw player
-        screen.blit(player_img, (player.x, player.y))
-
-        # Draw zombies
-        for zombie in zombies:
-            screen.blit(zombie_img, (zombie.x, zombie.y))
-
-        # Draw bullets
-        for bullet in bullets:
-            screen.blit(bullet_img, (bullet.x, bullet.y))
-
-        # Draw UI
-        health_text = SCORE_FONT.render(
-            f"Health: {player.health}", True, (255, 255, 255)
-        )
-        score_text = SCORE_FONT.render(f"Score: {player.score}", True, (255, 255, 255))
-        wave_text = SCORE_FONT.render(f"Wave: {current_wave}", True, (200, 200, 255))
-
-        screen.blit(health_text, (10, 10))
-        screen.blit(score_text, (10, 40))
-        screen.blit(wave_text, (SCREEN_WIDTH - 150, 40))
-
-        # Update display
-        pygame.display.flip()
-        clock.tick(FPS)
-
-    # Game over
-    print("Game over, score:", player.score)
-    return False  # Don't restart automatically
+        await show_title_screen()
+        await game_loop()
 
 
 # Move the test_sound_system function definition to before it's called
@@ -2510,7 +5647,7 @@ def test_sound_system():
         return False
 
 
-# Add this after the load_sounds function to create the sound directory and explain how to add sounds
+# Create the sound directory and explain how to add sounds
 def ensure_sound_directory():
     """Create the sound directory and print instructions for adding sound files."""
     sounds_dir = os.path.join(ASSETS_DIR, "sounds")
@@ -2547,16 +5684,17 @@ def browser_debug_info():
 
 # Update your entry point to handle both desktop and browser
 if __name__ == "__main__":
-    initialize_images()
-    if IN_BROWSER:
-        # Browser mode - use asyncio
-        print("Running in browser mode")
-        asyncio.run(async_main())
-    else:
-        # Desktop mode - use original code
-        print("Running in desktop mode")
-        while True:
-            show_title_screen()
-            restart = game_loop()
-            if not restart:
-                continue
+    init_game()
+    profile = "--startup-profile" in sys.argv
+    run_startup_phase("assets (queued)", lambda: start_asset_loading(profile))
+    if profile:
+        print_startup_profile()
+
+    # Deliver any scores left in the outbox by a previous session
+    if score_outbox.pending_count():
+        score_outbox.start()
+
+    # Bring the local leaderboard up to date while the player is in the menus
+    leaderboard_store.sync_in_background()
+    print("Running in browser mode" if IN_BROWSER else "Running in desktop mode")
+    asyncio.run(async_main())
@@ -0,0 +1,58 @@
+import bisect
+import random
+
+import pytest
+
+import main as game
+
+
+def random_scores(rng, count):
+    """Scores with plenty of ties, and a few well past the starting capacity."""
+    scores = []
+    for _ in range(count):
+        if scores and rng.random() < 0.4:
+            scores.append(rng.choice(scores))
+        elif rng.random() < 0.05:
+            scores.append(rng.randint(5000, 20000))
+        else:
+            scores.append(rng.randint(0, 300))
+    return scores
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_count_above_bucket_matches_sorted_list(seed):
+    rng = random.Random(seed)
+    index = game.ScoreRankIndex(bucket_size=5, capacity=4)  # Small, so it regrows
+    scores = random_scores(rng, 400)
+    for score in scores:
+        index.add(score)
+    scores.sort()
+
+    for probe in list(range(-10, 320)) + [4999, 5000, 20000, 20001, 10**6]:
+        bucket_end = (max(0, probe // 5) + 1) * 5
+        expected = len(scores) - bisect.bisect_left(scores, bucket_end)
+        assert index.count_above_bucket(probe) == expected, probe
+    assert index.total == len(scores)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_store_rank_matches_sorted_list(tmp_path, seed):
+    rng = random.Random(seed)
+    store = game.LeaderboardStore(str(tmp_path / "leaderboard.db"))
+    scores = random_scores(rng, 200)
+
+    def check(stored, probes):
+        ordered = sorted(stored)
+        for probe in probes:
+            expected = len(ordered) - bisect.bisect_right(ordered, probe) + 1
+            assert store.rank(probe) == expected, probe
+
+    # The index is built on the first lookup, then kept up to date by later
+    # scores, so check both halves
+    half = len(scores) // 2
+    for i, score in enumerate(scores[:half]):
+        store.record_local(f"player{i}@example.com", score, f"session-{i}")
+    check(scores[:half], scores + [-1, 0, 301, 4999, 20001])
+    for i, score in enumerate(scores[half:], half):
+        store.record_local(f"player{i}@example.com", score, f"session-{i}")
+    check(scores, scores + list(range(-3, 310, 7)) + [5001, 19999, 20000, 10**6])
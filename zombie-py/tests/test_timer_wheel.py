@@ -0,0 +1,69 @@
+import pytest
+
+import main as game
+
+
+def run_until(wheel, tick):
+    while wheel.now < tick:
+        wheel.tick()
+
+
+def small_wheel():
+    """4 slots and 2 levels: level 1 reaches 16 ticks out, later timers overflow."""
+    return game.TimerWheel(slots=4, levels=2)
+
+
+@pytest.mark.parametrize("start", [0, 3, 13, 16])
+def test_timers_fire_on_their_tick_across_levels(start):
+    wheel = small_wheel()
+    run_until(wheel, start)
+    fired = []
+    delays = [1, 3, 4, 5, 15, 16, 17, 31, 40, 63, 64, 100]
+    for delay in delays:
+        wheel.schedule(delay, lambda delay=delay: fired.append((delay, wheel.now)))
+
+    run_until(wheel, start + max(delays) + 20)
+    assert sorted(fired) == [(delay, start + delay) for delay in delays]
+
+
+def test_cancelled_timers_never_fire():
+    wheel = small_wheel()
+    fired = []
+    timers = {
+        delay: wheel.schedule(delay, lambda delay=delay: fired.append(delay))
+        for delay in (2, 6, 20, 50, 70)
+    }
+    timers[6].cancel()
+    run_until(wheel, 10)
+    # Cancel one timer still in the overflow and one already cascaded down
+    timers[70].cancel()
+    run_until(wheel, 49)
+    timers[50].cancel()
+    run_until(wheel, 100)
+
+    assert fired == [2, 20]
+    for delay in (6, 50, 70):
+        assert not timers[delay].active
+        assert timers[delay].remaining() == 0
+
+
+def test_repeating_timer_reschedules_until_cancelled():
+    wheel = small_wheel()
+    ticks = []
+    timer = wheel.schedule(5, lambda: ticks.append(wheel.now), repeat=True)
+    run_until(wheel, 23)
+    timer.cancel()
+    run_until(wheel, 60)
+
+    assert ticks == [5, 10, 15, 20]
+
+
+def test_remaining_counts_down_to_zero():
+    wheel = game.TimerWheel()
+    timer = wheel.schedule(70)
+    run_until(wheel, 30)
+    assert timer.remaining() == 40
+
+    run_until(wheel, 70)
+    assert timer.fired
+    assert timer.remaining() == 0
@@ -0,0 +1,30 @@
+import main as game
+from verify_replays import Bot
+
+
+def play(world, bot, ticks, *others):
+    """Step `world` with the bot's inputs, feeding the same inputs to `others`."""
+    for _ in range(ticks):
+        inputs = bot.inputs(world)
+        world.step(inputs)
+        for other in others:
+            other.step(inputs)
+
+
+def test_restored_world_steps_bit_for_bit_like_the_original():
+    world = game.World(7, headless=True, profile=False)
+    world.player.health = 10**9  # Keep the bot alive for the whole run
+    bot = Bot(7)
+    play(world, bot, 600)
+
+    # Restore into a world that already has entities and state of its own
+    restored = game.World(99, headless=True, profile=False)
+    play(restored, Bot(99), 300)
+    restored.restore(world.snapshot())
+    assert restored.snapshot() == world.snapshot()
+
+    for _ in range(4):
+        play(world, bot, 500, restored)
+        assert restored.snapshot() == world.snapshot(), world.game_tick
+    assert restored.game_tick == world.game_tick == 2600
+    assert restored.player.score == world.player.score
@@ -0,0 +1,152 @@
+"""Verify leaderboard scores by re-running their input replays headless.
+
+Clients started with SCORE_VERIFICATION=1 attach a seeded input replay to
+every score they submit. This re-simulates each replay faster than real time
+in a process pool and accepts the score only if the simulation reaches it:
+
+    python verify_replays.py submissions.jsonl --workers 8
+
+The input file has one JSON submission per line with "score" and "replay"
+(and optionally "email"). Pass --selftest N to record N bot runs and verify
+those instead.
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import main as game
+
+
+def verify_submission(submission):
+    """Worker: returns (accepted, simulated score, seconds spent)."""
+    start = time.perf_counter()
+    accepted, score = game.verify_replay(submission["replay"], submission["score"])
+    return accepted, score, time.perf_counter() - start
+
+
+class VerificationPool:
+    """Process pool that checks submissions in parallel."""
+
+    def __init__(self, workers=None):
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+
+    def check(self, submission):
+        """Block until one submission is verified; safe to call from many threads."""
+        return self.executor.submit(verify_submission, submission).result()
+
+    def map(self, submissions):
+        return self.executor.map(verify_submission, submissions)
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class Bot:
+    """Simple player: shoots at the nearest zombie and wanders about."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.moves = [False] * 4
+
+    def inputs(self, world):
+        """Return the bot's PlayerInput for the world's next tick."""
+        player = world.player
+        zombies = world.entities["zombie"]["position"]
+        # Aim at the nearest zombie, or anywhere when there is none
+        if len(zombies):
+            target_x, target_y = zombies[
+                np.argmin(np.hypot(zombies[:, 0] - player.x, zombies[:, 1] - player.y))
+            ]
+            aim_x = int(target_x + game.ZOMBIE_WIDTH // 2)
+            aim_y = int(target_y + game.ZOMBIE_HEIGHT // 2)
+        else:
+            aim_x, aim_y = world.camera.to_world(
+                self.rng.randint(0, game.SCREEN_WIDTH),
+                self.rng.randint(0, game.SCREEN_HEIGHT),
+            )
+        # Change direction about twice a second
+        if self.rng.random() < 1 / 30:
+            self.moves = [self.rng.random() < 0.3 for _ in range(4)]
+
+        return game.PlayerInput(aim_x, aim_y, True, False, *self.moves)
+
+
+def record_bot_run(seed, ticks):
+    """Play a simple bot for up to `ticks` ticks and return its submission."""
+    bot = Bot(seed)
+    world = game.World(seed, headless=True, profile=False)
+    recorder = game.ReplayRecorder(world.seed)
+
+    while world.game_tick < ticks and not world.game_over:
+        inputs = bot.inputs(world)
+        world.step(inputs)
+        recorder.record(inputs, world.fired)
+
+    return {
+        "email": f"bot{seed}@example.com",
+        "score": world.player.score,
+        "replay": recorder.to_dict(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("submissions", nargs="?", help="JSON lines file to verify")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--selftest", type=int, default=0, help="verify N recorded bot runs"
+    )
+    parser.add_argument(
+        "--ticks", type=int, default=36000, help="bot run length (10 minutes)"
+    )
+    args = parser.parse_args()
+
+    if args.selftest:
+        print(f"Recording {args.selftest} bot runs...")
+        submissions = [
+            record_bot_run(seed, args.ticks) for seed in range(args.selftest)
+        ]
+        # Tamper with one claim to show a rejection
+        submissions[-1]["score"] += 10
+    elif args.submissions:
+        with open(args.submissions) as f:
+            submissions = [json.loads(line) for line in f if line.strip()]
+    else:
+        parser.error("pass a submissions file or --selftest N")
+
+    pool = VerificationPool(args.workers)
+    start = time.perf_counter()
+    results = list(pool.map(submissions))
+    wall_time = time.perf_counter() - start
+    pool.close()
+
+    accepted = 0
+    durations = []
+    simulated_ticks = 0
+    for submission, (ok, score, seconds) in zip(submissions, results):
+        accepted += ok
+        durations.append(seconds)
+        simulated_ticks += submission["replay"].get("ticks", 0)
+        print(
+            f"{'ACCEPT' if ok else 'REJECT'} {submission.get('email', '?'):28s} "
+            f"claimed={submission['score']:6d} simulated={score} "
+            f"ticks={submission['replay'].get('ticks', 0):6d} {seconds * 1000:7.1f}ms"
+        )
+
+    durations.sort()
+    print(
+        f"{accepted}/{len(submissions)} accepted in {wall_time:.2f}s "
+        f"with {args.workers} workers ({len(submissions) / wall_time:.1f} replays/s, "
+        f"{simulated_ticks / max(sum(durations), 1e-9):.0f} ticks/s per worker, "
+        f"slowest {durations[-1] * 1000:.0f}ms)"
+    )
+
+
+if __name__ == "__main__":
+    main()